@@ -9,7 +9,7 @@ from logic.auth import (
     send_sign_up_otp,
     send_reset_password_otp,
     verify_reset_password_otp,
-    generate_password_hash
+    generate_password_hash_async
 )
 from models.http_responses import Success
 from models.user import UpdateUserInternal
@@ -48,7 +48,7 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
         log.info("failed to parse phone number, raising exception...")
         raise credentials_exception
 
-    user = authenticate_user(
+    user = await authenticate_user(
         phone_number=phone_number,
         plain_password=form_data.password
     )
@@ -168,7 +168,7 @@ async def reset_password_update_password(reset_password_dto: ResetPasswordDTO):
     update_user_dto = UpdateUserInternal(
         id=user.id,
         last_updated_on=datetime.now(pytz.utc),
-        hashed_password=generate_password_hash(reset_password_dto.new_password)
+        hashed_password=await generate_password_hash_async(reset_password_dto.new_password)
     )
 
     update_result = update_user(update_user_dto=update_user_dto)
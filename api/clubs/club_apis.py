@@ -1,31 +1,52 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Optional
 
 import pytz
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, status
 
-from data.dbapis.clubs import find_club, find_club_by_user, find_many_clubs
+from data.db_executor import run_in_db_executor
+from data.dbapis.clubs import find_club, find_club_by_user, find_many_clubs, iter_clubs
 from data.dbapis.clubs import update_club as update_club_db
+from data.dbapis.reviews.read_queries import find_club_rating_summaries
+from data.dbapis.reviews.write_queries import update_review_approval
 from data.dbapis.trainer_affiliation import save_trainer_affiliation
-from logging_config import log
+from logging_config import log, summarize
 from logic.auth import get_current_user
 from logic.clubs import (
     add_club_service,
     club_service_detailed_get_query_with_pagination,
+    search_available_club_service_slots,
     update_club_service,
     upload_images_logic,
     upload_logo_logic,
 )
 from logic.clubs.clubs import clubs_get_query_with_pagination
 from logic.trainer_affiliation import trainer_affiliation_get_query_with_pagination
-from models.clubs import UpdateClubInternal
+from models.clubs import ClubInternal, UpdateClubInternal
+from models.clubs.enums.service import ServiceType, SubServices
 from models.clubs.service_internal import ClubServiceInternal, UpdateClubServiceInternal
-from models.http_responses import Success
-from models.trainer_affiliation import TrainerAffiliationInternal
+from models.http_responses import PaginatedSuccess, Success
+from models.ratings import ClubRatingSummaryInternal
+from models.trainer_affiliation import (
+    TrainerAffiliationDetailedInternal,
+    TrainerAffiliationInternal,
+)
+from models.uploaded_image import ImageSize
 from models.user import UserInternal
 from models.user.enums import UserRoles
 from role_based_access_control import RoleBasedAccessControl
-from utils.image_management import generate_image_url, generate_image_urls
+from utils.image_management import (
+    generate_image_url,
+    generate_image_urls,
+    prefetch_image_file_paths,
+)
+from utils.image_renditions import LISTING_IMAGE_SIZE
+from utils.json_streaming import (
+    StreamFormat,
+    batched_in_db_executor,
+    json_streaming_response,
+)
+from utils.response_cache import CLUBS_RESPONSE_CACHE_KEY, response_cache
 
 from ..commons.models import GetQueryPaginatedDTO
 from .models import (
@@ -34,7 +55,8 @@ from .models import (
     GetTrainerAffiliationDetailedDTO,
     GetTrainerAffiliationDTO,
 )
-from .models.club_service import ResponseGetClubService
+from .models.club_service import ResponseAvailableSlot, ResponseGetClubService
+from .models.ratings_request_model import ReviewApproval
 from .role_based_parameter_control import (
     ClubIdParameterControlForm,
     ClubServiceParameterControl,
@@ -49,6 +71,97 @@ from .role_based_parameter_control import (
 clubs_api_router = APIRouter(prefix="/clubs", tags=["clubs"])
 
 
+def build_club_dto(
+    club: ClubInternal,
+    club_dto_class: type[GetClubDTO | GetClubDetailedDTO] = GetClubDTO,
+    image_size: Optional[ImageSize] = None,
+) -> GetClubDTO | GetClubDetailedDTO:
+    """builds the response dto of a club
+
+    resolving the image urls and the rating summary queries the database, hence this is
+    meant to be awaited through run_in_db_executor from the async routes
+
+    Args:
+        club (ClubInternal)
+        club_dto_class (type[GetClubDTO | GetClubDetailedDTO]): the dto to build
+        image_size (Optional[ImageSize]): the rendition of the logo and the images, the
+            original images if None
+
+    Returns:
+        GetClubDTO | GetClubDetailedDTO
+    """
+    prefetch_club_rating_summaries(clubs=[club])
+
+    return create_club_dto(
+        club=club, club_dto_class=club_dto_class, image_size=image_size
+    )
+
+
+def create_club_dto(
+    club: ClubInternal,
+    club_dto_class: type[GetClubDTO | GetClubDetailedDTO] = GetClubDTO,
+    image_size: Optional[ImageSize] = None,
+) -> GetClubDTO | GetClubDetailedDTO:
+    """builds the response dto of a club whose rating summary is resolved, see
+    build_club_dto"""
+    rating_summary = club.rating_summary or ClubRatingSummaryInternal(club_id=str(club.id))
+
+    return club_dto_class(
+        logo=generate_image_url(image_id=club.logo, size=image_size),
+        images=generate_image_urls(image_ids=club.images, size=image_size),
+        average_rating=(
+            f"{rating_summary.approved_average:.1f}"
+            if rating_summary.approved_average is not None
+            else None
+        ),
+        review_count=rating_summary.approved_count,
+        rating_histogram=rating_summary.approved_histogram,
+        **club.model_dump(exclude={"logo", "images", "rating_summary"}),
+    )
+
+
+def prefetch_club_rating_summaries(clubs: list[ClubInternal]):
+    """resolves the rating summaries of the clubs that their query didn't join (see
+    ClubInternal.rating_summary) with a single query"""
+    club_ids = [str(club.id) for club in clubs if club.rating_summary is None]
+
+    if not club_ids:
+        return
+
+    club_rating_summaries = find_club_rating_summaries(club_ids=club_ids)
+
+    for club in clubs:
+        if club.rating_summary is None:
+            club.rating_summary = club_rating_summaries.get(str(club.id))
+
+
+def build_club_dtos(clubs: list[ClubInternal]) -> list[GetClubDTO]:
+    """builds the response dtos of many clubs in one go, see build_club_dto. the clubs
+    are listed, their images are the LISTING_IMAGE_SIZE renditions"""
+    prefetch_image_file_paths(
+        image_ids=[
+            image_id
+            for club in clubs
+            for image_id in [club.logo, *(club.images or [])]
+        ]
+    )
+
+    prefetch_club_rating_summaries(clubs=clubs)
+
+    return [create_club_dto(club=club, image_size=LISTING_IMAGE_SIZE) for club in clubs]
+
+
+def build_trainer_affiliation_detailed_dtos(
+    trainer_affiliations: list[TrainerAffiliationDetailedInternal],
+) -> list[GetTrainerAffiliationDetailedDTO]:
+    """builds the response dtos of the trainer affiliations, the embedded clubs resolve
+    their image urls while validating, see build_club_dto"""
+    return [
+        GetTrainerAffiliationDetailedDTO(**trainer_affiliation.model_dump())
+        for trainer_affiliation in trainer_affiliations
+    ]
+
+
 @clubs_api_router.put("/update-club")
 async def update_club(
     request: Request,
@@ -63,7 +176,7 @@ async def update_club(
         f"user={user})"
     )
 
-    existing_club = find_club(id=str(update_club_request.id))
+    existing_club = await run_in_db_executor(find_club, id=str(update_club_request.id))
 
     update_club_data = UpdateClubInternal(
         last_updated_by=user.id,
@@ -78,24 +191,52 @@ async def update_club(
         log.info(f"new platform_id={new_platform_id}")
         update_club_data.platform_id = new_platform_id
 
-    updated_club = update_club_db(update_club_data=update_club_data)
+    updated_club = await run_in_db_executor(
+        update_club_db, update_club_data=update_club_data
+    )
 
     log.info("club updated successfully, returning...")
 
     return Success(
         message="club updated successfully...",
         data={
-            "updated_club": GetClubDTO(
-                logo=generate_image_url(image_id=updated_club.logo, request=request),
-                images=generate_image_urls(
-                    image_ids=updated_club.images, request=request
-                ),
-                **updated_club.model_dump(exclude={"logo", "images"}),
+            "updated_club": await run_in_db_executor(
+                build_club_dto, club=updated_club
             )
         },
     )
 
 
+@clubs_api_router.put("/update-review-approval")
+async def update_club_review_approval(
+    review_approval: ReviewApproval,
+    user: Annotated[
+        UserInternal, Depends(RoleBasedAccessControl(allowed_roles={UserRoles.ADMIN}))
+    ],
+):
+    log.info(
+        "inside /clubs/update-review-approval (review_approval=%s, user_id=%s)",
+        review_approval,
+        user.id,
+    )
+
+    # only the approved reviews are counted in the ratings exposed by the clubs
+    is_updated = await run_in_db_executor(
+        update_review_approval,
+        review_id=review_approval.review_id,
+        approved=review_approval.approved,
+    )
+
+    retval = Success(
+        message="review approval updated successfully...",
+        data={"is_updated": is_updated},
+    )
+
+    log.info("returning %s", summarize(retval))
+
+    return retval
+
+
 @clubs_api_router.get("/get-club/{club_id}")
 async def get_club_by_id(
     request: Request,
@@ -104,7 +245,7 @@ async def get_club_by_id(
 ):
     log.info(f"inside /clubs/get-club/{club_id} (club_id={club_id}, user_id={user.id})")
 
-    club = find_club(id=club_id)
+    club = await run_in_db_executor(find_club, id=club_id)
 
     if not club:
         raise HTTPException(
@@ -114,41 +255,53 @@ async def get_club_by_id(
 
     retval = Success(
         message="club retrieved successfully...",
-        data=GetClubDetailedDTO(
-            logo=generate_image_url(image_id=club.logo, request=request),
-            images=generate_image_urls(image_ids=club.images, request=request),
-            **club.model_dump(exclude={"logo", "images"}),
+        data=await run_in_db_executor(
+            build_club_dto, club=club, club_dto_class=GetClubDetailedDTO
         ),
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
 
 @clubs_api_router.get("/get-clubs")
 async def get_clubs(
-    request: Request, user: Annotated[UserInternal, Depends(get_current_user)]
+    request: Request,
+    user: Annotated[UserInternal, Depends(get_current_user)],
+    stream: Optional[StreamFormat] = None,
 ):
-    log.info(f"inside /clubs/get-clubs (user_id={user.id})")
+    log.info("inside /clubs/get-clubs (user_id=%s, stream=%s)", user.id, stream)
+
+    if stream:
+        # the clubs are read, validated and serialized a batch at a time (with the
+        # image paths of a batch prefetched in one query), the cache is bypassed
+        return json_streaming_response(
+            batched_in_db_executor(iter_clubs(), transform=build_club_dtos),
+            stream_format=stream,
+            message="club retrieved successfully...",
+        )
 
-    clubs = find_many_clubs()
+    async def build_response() -> Success:
+        clubs = await run_in_db_executor(find_many_clubs)
 
-    retval = Success(
-        message="club retrieved successfully...",
-        data=[
-            GetClubDTO(
-                logo=generate_image_url(image_id=club.logo, request=request),
-                images=generate_image_urls(image_ids=club.images, request=request),
-                **club.model_dump(exclude={"logo", "images"}),
-            )
-            for club in clubs
-        ],
-    )
+        retval = Success(
+            message="club retrieved successfully...",
+            data=await run_in_db_executor(build_club_dtos, clubs=clubs),
+        )
 
-    log.info(f"returning {retval}")
+        log.info("returning %s", summarize(retval))
 
-    return retval
+        return retval
+
+    # the listing is the same for every user, the serialized response is cached (and
+    # invalidated by the club write queries) and revalidated by the clients with its ETag
+    return await response_cache.cached_json_response(
+        request=request,
+        key=CLUBS_RESPONSE_CACHE_KEY,
+        build=build_response,
+        cache_control="private, no-cache",
+    )
 
 
 @clubs_api_router.get("/get-your-club")
@@ -160,18 +313,14 @@ async def get_your_club(
 ):
     log.info(f"inside /clubs/get-your-club (user_id={user.id})")
 
-    club = find_club_by_user(user_id=str(user.id))
+    club = await run_in_db_executor(find_club_by_user, user_id=str(user.id))
 
     retval = Success(
         message="club retrieved successfully...",
-        data=GetClubDTO(
-            logo=generate_image_url(image_id=club.logo, request=request),
-            images=generate_image_urls(image_ids=club.images, request=request),
-            **club.model_dump(exclude={"logo", "images"}),
-        ),
+        data=await run_in_db_executor(build_club_dto, club=club),
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -190,26 +339,34 @@ async def get_clubs_paginated(
     s = get_query_paginated_dto.s
     page_no = get_query_paginated_dto.page_no
     page_size = get_query_paginated_dto.page_size
+    cursor = get_query_paginated_dto.cursor
+    with_total = get_query_paginated_dto.with_total
+    facets = get_query_paginated_dto.facets
 
     log.info(
         f"inside {request.url} (user_id={user.id}) (get_query_paginated_dto={get_query_paginated_dto})"
     )
 
-    response_clubs = clubs_get_query_with_pagination(
-        f=f, s=s, page_no=page_no, page_size=page_size
+    response_clubs = await run_in_db_executor(
+        clubs_get_query_with_pagination,
+        f=f,
+        s=s,
+        page_no=page_no,
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        facets=facets,
     )
 
-    return_clubs_list = []
-    for club in response_clubs:
-        return_clubs_list.append(
-            GetClubDTO(
-                logo=generate_image_url(image_id=club.logo),
-                images=generate_image_urls(image_ids=club.images),
-                **club.model_dump(exclude={"logo", "images"}),
-            )
-        )
+    return_clubs_list = await run_in_db_executor(build_club_dtos, clubs=response_clubs)
 
-    return Success(message="clubs retrieved successfully...", data=return_clubs_list)
+    return PaginatedSuccess(
+        message="clubs retrieved successfully...",
+        data=return_clubs_list,
+        next_cursor=response_clubs.next_cursor,
+        total_count=response_clubs.total_count,
+        facets=response_clubs.facets,
+    )
 
 
 @clubs_api_router.post("/upload-logo")
@@ -227,14 +384,10 @@ async def upload_logo(
 
     retval = Success(
         message="logo uploaded successfully...",
-        data=GetClubDTO(
-            logo=generate_image_url(image_id=club.logo, request=request),
-            images=generate_image_urls(image_ids=club.images, request=request),
-            **club.model_dump(exclude={"logo", "images"}),
-        ),
+        data=await run_in_db_executor(build_club_dto, club=club),
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -254,14 +407,10 @@ async def upload_logo(
 
     retval = Success(
         message="logo uploaded successfully...",
-        data=GetClubDTO(
-            logo=generate_image_url(image_id=club.logo, request=request),
-            images=generate_image_urls(image_ids=club.images, request=request),
-            **club.model_dump(exclude={"logo", "images"}),
-        ),
+        data=await run_in_db_executor(build_club_dto, club=club),
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -286,8 +435,8 @@ async def generate_trainer_affiliation(
         created_by=user.id, **generate_trainer_affiliation_dto.model_dump()
     )
 
-    trainer_affiliation = save_trainer_affiliation(
-        new_trainer_affiliation=new_trainer_affiliation
+    trainer_affiliation = await run_in_db_executor(
+        save_trainer_affiliation, new_trainer_affiliation=new_trainer_affiliation
     )
 
     retval = Success(
@@ -295,7 +444,7 @@ async def generate_trainer_affiliation(
         data=GetTrainerAffiliationDTO(**trainer_affiliation.model_dump()),
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -313,24 +462,48 @@ async def get_trainer_affiliation_paginated(
     s = get_query_paginated_dto.s
     page_no = get_query_paginated_dto.page_no
     page_size = get_query_paginated_dto.page_size
+    cursor = get_query_paginated_dto.cursor
+    with_total = get_query_paginated_dto.with_total
+    facets = get_query_paginated_dto.facets
 
     log.info(
-        f"inside /clubs/get-trainer-affiliation-paginated ("
-        f"f={f}, s={s}, page_no={page_no}, page_size={page_size}, user_id={user.id})"
+        "inside /clubs/get-trainer-affiliation-paginated ("
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s, user_id=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
+        user.id,
     )
 
-    result = trainer_affiliation_get_query_with_pagination(
-        f=f, s=s, page_no=page_no, page_size=page_size
+    result = await run_in_db_executor(
+        trainer_affiliation_get_query_with_pagination,
+        f=f,
+        s=s,
+        page_no=page_no,
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        facets=facets,
     )
 
-    log.info(f"received data = {result}")
+    log.info("received data = %s", summarize(result))
 
-    retval = Success(
+    retval = PaginatedSuccess(
         message="trainer affiliation details fetched successfully",
-        data=[GetTrainerAffiliationDetailedDTO(**data.model_dump()) for data in result],
+        data=await run_in_db_executor(
+            build_trainer_affiliation_detailed_dtos, trainer_affiliations=result
+        ),
+        next_cursor=result.next_cursor,
+        total_count=result.total_count,
+        facets=result.facets,
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -369,7 +542,7 @@ def add_a_new_club_service(
         message="club service updated successfully",
         data=ResponseGetClubService(**result.model_dump()),
     )
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -414,7 +587,7 @@ def update_a_club_service(
         message="club service updated successfully",
         data=ResponseGetClubService(**result.model_dump()),
     )
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -433,23 +606,110 @@ def get_club_service_detailed_with_pagination(
     s = get_query_paginated_dto.s
     page_no = get_query_paginated_dto.page_no
     page_size = get_query_paginated_dto.page_size
+    cursor = get_query_paginated_dto.cursor
+    with_total = get_query_paginated_dto.with_total
+    facets = get_query_paginated_dto.facets
 
     log.info(
-        f"{request.url} invoked user={user},"
-        f"f={f}, s={s}, page_no={page_no}, page_size={page_size}"
+        "%s invoked user=%s,"
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s",
+        request.url,
+        user,
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
     )
 
     result = club_service_detailed_get_query_with_pagination(
-        f=f, s=s, page_no=page_no, page_size=page_size
+        f=f,
+        s=s,
+        page_no=page_no,
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        facets=facets,
     )
 
-    log.info(f"received data = {result}")
+    log.info("received data = %s", summarize(result))
 
-    retval = Success(
+    retval = PaginatedSuccess(
         message="club service details fetched successfully",
         data=[ResponseGetClubService(**data.model_dump()) for data in result],
+        next_cursor=result.next_cursor,
+        total_count=result.total_count,
+        facets=result.facets,
+    )
+
+    log.info("returning %s", summarize(retval))
+
+    return retval
+
+
+@clubs_api_router.get("/find-available-slots")
+def find_available_club_service_slots(
+    request: Request,
+    user: Annotated[UserInternal, Depends(get_current_user)],
+    start_time: datetime,
+    end_time: datetime,
+    service_type: Optional[ServiceType] = None,
+    sub_service: Optional[SubServices] = None,
+    club_id: Optional[str] = None,
+    page_no: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    log.info(
+        "%s invoked user_id=%s, start_time=%s, end_time=%s, "
+        "service_type=%s, sub_service=%s, club_id=%s, "
+        "page_no=%s, page_size=%s",
+        request.url,
+        user.id,
+        start_time,
+        end_time,
+        service_type,
+        sub_service,
+        club_id,
+        page_no,
+        page_size,
+    )
+
+    result = search_available_club_service_slots(
+        start_time=start_time,
+        end_time=end_time,
+        service_type=service_type,
+        sub_service=sub_service,
+        club_id=club_id,
+        page_no=page_no,
+        page_size=page_size,
+    )
+
+    retval = Success(
+        message="available slots fetched successfully",
+        data=[
+            ResponseAvailableSlot(
+                **slot.club_service.model_dump(
+                    include={
+                        "club_id",
+                        "service_type",
+                        "sub_service",
+                        "pricing",
+                        "currency",
+                        "discount",
+                    }
+                ),
+                id=str(slot.id),
+                start_time=slot.start_time,
+                end_time=slot.end_time,
+                club_service_id=slot.club_service_id,
+            )
+            for slot in result
+        ],
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
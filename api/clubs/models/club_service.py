@@ -125,3 +125,24 @@ class ResponseGetClubService(BaseModel):
     @field_serializer("service_status")
     def serialize_service_status(self, value):
         return value.name if value else None
+
+
+class ResponseAvailableSlot(BaseModel):
+    id: str
+    start_time: datetime
+    end_time: datetime
+    club_service_id: str
+    club_id: str
+    service_type: ServiceType
+    sub_service: SubServices
+    pricing: str
+    currency: str
+    discount: float
+
+    @field_serializer("service_type")
+    def serialize_service_type(self, value):
+        return value.name if value else None
+
+    @field_serializer("sub_service")
+    def serialize_sub_service(self, value):
+        return value.name if value else None
@@ -26,7 +26,10 @@ class GetClubDetailedDTO(BaseModel):
     images: Optional[list[str]] = None
     verification_status: VerificationStatus
     approx_price: Optional[str] = None
+    # of the reviews approved by an admin
     average_rating: Optional[str] = None
+    review_count: int = 0
+    rating_histogram: Optional[dict[str, int]] = None
     services: Optional[list[str]] = None
     reviews: Optional[list[str]] = None
 
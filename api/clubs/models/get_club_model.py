@@ -27,7 +27,10 @@ class GetClubDTO(BaseModel):
     images: Optional[list[str]] = None
     verification_status: VerificationStatus
     approx_price: Optional[str] = None
+    # of the reviews approved by an admin
     average_rating: Optional[str] = None
+    review_count: int = 0
+    rating_histogram: Optional[dict[str, int]] = None
 
     @field_validator("logo")
     def convert_image_id_to_url(cls, logo):
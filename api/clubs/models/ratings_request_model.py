@@ -7,3 +7,8 @@ class ClubReview(BaseModel):
     club_id: str = Field(..., description="The ID of the club")
     rating: int = Field(..., ge=1, le=5, description="Rating of the club (1 to 5)")
     # review: str = Optional[Field(..., description="Review of the club")]
+
+
+class ReviewApproval(BaseModel):
+    review_id: str = Field(..., description="The ID of the review")
+    approved: bool = Field(..., description="Whether the review is approved")
@@ -6,7 +6,7 @@ from data.dbapis.clubs import (
     find_club,
     find_club_by_user,
     find_club_service,
-    get_club_service_availability,
+    find_club_service_availability_ids,
 )
 from logging_config import log
 from models.user.enums import UserRoles
@@ -86,13 +86,22 @@ class UpdateClubServiceParameterControl:
         if not self.club_service.availability:
             return True
 
-        for availability in self.club_service.availability:
-            is_valid_availability = get_club_service_availability(
-                club_service_id=self.club_service_id,
-                availability_id=availability.availability_id,
+        availability_ids = [
+            availability.availability_id for availability in self.club_service.availability
+        ]
+        existing_availability_ids = find_club_service_availability_ids(
+            club_service_id=self.club_service_id,
+            availability_ids=availability_ids,
+        )
+
+        missing_availability_ids = set(availability_ids) - existing_availability_ids
+
+        if missing_availability_ids:
+            log.error(
+                "cannot validate the provided availability "
+                "(missing_availability_ids=%s)",
+                missing_availability_ids,
             )
-            if not is_valid_availability:
-                log.error("cannot validate the provided availability")
-                return False
+            return False
 
         return True
@@ -5,4 +5,11 @@ class GetQueryPaginatedDTO(BaseModel):
     s: list[str] = None
     page_no: int = None
     page_size: int = None
+    # opt-in keyset pagination, pass an empty cursor for the first page and then the
+    # next_cursor of the previous page; page_no is ignored when a cursor is passed
+    cursor: str = None
+    # count all the matching documents along with the page
+    with_total: bool = False
+    # the fields to count the matching documents per value of, e.g. facets=gender
+    facets: list[str] = None
 
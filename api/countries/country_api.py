@@ -2,6 +2,7 @@ from uuid import UUID
 from fastapi import APIRouter, status, Request, Depends
 from fastapi.exceptions import HTTPException
 from api.countries.models.country_model import CreateCountryDTO
+from data.db_executor import run_in_db_executor
 from data.dbapis.country.read_queries import fetch_country_by_uuid, list_country
 from data.dbapis.country.write_queries import save_country
 from logging_config import log
@@ -9,6 +10,7 @@ from logic.auth import get_current_user
 from models.http_responses import Success
 from models.user import UserInternal
 from models.user.country_internal import CountryInternal
+from utils.response_cache import COUNTRIES_RESPONSE_CACHE_KEY, response_cache
 from typing import Annotated
 
 country_api_router = APIRouter(
@@ -33,7 +35,7 @@ async def create_multiple_countries(request: Request, countries: list[CreateCoun
             country_iso=country.country_iso,
             created_by=user.id
         )
-        result = save_country(country=country_internal)
+        result = await run_in_db_executor(save_country, country=country_internal)
         if not result:
             log.error(f"User {user.id} could not save the country {country.country_name} in the database.")
             raise HTTPException(
@@ -55,25 +57,32 @@ async def create_multiple_countries(request: Request, countries: list[CreateCoun
 
 
 @country_api_router.get("/all")
-async def get_all_countries():
+async def get_all_countries(request: Request):
     log.info("/countries invoked")
 
-    # Use list_country function to fetch all countries
-    countries = list_country()  # Fetch the countries
+    async def build_response() -> Success:
+        # Use list_country function to fetch all countries
+        countries = await run_in_db_executor(list_country)  # Fetch the countries
 
-    if not countries:
-        log.info("No countries found in the database.")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No countries found"
-        )
+        if not countries:
+            log.info("No countries found in the database.")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No countries found"
+            )
 
-    log.info(f"Countries retrieved: {countries}")
+        log.info("Countries retrieved: %s", countries)
 
-    return Success(
-        message="Countries fetched successfully.",
-        data=[country.model_dump() for country in countries]  # Used model_dump to convert Pydantic models to dict(as
-        # recommended)
+        return Success(
+            message="Countries fetched successfully.",
+            data=[country.model_dump() for country in countries]  # Used model_dump to convert Pydantic models to dict(as
+            # recommended)
+        )
+
+    # the countries hardly ever change, the serialized response is cached (and
+    # invalidated by save_country) and revalidated by the clients with its ETag
+    return await response_cache.cached_json_response(
+        request=request, key=COUNTRIES_RESPONSE_CACHE_KEY, build=build_response
     )
 
 
@@ -83,7 +92,7 @@ async def get_country_by_uuid(country_uuid: UUID):
     log.info(f"/country/{country_uuid} invoked")
 
     # Use get_country_by_uuid function to fetch country by UUID
-    country = fetch_country_by_uuid(country_id=country_uuid)
+    country = await run_in_db_executor(fetch_country_by_uuid, country_id=country_uuid)
 
     if not country:
         log.error(f"Country with UUID {country_uuid} not found.")
@@ -23,7 +23,12 @@ from models.horse.horse_renting_service_internal import (
     HorseRentingServiceInternal,
     Provider,
 )
-from utils.image_management import generate_image_urls, save_image
+from utils.image_management import (
+    generate_image_urls,
+    prefetch_image_file_paths,
+    save_image,
+)
+from utils.image_renditions import LISTING_IMAGE_SIZE
 
 from .api_validators.horse_renting_service import (
     CreateRentEnquiryValidator,
@@ -137,9 +142,17 @@ def get_horse_rent_listing(
 
     rent_listings = get_horse_rent_listings(user_id=user.id, own_listing=own_listing)
 
+    prefetch_image_file_paths(
+        image_ids=[
+            image_id
+            for rent_listing in rent_listings
+            for image_id in rent_listing.image_urls or []
+        ]
+    )
+
     for rent_listing in rent_listings:
         rent_listing.image_urls = generate_image_urls(
-            image_ids=rent_listing.image_urls, request=request
+            image_ids=rent_listing.image_urls, request=request, size=LISTING_IMAGE_SIZE
         )
 
     log.info(f"{request.url.path} returning {rent_listings}")
@@ -23,7 +23,12 @@ from models.horse.horse_selling_service_internal import (
     HorseSellingServiceInternal,
     Provider,
 )
-from utils.image_management import generate_image_urls, save_image
+from utils.image_management import (
+    generate_image_urls,
+    prefetch_image_file_paths,
+    save_image,
+)
+from utils.image_renditions import LISTING_IMAGE_SIZE
 
 from .api_validators.horse_selling_service import (
     CreateSellEnquiryValidator,
@@ -135,9 +140,17 @@ def get_horse_sell_listing(
 
     sell_listings = get_horse_sell_listings(user_id=user.id, own_listing=own_listing)
 
+    prefetch_image_file_paths(
+        image_ids=[
+            image_id
+            for sell_listing in sell_listings
+            for image_id in sell_listing.image_urls or []
+        ]
+    )
+
     for sell_listing in sell_listings:
         sell_listing.image_urls = generate_image_urls(
-            image_ids=sell_listing.image_urls, request=request
+            image_ids=sell_listing.image_urls, request=request, size=LISTING_IMAGE_SIZE
         )
 
     log.info(f"{request.url.path} returning {sell_listings}")
@@ -1,21 +1,73 @@
-from fastapi import APIRouter, Request
+from typing import Optional
+from fastapi import APIRouter, Request, Response, status
 from fastapi.responses import FileResponse
+from config import IMAGE_CACHE_MAX_AGE_IN_SECONDS
+from data.db_executor import run_in_db_executor
 from logging_config import log
-from utils.image_management import get_image_file_path
+from models.uploaded_image import ImageSize
+from utils.image_management import get_image_etag, get_image_file_path
+from utils.image_renditions import get_rendition_file_path
+from utils.response_cache import parse_if_none_match
 
 images_router = APIRouter(
     prefix="/images",
     tags=["images"]
 )
 
+# an image (or a rendition) never changes once saved, the clients keep it for good
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={IMAGE_CACHE_MAX_AGE_IN_SECONDS}, immutable"
+
 
 # In React Native (the frontend) {base_url}/{image_id} won't work
 # because it expects the extension of the image file to be appended at the
 # end of the url, i.e. {base_url}/{image_id}/some_string.jpg.
 # Therefore, the {image_extension} path parameter is used, it doesn't have any significance
 # in the functioning of this API.
+# With a size, the resized webp rendition of the image is served, or the image itself
+# while the rendition isn't built yet (and for the images without renditions, e.g. pdf).
+#
+# The responses carry an ETag derived from the image_id (and the size), a request whose
+# If-None-Match holds it is answered with a 304 straight away, without looking the image
+# up. Byte ranges (Range, If-Range) are served by FileResponse, e.g. for the pages of a pdf.
 @images_router.get("/{image_id}/{image_extension}", response_class=FileResponse)
-async def get_image(request: Request, image_id: str, image_extension: str):
+async def get_image(
+        request: Request,
+        image_id: str,
+        image_extension: str,
+        size: Optional[ImageSize] = None
+):
     log.info(f"{request.url}, {request.base_url}")
-    image_file_path = get_image_file_path(image_id=image_id)
-    return FileResponse(image_file_path)
+
+    etag = get_image_etag(image_id=image_id, size=size)
+    if_none_match = parse_if_none_match(request.headers.get("if-none-match"))
+
+    if etag in if_none_match:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+        )
+
+    image_file_path = await run_in_db_executor(get_image_file_path, image_id=image_id)
+    cache_control = IMMUTABLE_CACHE_CONTROL
+
+    if size is not None:
+        rendition_file_path = get_rendition_file_path(image_file_path, size)
+
+        if rendition_file_path is None:
+            # the image itself stands in for its rendition, under its own ETag, which the
+            # clients have to revalidate to get the rendition once it's built
+            etag = get_image_etag(image_id=image_id)
+            cache_control = "no-cache"
+
+            if etag in if_none_match:
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Cache-Control": cache_control},
+                )
+
+        else:
+            image_file_path = rendition_file_path
+
+    return FileResponse(
+        image_file_path, headers={"ETag": etag, "Cache-Control": cache_control}
+    )
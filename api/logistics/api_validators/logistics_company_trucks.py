@@ -1,6 +1,6 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
-from fastapi import Depends, HTTPException, UploadFile, status
+from fastapi import Depends, HTTPException, Query, UploadFile, status
 from pydantic_extra_types.coordinate import Latitude, Longitude
 
 from api.logistics.models.logistics_company_trucks import AddTruck, UpdateTruckDetails
@@ -166,9 +166,13 @@ class FindNearbyTrucksValidator:
         user: consumer_app_user_dependency,
         lat: Latitude,
         long: Longitude,
-        radius: float = 10,
+        radius: Annotated[float, Query(gt=0)] = 10,
+        page_no: Annotated[Optional[int], Query(gt=0)] = None,
+        page_size: Annotated[Optional[int], Query(gt=0)] = None,
     ) -> None:
         self.user = user
         self.lat = lat
         self.long = long
         self.radius = radius
+        self.page_no = page_no
+        self.page_size = page_size
@@ -5,7 +5,7 @@ from fastapi.exceptions import HTTPException
 from pydantic_extra_types.coordinate import Latitude, Longitude
 
 from data.dbapis.truck.read_queries import (
-    get_all_trucks,
+    find_trucks_near_location,
     get_truck_details_by_id_db,
     get_trucks_by_logistics_company_id,
 )
@@ -15,9 +15,13 @@ from data.dbapis.truck.write_queries import (
     update_truck_images,
 )
 from logging_config import log
-from logic.logistics.haversine import haversine
 from models.truck.trucks import TruckInternal
-from utils.image_management import generate_image_urls, save_image
+from utils.image_management import (
+    generate_image_urls,
+    prefetch_image_file_paths,
+    save_image,
+)
+from utils.image_renditions import LISTING_IMAGE_SIZE
 
 from .api_validators.logistics_company_trucks import (
     AddTruckValidator,
@@ -110,10 +114,14 @@ def get_trucks(request: Request, payload: Annotated[GetTrucksValidator, Depends(
 
     trucks = [ViewTruck(**truck) for truck in trucks_list]
 
+    prefetch_image_file_paths(
+        image_ids=[image_id for truck in trucks for image_id in truck.image_urls or []]
+    )
+
     for truck in trucks:
         if truck.image_urls:
             truck.image_urls = generate_image_urls(
-                image_ids=truck.image_urls, request=request
+                image_ids=truck.image_urls, request=request, size=LISTING_IMAGE_SIZE
             )
 
     log.info(f"{request.url.path} returning {trucks}")
@@ -216,8 +224,19 @@ def find_nearby_trucks(
     radius = payload.radius
     lat = payload.lat
     long = payload.long
+    page_no = payload.page_no
+    page_size = payload.page_size
 
-    log.info(f"{request.url.path} invoked radius {radius}, lat {lat}, long {long}")
+    log.info(
+        "%s invoked radius %s, lat %s, long %s, "
+        "page_no %s, page_size %s",
+        request.url.path,
+        radius,
+        lat,
+        long,
+        page_no,
+        page_size,
+    )
 
     fields = [
         "logistics_company_id",
@@ -233,22 +252,36 @@ def find_nearby_trucks(
         "location",
         "images",
     ]
-    all_trucks = get_all_trucks(fields=fields)
+
+    # radius filtering, sorting by distance and pagination are pushed down to the
+    # 2dsphere index, only the trucks that are returned are read from the database
+    nearby_trucks_cursor = find_trucks_near_location(
+        lat=lat,
+        long=long,
+        radius=radius,
+        fields=fields,
+        page_no=page_no,
+        page_size=page_size,
+    )
+
+    nearby_trucks_list = list(nearby_trucks_cursor)
+
+    prefetch_image_file_paths(
+        image_ids=[
+            image_id
+            for truck in nearby_trucks_list
+            for image_id in truck.get("images") or []
+        ]
+    )
 
     nearby_trucks = []
 
-    for truck in all_trucks:
-        truck_lat = truck["location"]["lat"]
-        truck_long = truck["location"]["long"]
-
-        distance = haversine(lon1=long, lat1=lat, lon2=truck_long, lat2=truck_lat)
-        log.info(f"distance {distance}")
-        if distance <= radius:
-            if truck.get("images"):
-                truck["images"] = generate_image_urls(
-                    image_ids=truck["images"], request=request
-                )
-            nearby_trucks.append(ViewTruck(**truck))
+    for truck in nearby_trucks_list:
+        if truck.get("images"):
+            truck["images"] = generate_image_urls(
+                image_ids=truck["images"], request=request, size=LISTING_IMAGE_SIZE
+            )
+        nearby_trucks.append(ViewTruck(**truck))
 
     log.info(f"{request.url.path} returning {nearby_trucks}")
 
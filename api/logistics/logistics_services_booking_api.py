@@ -1,32 +1,29 @@
-from typing import Annotated, List
-
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import Annotated, List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 
 from data.dbapis.logistics_company_services.read_queries import (
     get_all_club_to_club_services,
     get_all_luggage_transfer_services,
     get_all_user_transfer_services,
 )
-from data.dbapis.logistics_services_bookings.read_queries import (
-    get_all_club_to_club_service_bookings_db,
-    get_all_luggage_transfer_service_bookings_db,
-    get_all_user_transfer_service_bookings_db,
-    get_club_to_club_service_booking_by_booking_id_db,
-    get_luggage_transfer_service_by_booking_id,
-    get_user_transfer_service_booking_by_booking_id,
+from data.dbapis.logistics_services_bookings import (
+    get_all_service_bookings_db,
+    get_service_booking_by_booking_id_db,
+    get_service_bookings_paginated_db,
+    update_service_booking_db,
 )
-from data.dbapis.logistics_services_bookings.write_queries import (
-    save_club_to_club_service_booking_db,
-    save_luggage_transfer_service_booking_db,
-    save_user_transfer_service_booking_db,
-    update_club_to_club_service_booking_db,
-    update_luggage_transfer_service_booking_db,
-    update_user_transfer_service_booking_db,
-)
-from data.dbapis.truck.write_queries import update_truck_availability
 from logging_config import log
-from logic.logistics.service_bookings_truck_availability_check import (
-    truck_available_for_service_booking,
+from logic.logistics.service_booking_reservation import (
+    book_service_with_truck_reservation,
 )
 from models.logistics_service_bookings import (
     ClubToClubServiceBookingInternal,
@@ -35,10 +32,10 @@ from models.logistics_service_bookings import (
     UserTransferServiceBookingInternal,
 )
 from models.logistics_service_bookings.enums import BookingStatus
-from models.truck.enums import TruckAvailability
 from models.user import UserInternal
 from models.user.enums import UserRoles
 from role_based_access_control import RoleBasedAccessControl
+from utils.json_streaming import StreamFormat, batched, json_streaming_response
 from utils.logistics_utils import LogisticsService
 
 from .models import (
@@ -56,6 +53,7 @@ from .models import (
     ResponseClubToClubServices,
     ResponseLuggageTransferService,
     ResponseLuggageTransferServiceBooking,
+    ResponseServiceBooking,
     ResponseUserTransferServiceBooking,
     ResponseUserTransferServices,
     UpdateClubToClubServiceBooking,
@@ -67,6 +65,12 @@ from .models import (
 
 service_booking_router = APIRouter(prefix="/services", tags=["logistics-user"])
 
+SERVICE_BOOKING_MODEL_MAPPING = {
+    LogisticsService.CLUB_TO_CLUB.value: ClubToClubServiceBooking,
+    LogisticsService.USER_TRANSFER.value: UserTransferServiceBooking,
+    LogisticsService.LUGGAGE_TRANSFER.value: LuggageTransferServiceBooking,
+}
+
 
 @service_booking_router.get(
     "/get-club-to-club-services", response_model=List[ResponseClubToClubServices]
@@ -85,10 +89,18 @@ def get_club_to_club_services(
             )
         ),
     ],
+    stream: Optional[StreamFormat] = None,
 ):
-    log.info(f"{request.url.path} invoked")
+    log.info("%s invoked stream %s", request.url.path, stream)
 
     club_to_club_services = get_all_club_to_club_services()
+
+    if stream:
+        return json_streaming_response(
+            batched(ClubToClubServices(**service) for service in club_to_club_services),
+            stream_format=stream,
+        )
+
     response = [ClubToClubServices(**service) for service in club_to_club_services]
 
     log.info(f"{request.url.path} returning {response}")
@@ -115,17 +127,6 @@ def book_club_to_club_services(
 ) -> ResponseBookClubToClubServiceBooking:
     log.info(f"{request.url.path} invoked booking_details {booking_details}")
 
-    truck_availability = truck_available_for_service_booking(
-        service_id=service_id,
-        service_type=LogisticsService.CLUB_TO_CLUB.value,
-        logistics_company_id=booking_details.logistics_company_id,
-        truck_id=booking_details.truck_id,
-    )
-    if not truck_availability.is_available:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=truck_availability.message
-        )
-
     booking_status = BookingStatus.CREATED
 
     booking = ClubToClubServiceBookingInternal(
@@ -143,14 +144,9 @@ def book_club_to_club_services(
         service_id=service_id,
     )
 
-    booking_id = save_club_to_club_service_booking_db(booking=booking)
-
-    truck_availability_updated = update_truck_availability(
-        truck_id=booking_details.truck_id,
-        availability=TruckAvailability.UN_AVAILABLE.value,
-    )
+    booking_id = book_service_with_truck_reservation(booking=booking)
 
-    if not booking_id or not truck_availability_updated:
+    if not booking_id:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="could not save the transfer in the database",
@@ -197,8 +193,10 @@ def update_club_to_club_booking(
             detail="user can only cancel the booking",
         )
 
-    booking_details = get_club_to_club_service_booking_by_booking_id_db(
-        consumer_id=user.id, booking_id=booking_id
+    booking_details = get_service_booking_by_booking_id_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.CLUB_TO_CLUB.value,
     )
 
     if not booking_details:
@@ -215,8 +213,11 @@ def update_club_to_club_booking(
             detail=f"cannot update this booking as booking status is {booking.booking_status.value}",
         )
 
-    updated = update_club_to_club_service_booking_db(
-        booking_id=booking_id, booking=booking_update_details
+    updated = update_service_booking_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.CLUB_TO_CLUB.value,
+        booking=booking_update_details,
     )
 
     if not updated:
@@ -245,13 +246,24 @@ def get_club_to_club_service_bookings(
             )
         ),
     ],
+    stream: Optional[StreamFormat] = None,
 ):
 
-    log.info(f"{request.url.path} invoked")
+    log.info("%s invoked stream %s", request.url.path, stream)
 
-    club_to_club_bookings = get_all_club_to_club_service_bookings_db(
-        consumer_id=user.id
+    club_to_club_bookings = get_all_service_bookings_db(
+        consumer_id=user.id, service_type=LogisticsService.CLUB_TO_CLUB.value
     )
+
+    if stream:
+        return json_streaming_response(
+            batched(
+                ClubToClubServiceBooking(**booking)
+                for booking in club_to_club_bookings
+            ),
+            stream_format=stream,
+        )
+
     response = [
         ClubToClubServiceBooking(**booking) for booking in club_to_club_bookings
     ]
@@ -283,8 +295,10 @@ def get_club_to_club_service_booking(
 
     log.info(f"{request.url.path} invoked")
 
-    booking = get_club_to_club_service_booking_by_booking_id_db(
-        consumer_id=user.id, booking_id=booking_id
+    booking = get_service_booking_by_booking_id_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.CLUB_TO_CLUB.value,
     )
     if not booking:
         raise HTTPException(
@@ -345,17 +359,6 @@ def book_user_transfer_service(
 ) -> ResponseBookUserTransferService:
     log.info(f"{request.url.path} invoked booking_details {booking_details}")
 
-    truck_availability = truck_available_for_service_booking(
-        service_id=service_id,
-        service_type=LogisticsService.USER_TRANSFER.value,
-        logistics_company_id=booking_details.logistics_company_id,
-        truck_id=booking_details.truck_id,
-    )
-    if not truck_availability.is_available:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=truck_availability.message
-        )
-
     booking_status = BookingStatus.CREATED
 
     booking = UserTransferServiceBookingInternal(
@@ -372,14 +375,9 @@ def book_user_transfer_service(
         groomer_info=booking_details.groomer_info,
     )
 
-    booking_id = save_user_transfer_service_booking_db(booking=booking)
+    booking_id = book_service_with_truck_reservation(booking=booking)
 
-    truck_availability_updated = update_truck_availability(
-        truck_id=booking_details.truck_id,
-        availability=TruckAvailability.UN_AVAILABLE.value,
-    )
-
-    if not booking_id or not truck_availability_updated:
+    if not booking_id:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="could not save the transfer in the database",
@@ -426,8 +424,10 @@ def update_user_transfer_service_booking(
             detail="user can only cancel the booking",
         )
 
-    booking_details = get_user_transfer_service_booking_by_booking_id(
-        consumer_id=user.id, booking_id=booking_id
+    booking_details = get_service_booking_by_booking_id_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.USER_TRANSFER.value,
     )
     if not booking_details:
         raise HTTPException(
@@ -443,8 +443,11 @@ def update_user_transfer_service_booking(
             detail=f"cannot update this booking as booking status is {booking.booking_status.value}",
         )
 
-    updated = update_user_transfer_service_booking_db(
-        booking_id=booking_id, booking=booking_update_details
+    updated = update_service_booking_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.USER_TRANSFER.value,
+        booking=booking_update_details,
     )
 
     if not updated:
@@ -473,13 +476,24 @@ def get_user_transfer_service_bookings(
             )
         ),
     ],
+    stream: Optional[StreamFormat] = None,
 ):
 
-    log.info(f"{request.url.path} invoked")
+    log.info("%s invoked stream %s", request.url.path, stream)
 
-    user_transfer_bookings = get_all_user_transfer_service_bookings_db(
-        consumer_id=user.id
+    user_transfer_bookings = get_all_service_bookings_db(
+        consumer_id=user.id, service_type=LogisticsService.USER_TRANSFER.value
     )
+
+    if stream:
+        return json_streaming_response(
+            batched(
+                UserTransferServiceBooking(**booking)
+                for booking in user_transfer_bookings
+            ),
+            stream_format=stream,
+        )
+
     response = [
         UserTransferServiceBooking(**booking) for booking in user_transfer_bookings
     ]
@@ -511,8 +525,10 @@ def get_user_transfer_service_booking(
 
     log.info(f"{request.url.path} invoked")
 
-    booking = get_user_transfer_service_booking_by_booking_id(
-        consumer_id=user.id, booking_id=booking_id
+    booking = get_service_booking_by_booking_id_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.USER_TRANSFER.value,
     )
     if not booking:
         raise HTTPException(
@@ -576,17 +592,6 @@ def book_luggage_transfer_service(
 ) -> ResponseBookLuggageTransferService:
     log.info(f"{request.url.path} invoked booking_details {booking_details}")
 
-    truck_availability = truck_available_for_service_booking(
-        service_id=service_id,
-        service_type=LogisticsService.LUGGAGE_TRANSFER.value,
-        logistics_company_id=booking_details.logistics_company_id,
-        truck_id=booking_details.truck_id,
-    )
-    if not truck_availability.is_available:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=truck_availability.message
-        )
-
     booking_status = BookingStatus.CREATED
 
     booking = LuggageTransferServiceBookingInternal(
@@ -603,14 +608,9 @@ def book_luggage_transfer_service(
         dedicated_labour=booking_details.dedicated_labour,
     )
 
-    booking_id = save_luggage_transfer_service_booking_db(booking=booking)
-
-    truck_availability_updated = update_truck_availability(
-        truck_id=booking_details.truck_id,
-        availability=TruckAvailability.UN_AVAILABLE.value,
-    )
+    booking_id = book_service_with_truck_reservation(booking=booking)
 
-    if not booking_id or not truck_availability_updated:
+    if not booking_id:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="could not save the transfer in the database",
@@ -657,8 +657,10 @@ def update_luggage_transfer_service_booking(
             detail="user can only cancel the booking",
         )
 
-    booking_details = get_luggage_transfer_service_by_booking_id(
-        consumer_id=user.id, booking_id=booking_id
+    booking_details = get_service_booking_by_booking_id_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.LUGGAGE_TRANSFER.value,
     )
 
     if not booking_details:
@@ -675,8 +677,11 @@ def update_luggage_transfer_service_booking(
             detail=f"cannot update this booking as booking status is {booking.booking_status.value}",
         )
 
-    updated = update_luggage_transfer_service_booking_db(
-        booking_id=booking_id, booking=booking_update_details
+    updated = update_service_booking_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.LUGGAGE_TRANSFER.value,
+        booking=booking_update_details,
     )
 
     if not updated:
@@ -705,13 +710,24 @@ def get_luggage_transfer_service_bookings(
             )
         ),
     ],
+    stream: Optional[StreamFormat] = None,
 ):
 
-    log.info(f"{request.url.path} invoked")
+    log.info("%s invoked stream %s", request.url.path, stream)
 
-    luggage_transfer_bookings = get_all_luggage_transfer_service_bookings_db(
-        consumer_id=user.id
+    luggage_transfer_bookings = get_all_service_bookings_db(
+        consumer_id=user.id, service_type=LogisticsService.LUGGAGE_TRANSFER.value
     )
+
+    if stream:
+        return json_streaming_response(
+            batched(
+                LuggageTransferServiceBooking(**booking)
+                for booking in luggage_transfer_bookings
+            ),
+            stream_format=stream,
+        )
+
     response = [
         LuggageTransferServiceBooking(**booking)
         for booking in luggage_transfer_bookings
@@ -744,8 +760,10 @@ def get_luggage_transfer_service_booking(
 
     log.info(f"{request.url.path} invoked")
 
-    booking = get_luggage_transfer_service_by_booking_id(
-        consumer_id=user.id, booking_id=booking_id
+    booking = get_service_booking_by_booking_id_db(
+        consumer_id=user.id,
+        booking_id=booking_id,
+        service_type=LogisticsService.LUGGAGE_TRANSFER.value,
     )
     if not booking:
         raise HTTPException(
@@ -758,3 +776,52 @@ def get_luggage_transfer_service_booking(
     log.info(f"{request.url.path} returning {luggage_transfer_booking}")
 
     return luggage_transfer_booking
+
+
+@service_booking_router.get(
+    "/get-my-service-bookings",
+    response_model=List[ResponseServiceBooking],
+)
+def get_my_service_bookings(
+    request: Request,
+    user: Annotated[
+        UserInternal,
+        Depends(
+            RoleBasedAccessControl(
+                allowed_roles={
+                    UserRoles.ADMIN,
+                    UserRoles.USER,
+                }
+            )
+        ),
+    ],
+    service_type: Annotated[Optional[List[LogisticsService]], Query()] = None,
+    page_no: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100)] = 20,
+):
+    """the user's bookings of every service type (or of the given ones), newest
+    first, a page at a time"""
+
+    log.info(
+        "%s invoked service_type %s "
+        "page_no %s page_size %s",
+        request.url.path,
+        service_type,
+        page_no,
+        page_size,
+    )
+
+    bookings = get_service_bookings_paginated_db(
+        consumer_id=user.id,
+        service_types=[service.value for service in service_type or []],
+        page_no=page_no,
+        page_size=page_size,
+    )
+    response = [
+        SERVICE_BOOKING_MODEL_MAPPING[booking["service_type"]](**booking)
+        for booking in bookings
+    ]
+
+    log.info("%s returning %s", request.url.path, response)
+
+    return response
@@ -14,6 +14,7 @@ from .logistics_services_bookings import (
     ResponseClubToClubServiceBooking,
     ResponseClubToClubServices,
     ResponseLuggageTransferService,
+    ResponseServiceBooking,
     ResponseUserTransferServiceBooking,
     ResponseUserTransferServices,
     UpdateClubToClubServiceBooking,
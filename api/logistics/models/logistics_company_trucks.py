@@ -4,7 +4,7 @@ from typing import List, Optional
 from pydantic import BaseModel, ConfigDict, Field, computed_field, field_serializer
 
 from data.db import PyObjectId
-from models.truck import Driver, Location, TruckInternal
+from models.truck import Driver, GeoPoint, Location, TruckInternal
 from models.truck.enums.availability import TruckAvailability
 from utils.date_time import get_current_utc_datetime
 
@@ -86,3 +86,9 @@ class UpdateTruckDetails(BaseModel):
     @computed_field
     def updated_at(self) -> datetime:
         return get_current_utc_datetime()
+
+    # keeps the indexed GeoJSON point in sync whenever the location is updated,
+    # dropped by model_dump(exclude_none=True) when the location is not provided
+    @computed_field
+    def geo_location(self) -> Optional[GeoPoint]:
+        return GeoPoint.from_location(self.location) if self.location else None
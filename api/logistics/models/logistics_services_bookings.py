@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional, Union
 
 from pydantic import (
     BaseModel,
@@ -160,6 +160,7 @@ class ResponseClubToClubServiceBooking(BaseModel):
     truck_id: str
     pickup_time: datetime
     booking_status: BookingStatus
+    service_type: Literal["club_to_club"]
     created_at: datetime
     updated_at: datetime
 
@@ -255,6 +256,7 @@ class ResponseUserTransferServiceBooking(BaseModel):
     booking_status: BookingStatus
     horse_info: Horse
     groomer_info: Groomer
+    service_type: Literal["user_transfer"]
     created_at: datetime
     updated_at: datetime
 
@@ -353,9 +355,21 @@ class ResponseLuggageTransferServiceBooking(BaseModel):
     booking_status: BookingStatus
     items_to_move: List[ItemsToMove]
     dedicated_labour: bool
+    service_type: Literal["luggage_transfer"]
     created_at: datetime
     updated_at: datetime
 
 
 class LuggageTransferServiceBooking(LuggageTransferServiceBookingInternal):
     booking_id: PyObjectId = Field(None, alias="_id")
+
+
+# a booking of any service type, told apart by its service_type
+ResponseServiceBooking = Annotated[
+    Union[
+        ResponseClubToClubServiceBooking,
+        ResponseUserTransferServiceBooking,
+        ResponseLuggageTransferServiceBooking,
+    ],
+    Field(discriminator="service_type"),
+]
@@ -25,7 +25,7 @@ from external_services.payment_gateway_service.payment_gateway_service import cr
 from decorators import atomic_transaction
 from typing import Optional, Annotated
 from logic.generic_get_query_with_pagination import generic_get_query_with_pagination_logic
-from models.http_responses import Success
+from models.http_responses import PaginatedSuccess, Success
 from ..commons.models import GetQueryPaginatedDTO
 
 order_demo_api_router = APIRouter(
@@ -218,40 +218,71 @@ def get_orders_paginated_logic(
     s = get_query_paginated_dto.s
     page_no = get_query_paginated_dto.page_no
     page_size = get_query_paginated_dto.page_size
-
-    log.info(f"inside /order-demo/get-orders-paginated (f={f}, s={s}, page_no={page_no}, page_size={page_size}, "
-             f"user_phone_number={user.phone_number})")
+    cursor = get_query_paginated_dto.cursor
+    with_total = get_query_paginated_dto.with_total
+    facets = get_query_paginated_dto.facets
+
+    log.info(
+        "inside /order-demo/get-orders-paginated (f=%s, s=%s, page_no=%s, page_size=%s, "
+        "cursor=%s, with_total=%s, facets=%s, user_phone_number=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
+        user.phone_number,
+    )
 
     f = f + [f"user_id$eq${user.id}"] if f else [f"user_id$eq${user.id}"]
 
     result = order_demo_get_query_with_pagination(
-        f=f, s=s, page_no=page_no, page_size=page_size
+        f=f, s=s, page_no=page_no, page_size=page_size, cursor=cursor,
+        with_total=with_total, facets=facets
     )
 
-    retval = Success(
+    retval = PaginatedSuccess(
         message="demo orders fetched successfully...",
-        data=result
+        data=result,
+        next_cursor=result.next_cursor,
+        total_count=result.total_count,
+        facets=result.facets
     )
 
     log.info(f"returning {retval}")
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def order_demo_get_query_with_pagination(
         f: Optional[list[str]] = None,
         s: Optional[list[str]] = None,
         page_no: Optional[int] = None,
         page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+        facets: Optional[list[str]] = None,
         session=None
 ) -> list[OrderDemoDetailedInternal]:
-    log.info("inside order_demo_get_query_with_pagination("
-             f"f={f}, s={s}, page_no={page_no}, page_size={page_size})")
+    log.info(
+        "inside order_demo_get_query_with_pagination("
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
+    )
 
     result = generic_get_query_with_pagination_logic(
         primary_collection=get_order_demo_collection(),
         final_output_model=OrderDemoDetailedInternal,
-        f=f, s=s, page_no=page_no, page_size=page_size, session=session
+        f=f, s=s, page_no=page_no, page_size=page_size, cursor=cursor,
+        with_total=with_total, facets=facets, session=session
     )
 
     log.info(f"returning {result}")
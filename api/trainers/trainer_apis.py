@@ -2,14 +2,16 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, UploadFile
 
+from data.db_executor import run_in_db_executor
 from data.dbapis.trainer_certifications import save_trainer_certifications_bulk
-from logging_config import log
+from logging_config import log, summarize
 from logic.trainers import (
     trainers_get_query_with_pagination,
     upload_trainer_certificate_image,
 )
-from models.http_responses import Success
+from models.http_responses import PaginatedSuccess, Success
 from models.trainer_certification import TrainerCertificationInternal
+from models.trainers import TrainerDetailedInternal
 
 from .models import GetTrainerCertificationDTO, GetTrainerDetailedDTO
 from .role_based_parameter_control import (
@@ -20,6 +22,23 @@ from .role_based_parameter_control import (
 trainers_api_router = APIRouter(prefix="/trainers", tags=["trainers"])
 
 
+def build_trainer_detailed_dtos(
+    trainers: list[TrainerDetailedInternal],
+) -> list[GetTrainerDetailedDTO]:
+    """builds the response dtos of the trainers
+
+    validating the certifications resolves their image urls, which queries the
+    database, hence this is meant to be awaited through run_in_db_executor
+
+    Args:
+        trainers (list[TrainerDetailedInternal])
+
+    Returns:
+        list[GetTrainerDetailedDTO]
+    """
+    return [GetTrainerDetailedDTO(**trainer.model_dump()) for trainer in trainers]
+
+
 @trainers_api_router.get("/get-trainers-paginated")
 async def get_trainers_paginated(
     get_trainers_param_ctrl: Annotated[GetTrainersPaginatedParamCtrl, Depends()]
@@ -31,24 +50,46 @@ async def get_trainers_paginated(
     s = get_query_paginated_dto.s
     page_no = get_query_paginated_dto.page_no
     page_size = get_query_paginated_dto.page_size
+    cursor = get_query_paginated_dto.cursor
+    with_total = get_query_paginated_dto.with_total
+    facets = get_query_paginated_dto.facets
 
     log.info(
         "inside /trainers/get-trainers-paginated ("
-        f"f={f}, s={s}, page_no={page_no}, page_size={page_size}, user_id={user.id})"
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s, user_id=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
+        user.id,
     )
 
-    result = trainers_get_query_with_pagination(
-        f=f, s=s, page_no=page_no, page_size=page_size
+    result = await run_in_db_executor(
+        trainers_get_query_with_pagination,
+        f=f,
+        s=s,
+        page_no=page_no,
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        facets=facets,
     )
 
-    log.info(f"received data = {result}")
+    log.info("received data = %s", summarize(result))
 
-    retval = Success(
+    retval = PaginatedSuccess(
         message="trainer details fetched successfully",
-        data=[GetTrainerDetailedDTO(**data.model_dump()) for data in result],
+        data=await run_in_db_executor(build_trainer_detailed_dtos, trainers=result),
+        next_cursor=result.next_cursor,
+        total_count=result.total_count,
+        facets=result.facets,
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -75,8 +116,9 @@ async def upload_certification_image(
         created_by=trainer_id,
     )
 
-    new_trainer_certifications = save_trainer_certifications_bulk(
-        new_trainer_certifications=[trainer_certification]
+    new_trainer_certifications = await run_in_db_executor(
+        save_trainer_certifications_bulk,
+        new_trainer_certifications=[trainer_certification],
     )
 
     certificate_id = str(new_trainer_certifications[0].id)
@@ -87,10 +129,12 @@ async def upload_certification_image(
 
     retval = Success(
         message="successfully saved trainer_certification_image",
-        data=GetTrainerCertificationDTO(**trainer_certification.model_dump()),
+        data=await run_in_db_executor(
+            GetTrainerCertificationDTO, **trainer_certification.model_dump()
+        ),
     )
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
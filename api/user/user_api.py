@@ -5,7 +5,7 @@ from typing import Annotated
 from .models import SignUpUser, ResponseUser, UpdateUser
 from models.user import UserInternal, UpdateUserInternal
 from data.dbapis.user.write_queries import save_user, update_user as update_user_db
-from logic.auth import generate_password_hash, get_current_user, verify_sign_up_otp
+from logic.auth import generate_password_hash_async, get_current_user, verify_sign_up_otp
 from logic.user import upload_image_user_logic, upload_cover_image_user_logic
 from utils.image_management import generate_image_url
 from models.http_responses import Success
@@ -40,7 +40,7 @@ async def signup(request: Request, sign_up_user: SignUpUser):
         full_name=sign_up_user.full_name,
         email_address=sign_up_user.email_address,
         phone_number=sign_up_user.phone_number,
-        hashed_password=generate_password_hash(sign_up_user.password),
+        hashed_password=await generate_password_hash_async(sign_up_user.password),
         gender=sign_up_user.gender,
         riding_stage=sign_up_user.riding_stage,
         horse_ownership_status=sign_up_user.horse_ownership_status,
@@ -0,0 +1,54 @@
+"""
+Measures the cost of resolving the user of an authorized request (get_current_user, which
+every RoleBasedAccessControl dependency goes through) with the user cache bypassed, i.e.
+a database round trip per request, and with the user cache warm.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.authorized_requests --subject <email address or phone number>
+"""
+import argparse
+
+from data.dbapis.user.user_cache import user_cache
+from logic.auth import create_access_token, get_current_user
+
+from .utils import print_table, time_call
+
+REQUEST_COUNT = 1_000
+
+
+def resolve_uncached(token: str):
+    for _ in range(REQUEST_COUNT):
+        user_cache.clear()
+        get_current_user(token=token)
+
+
+def resolve_cached(token: str):
+    for _ in range(REQUEST_COUNT):
+        get_current_user(token=token)
+
+
+def main(subject: str):
+    token = create_access_token(data={"sub": subject})
+
+    if get_current_user(token=token) is None:
+        raise SystemExit(f"no user exists with the provided subject (subject={subject})")
+
+    uncached_ms = time_call(lambda: resolve_uncached(token=token), repeat=3)
+    cached_ms = time_call(lambda: resolve_cached(token=token), repeat=3)
+
+    print_table(
+        headers=["user cache", f"total for {REQUEST_COUNT} requests (ms)", "per request (ms)"],
+        rows=[
+            ("bypassed", f"{uncached_ms:.1f}", f"{uncached_ms / REQUEST_COUNT:.3f}"),
+            ("warm", f"{cached_ms:.1f}", f"{cached_ms / REQUEST_COUNT:.3f}"),
+        ],
+    )
+    print(user_cache.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subject", required=True, help="email/phone number of a user")
+    args = parser.parse_args()
+
+    main(subject=args.subject)
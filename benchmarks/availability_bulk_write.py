@@ -0,0 +1,102 @@
+"""
+Compares the two ways of updating the availability of a club service in a transaction:
+one update_one per availability (the former update_club_service_availability, a round
+trip each) against bulk_write_club_service_availability (a single unordered bulk_write),
+for schedules of SLOT_COUNTS availability.
+
+The availability is seeded under a scratch club service id in the real collection, it is
+deleted afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.availability_bulk_write
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+
+from data.db import get_club_service_availability_collection
+from data.dbapis.clubs import bulk_write_club_service_availability
+from decorators import atomic_transaction
+from models.clubs.service_internal import AvailabilityInternal
+
+from .utils import print_table, time_call
+
+SLOT_COUNTS = (7, 28, 84, 336)
+
+
+@atomic_transaction
+def per_slot_updates(availability: list[AvailabilityInternal], club_service_id: str, session=None):
+    """the update path from before bulk_write_club_service_availability"""
+    collection = get_club_service_availability_collection()
+
+    for slot in availability:
+        collection.update_one(
+            {"id": str(slot.id), "club_service_id": club_service_id},
+            {"$set": slot.model_dump(exclude={"id"})},
+            session=session,
+        )
+
+
+def weekly_schedule(
+    club_service_id: str, availability_ids: list[uuid.UUID], shift: timedelta
+) -> list[AvailabilityInternal]:
+    start = datetime(2025, 1, 6, 8, tzinfo=pytz.utc) + shift
+
+    return [
+        AvailabilityInternal(
+            id=availability_id,
+            club_service_id=club_service_id,
+            start_time=start + timedelta(hours=2 * index),
+            end_time=start + timedelta(hours=2 * index + 1),
+        )
+        for index, availability_id in enumerate(availability_ids)
+    ]
+
+
+def main():
+    collection = get_club_service_availability_collection()
+    rows = []
+
+    for slot_count in SLOT_COUNTS:
+        club_service_id = str(uuid.uuid4())
+        availability_ids = [uuid.uuid4() for _ in range(slot_count)]
+
+        bulk_write_club_service_availability(
+            availability=weekly_schedule(club_service_id, availability_ids, timedelta()),
+            club_service_id=club_service_id,
+        )
+
+        try:
+            # every run moves the whole schedule, hence every availability is modified
+            shifts = iter(timedelta(minutes=minutes) for minutes in range(1, 1000))
+
+            per_slot_ms = time_call(lambda: per_slot_updates(
+                availability=weekly_schedule(club_service_id, availability_ids, next(shifts)),
+                club_service_id=club_service_id,
+            ))
+            bulk_ms = time_call(lambda: bulk_write_club_service_availability(
+                availability=weekly_schedule(club_service_id, availability_ids, next(shifts)),
+                club_service_id=club_service_id,
+                upsert=False,
+            ))
+
+        finally:
+            collection.delete_many({"club_service_id": club_service_id})
+
+        rows.append((
+            slot_count,
+            f"{per_slot_ms:.1f}",
+            f"{bulk_ms:.1f}",
+            f"{per_slot_ms / bulk_ms:.1f}x",
+        ))
+
+    print("updating every availability of a club service in a transaction")
+    print_table(
+        headers=["availability", "update_one per slot (ms)", "bulk_write (ms)", "speedup"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
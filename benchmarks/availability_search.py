@@ -0,0 +1,150 @@
+"""
+Measures the availability search (find_available_slots) and the overlap check of the
+availability writes (find_club_service_availability_in_range) over SLOT_COUNT availability
+of SERVICE_COUNT club services, without any index and with the indexes INDEX_REGISTRY
+declares for club_service_availability.
+
+Reports the median duration and the number of documents examined (from explain) of:
+- a page of the availability fitting in a one day window, for every club service and for a
+  few of them (the search restricted by service_type/sub_service/club),
+- the availability of a club service overlapping a week (the overlap check).
+
+The availability is seeded in a scratch collection which is dropped afterwards, the
+lookup of the club services is left out.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.availability_search
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+
+from data.db import get_database
+from data.dbapis.clubs.read_queries import build_available_slots_pipeline
+from data.indexes import INDEX_REGISTRY
+from utils.date_time import get_current_utc_datetime
+
+from .utils import print_table, time_call
+
+BENCHMARK_COLLECTION_NAME = "benchmark_club_service_availability"
+SLOT_COUNT = 1_000_000
+SERVICE_COUNT = 2_000
+# the availability spans a year from the start, in slots of 1 or 2 hours
+START = datetime(2025, 1, 1, tzinfo=pytz.utc)
+PAGE_SIZE = 20
+RESTRICTED_SERVICE_COUNT = 20
+
+
+def seed(collection, service_ids: list[str]):
+    collection.drop()
+
+    batch = []
+
+    for _ in range(SLOT_COUNT):
+        start_time = START + timedelta(hours=random.randrange(365 * 24))
+
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "club_service_id": random.choice(service_ids),
+            "start_time": start_time,
+            "end_time": start_time + timedelta(hours=random.choice((1, 2))),
+            "created_on": get_current_utc_datetime(),
+            "deleted_on": None,
+        })
+
+        if len(batch) == 10_000:
+            collection.insert_many(batch)
+            batch = []
+
+
+def search_pipeline(club_service_ids) -> list[dict]:
+    window_start = START + timedelta(days=180)
+
+    # the $lookup stages read the real club services, they are left out along with the
+    # $match dropping the availability without a club service
+    return [
+        stage
+        for stage in build_available_slots_pipeline(
+            start_time=window_start,
+            end_time=window_start + timedelta(days=1),
+            club_service_ids=club_service_ids,
+            page_size=PAGE_SIZE,
+        )
+        if "$lookup" not in stage
+        and "$unwind" not in stage
+        and "club_service" not in stage.get("$match", {})
+    ]
+
+
+def overlap_filter(club_service_id: str) -> dict:
+    week_start = START + timedelta(days=180)
+
+    return {
+        "club_service_id": club_service_id,
+        "start_time": {"$lt": week_start + timedelta(days=7)},
+        "end_time": {"$gt": week_start},
+    }
+
+
+def docs_examined(command: dict) -> int:
+    explain = get_database().command("explain", command, verbosity="executionStats")
+
+    # aggregations nest the stats of the query under their first stage
+    if "stages" in explain:
+        explain = explain["stages"][0]["$cursor"]
+
+    return explain["executionStats"]["totalDocsExamined"]
+
+
+def measure(collection, service_ids: list[str]) -> list[tuple]:
+    rows = []
+    restricted_service_ids = service_ids[:RESTRICTED_SERVICE_COUNT]
+
+    for name, club_service_ids in (
+        ("search, every club service", service_ids),
+        (f"search, {RESTRICTED_SERVICE_COUNT} club services", restricted_service_ids),
+    ):
+        pipeline = search_pipeline(club_service_ids)
+        duration_ms = time_call(lambda: list(collection.aggregate(pipeline)))
+        examined = docs_examined(
+            {"aggregate": collection.name, "pipeline": pipeline, "cursor": {}}
+        )
+
+        rows.append((name, f"{duration_ms:.1f}", examined))
+
+    overlap_query = overlap_filter(service_ids[0])
+    duration_ms = time_call(lambda: list(collection.find(overlap_query)))
+    examined = docs_examined({"find": collection.name, "filter": overlap_query})
+
+    rows.append(("overlap check, one week", f"{duration_ms:.1f}", examined))
+
+    return rows
+
+
+def main():
+    collection = get_database()[BENCHMARK_COLLECTION_NAME]
+    service_ids = [str(uuid.uuid4()) for _ in range(SERVICE_COUNT)]
+
+    seed(collection, service_ids)
+
+    try:
+        rows = [("no index", *row) for row in measure(collection, service_ids)]
+
+        collection.create_indexes(INDEX_REGISTRY["club_service_availability"])
+
+        rows += [("indexed", *row) for row in measure(collection, service_ids)]
+
+    finally:
+        collection.drop()
+
+    print(f"{SLOT_COUNT} availability of {SERVICE_COUNT} club services over a year")
+    print_table(
+        headers=["indexes", "query", "duration (ms)", "documents examined"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Load driver for a burst of logins: CONCURRENCY clients repeatedly request a token
+(one bcrypt verification each) while a probe keeps calling a cheap endpoint (all
+countries).
+
+With bcrypt running on the event loop the logins are served one at a time and every
+login stalls the probe for the full hashing time; with the password hash executor the
+logins run in parallel (up to PASSWORD_HASH_MAX_WORKERS) and the probe latency stays
+close to its unloaded value. The logins turned down with a 503 (more than
+PASSWORD_HASH_MAX_PENDING at once) are counted separately.
+
+usage (from the project root, requires the api to be running):
+    python -m benchmarks.concurrent_logins --phone-number "+880 1711-111111" --password <password>
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .concurrent_requests import PROBE_ROUTE, percentile, run_probe
+from .utils import print_table
+
+CONCURRENCY_LEVELS = (1, 10, 50, 100)
+LOGINS_PER_CLIENT = 5
+LOGIN_ROUTE = "/auth/token"
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    credentials: dict,
+    latencies: list[float],
+    status_codes: list[int],
+):
+    for _ in range(LOGINS_PER_CLIENT):
+        start = time.perf_counter()
+        response = await client.post(LOGIN_ROUTE, data=credentials)
+        latencies.append((time.perf_counter() - start) * 1000)
+        status_codes.append(response.status_code)
+
+
+async def run_level(base_url: str, credentials: dict, concurrency: int) -> tuple:
+    login_latencies, probe_latencies, status_codes = [], [], []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=None,
+        limits=httpx.Limits(max_connections=concurrency + 1),
+    ) as client:
+        probe = asyncio.create_task(run_probe(client, probe_latencies, stop))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_client(client, credentials, login_latencies, status_codes)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe
+
+    return (
+        concurrency,
+        f"{status_codes.count(200) / elapsed:.1f}",
+        status_codes.count(503),
+        f"{percentile(login_latencies, 50):.1f}",
+        f"{percentile(login_latencies, 95):.1f}",
+        f"{percentile(probe_latencies, 50):.1f}",
+        f"{percentile(probe_latencies, 95):.1f}",
+    )
+
+
+async def main(base_url: str, phone_number: str, password: str):
+    credentials = {"username": phone_number, "password": password}
+
+    rows = [
+        await run_level(base_url=base_url, credentials=credentials, concurrency=concurrency)
+        for concurrency in CONCURRENCY_LEVELS
+    ]
+
+    print(f"probe: {PROBE_ROUTE}")
+    print_table(
+        headers=[
+            "concurrency",
+            "logins/s",
+            "503s",
+            "login p50 (ms)",
+            "login p95 (ms)",
+            "probe p50 (ms)",
+            "probe p95 (ms)",
+        ],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--phone-number", required=True, help="phone number of any user")
+    parser.add_argument("--password", required=True, help="password of that user")
+    args = parser.parse_args()
+
+    asyncio.run(main(
+        base_url=args.base_url, phone_number=args.phone_number, password=args.password
+    ))
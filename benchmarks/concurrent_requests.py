@@ -0,0 +1,110 @@
+"""
+Load driver measuring how well the api serves concurrent requests: CONCURRENCY clients
+repeatedly call a heavy endpoint (paginated clubs, one aggregation plus the image url
+lookups) while a probe keeps calling a cheap endpoint (all countries).
+
+When the database calls run on the event loop, every heavy request stalls the probe for
+its full duration; with the calls running on the database executor the probe latency
+stays close to its unloaded value and the overall throughput grows with the concurrency.
+Run it once against the current tree and once against a build without the executor to
+compare.
+
+usage (from the project root, requires the api to be running):
+    python -m benchmarks.concurrent_requests --base-url http://localhost:8000 --token <jwt>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from .utils import print_table
+
+CONCURRENCY_LEVELS = (1, 10, 50)
+REQUESTS_PER_CLIENT = 20
+HEAVY_ROUTE = "/clubs/get-clubs-paginated?page_no=1&page_size=50"
+PROBE_ROUTE = "/country/all"
+PROBE_INTERVAL_IN_SECONDS = 0.05
+
+
+async def run_client(client: httpx.AsyncClient, latencies: list[float]):
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        await client.get(HEAVY_ROUTE)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_probe(
+    client: httpx.AsyncClient, latencies: list[float], stop: asyncio.Event
+):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(PROBE_ROUTE)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(PROBE_INTERVAL_IN_SECONDS)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+async def run_level(base_url: str, token: str, concurrency: int) -> tuple:
+    heavy_latencies, probe_latencies = [], []
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=None,
+        limits=httpx.Limits(max_connections=concurrency + 1),
+    ) as client:
+        probe = asyncio.create_task(run_probe(client, probe_latencies, stop))
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(run_client(client, heavy_latencies) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe
+
+    return (
+        concurrency,
+        f"{len(heavy_latencies) / elapsed:.1f}",
+        f"{percentile(heavy_latencies, 50):.1f}",
+        f"{percentile(heavy_latencies, 95):.1f}",
+        f"{percentile(probe_latencies, 50):.1f}",
+        f"{percentile(probe_latencies, 95):.1f}",
+    )
+
+
+async def main(base_url: str, token: str):
+    rows = [
+        await run_level(base_url=base_url, token=token, concurrency=concurrency)
+        for concurrency in CONCURRENCY_LEVELS
+    ]
+
+    print_table(
+        headers=[
+            "concurrency",
+            "requests/s",
+            "heavy p50 (ms)",
+            "heavy p95 (ms)",
+            "probe p50 (ms)",
+            "probe p95 (ms)",
+        ],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="access token of any user")
+    args = parser.parse_args()
+
+    asyncio.run(main(base_url=args.base_url, token=args.token))
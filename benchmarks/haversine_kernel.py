@@ -0,0 +1,118 @@
+"""
+Measures the throughput of the haversine implementations in logic/logistics/haversine.py:
+the per-pair `haversine` called in a python loop, the batch `haversine_one_to_many` and
+the N x M `haversine_many_to_many`, with and without numpy.
+
+Does not need a database.
+
+usage (from the project root): python -m benchmarks.haversine_kernel
+"""
+import random
+from unittest import mock
+
+from logic.logistics import haversine as haversine_module
+from logic.logistics.haversine import (
+    haversine,
+    haversine_many_to_many,
+    haversine_one_to_many,
+)
+
+from .utils import print_table, time_call
+
+POINT_COUNTS = (1_000, 10_000, 100_000, 1_000_000)
+# pickup points x trucks
+MATRIX_SHAPES = ((10, 1_000), (100, 10_000), (1_000, 10_000))
+
+
+def random_points(count: int) -> tuple[list[float], list[float]]:
+    lons = [random.uniform(-180, 180) for _ in range(count)]
+    lats = [random.uniform(-90, 90) for _ in range(count)]
+    return lons, lats
+
+
+def format_throughput(count: int, milliseconds: float) -> str:
+    return f"{count / (milliseconds / 1000) / 1_000_000:.2f}"
+
+
+def benchmark_one_to_many():
+    rows = []
+
+    for count in POINT_COUNTS:
+        lons, lats = random_points(count)
+
+        loop_ms = time_call(
+            lambda: [haversine(0.0, 0.0, lon, lat) for lon, lat in zip(lons, lats)],
+            repeat=3,
+        )
+        batch_ms = time_call(
+            lambda: haversine_one_to_many(lon=0.0, lat=0.0, lons=lons, lats=lats),
+            repeat=3,
+        )
+
+        with mock.patch.object(haversine_module, "np", None):
+            fallback_ms = time_call(
+                lambda: haversine_one_to_many(lon=0.0, lat=0.0, lons=lons, lats=lats),
+                repeat=3,
+            )
+
+        rows.append((
+            count,
+            format_throughput(count, loop_ms),
+            format_throughput(count, fallback_ms),
+            format_throughput(count, batch_ms),
+            f"{loop_ms / batch_ms:.1f}x",
+        ))
+
+    print("one origin vs N destinations (million distances per second)")
+    print_table(
+        headers=["points", "python loop", "batch (fallback)", "batch (numpy)", "speedup"],
+        rows=rows,
+    )
+
+
+def benchmark_many_to_many():
+    rows = []
+
+    for origins, destinations in MATRIX_SHAPES:
+        lons1, lats1 = random_points(origins)
+        lons2, lats2 = random_points(destinations)
+
+        nested_loop_ms = time_call(
+            lambda: [
+                [haversine(lon1, lat1, lon2, lat2) for lon2, lat2 in zip(lons2, lats2)]
+                for lon1, lat1 in zip(lons1, lats1)
+            ],
+            repeat=1,
+        )
+        matrix_ms = time_call(
+            lambda: haversine_many_to_many(
+                lons1=lons1, lats1=lats1, lons2=lons2, lats2=lats2
+            ),
+            repeat=3,
+        )
+
+        rows.append((
+            f"{origins} x {destinations}",
+            f"{nested_loop_ms:.1f}",
+            f"{matrix_ms:.1f}",
+            f"{nested_loop_ms / matrix_ms:.1f}x",
+        ))
+
+    print("N pickup points x M trucks")
+    print_table(
+        headers=["matrix", "nested python loop (ms)", "batch (ms)", "speedup"],
+        rows=rows,
+    )
+
+
+def main():
+    if haversine_module.np is None:
+        print("numpy is not installed, the batch results show the pure python fallback")
+
+    benchmark_one_to_many()
+    print()
+    benchmark_many_to_many()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Load driver replaying CLIENTS clients that each view the same listing page VIEWS times:
+the listing is requested once, then every image it links is requested on every view.
+Three kinds of clients are compared:
+- "no cache": refetches every image on every view, as the clients did before the image
+  responses carried caching headers,
+- "revalidating": keeps the images with their ETag and revalidates them with If-None-Match
+  (answered with a 304, without an image lookup),
+- "immutable": keeps the images as their Cache-Control allows, only the first view
+  requests them.
+
+Reports the image requests sent, the image bytes received and the median time of a view.
+
+usage (from the project root, requires the api to be running):
+    python -m benchmarks.image_caching --base-url http://localhost:8000 --token <jwt>
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from .utils import print_table
+
+CLIENTS = 10
+VIEWS = 5
+LISTING_ROUTE = "/clubs/get-clubs-paginated?page_no=1&page_size=20"
+
+
+def listing_image_urls(listing: dict) -> list[str]:
+    return [
+        image_url
+        for club in listing["data"]
+        for image_url in [club.get("logo"), *(club.get("images") or [])]
+        if image_url
+    ]
+
+
+async def view(
+    client: httpx.AsyncClient, image_urls: list[str], kind: str, cached: dict
+) -> tuple[int, int]:
+    """requests the images of one view, returns the requests sent and the bytes received"""
+    if kind == "immutable":
+        image_urls = [image_url for image_url in image_urls if image_url not in cached]
+
+    async def get(image_url: str) -> int:
+        headers = {}
+
+        if kind == "revalidating" and image_url in cached:
+            headers["If-None-Match"] = cached[image_url]
+
+        response = await client.get(image_url, headers=headers)
+
+        if response.status_code == 200:
+            cached[image_url] = response.headers.get("etag")
+
+        return len(response.content)
+
+    received = await asyncio.gather(*(get(image_url) for image_url in image_urls))
+
+    return len(image_urls), sum(received)
+
+
+async def run_client(
+    base_url: str, token: str, image_urls: list[str], kind: str, view_latencies: list[float]
+) -> tuple[int, int]:
+    requests, received, cached = 0, 0, {}
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"Authorization": f"Bearer {token}"}, timeout=60
+    ) as client:
+        for _ in range(VIEWS):
+            start = time.perf_counter()
+            view_requests, view_received = await view(client, image_urls, kind, cached)
+            view_latencies.append((time.perf_counter() - start) * 1000)
+
+            requests += view_requests
+            received += view_received
+
+    return requests, received
+
+
+async def main(base_url: str, token: str):
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        response = await client.get(LISTING_ROUTE)
+        response.raise_for_status()
+
+    image_urls = listing_image_urls(response.json())
+    rows = []
+
+    for kind in ("no cache", "revalidating", "immutable"):
+        view_latencies = []
+
+        totals = await asyncio.gather(*(
+            run_client(base_url, token, image_urls, kind, view_latencies)
+            for _ in range(CLIENTS)
+        ))
+
+        rows.append((
+            kind,
+            sum(requests for requests, _ in totals),
+            f"{sum(received for _, received in totals) / (1024 * 1024):.1f}",
+            f"{statistics.median(view_latencies):.1f}",
+        ))
+
+    print(f"{CLIENTS} clients viewing a listing of {len(image_urls)} images {VIEWS} times")
+    print_table(
+        headers=["client", "image requests", "received (MiB)", "median view (ms)"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    args = parser.parse_args()
+
+    asyncio.run(main(base_url=args.base_url, token=args.token))
@@ -0,0 +1,86 @@
+"""
+Compares the two ways of writing the images of an upload to IMAGES_UPLOAD_FOLDER: the
+former save_image loop (one image after the other, an aiofiles read and write per 1024
+bytes) against write_image_files (IMAGE_SAVE_MAX_CONCURRENCY images at a time, each copied
+in a single worker thread with IMAGE_COPY_BUFFER_SIZE sized reads and writes).
+
+The upload is IMAGE_COUNT images of IMAGE_SIZE bytes spooled by starlette to temporary
+files, the images are written to a scratch directory which is removed afterwards. The
+database record of the images is left out.
+
+usage (from the project root):
+    python -m benchmarks.image_ingest
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+import aiofiles
+from starlette.datastructures import UploadFile
+
+from config import IMAGE_COPY_BUFFER_SIZE, IMAGE_SAVE_MAX_CONCURRENCY
+from utils.image_management import write_image_files
+
+from .utils import print_table, time_call
+
+IMAGE_COUNT = 10
+IMAGE_SIZE = 5 * 1024 * 1024
+# the size starlette spools a multipart file in memory before rolling it to disk
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def build_upload() -> list[UploadFile]:
+    image_files = []
+
+    for index in range(IMAGE_COUNT):
+        file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        file.write(os.urandom(IMAGE_SIZE))
+        file.seek(0)
+
+        image_files.append(UploadFile(file=file, filename=f"image_{index}.jpg"))
+
+    return image_files
+
+
+async def legacy_write_image_files(image_files: list[UploadFile], file_paths: list[str]):
+    """the write path of save_image before write_image_files"""
+    for image_file, file_path in zip(image_files, file_paths):
+        await image_file.seek(0)
+
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await image_file.read(1024):
+                await buffer.write(chunk)
+
+
+def main():
+    image_files = build_upload()
+    directory = tempfile.mkdtemp()
+    file_paths = [os.path.join(directory, image_file.filename) for image_file in image_files]
+
+    try:
+        legacy_ms = time_call(
+            lambda: asyncio.run(legacy_write_image_files(image_files, file_paths)), repeat=3
+        )
+        concurrent_ms = time_call(
+            lambda: asyncio.run(write_image_files(image_files, file_paths)), repeat=3
+        )
+
+    finally:
+        shutil.rmtree(directory)
+
+        for image_file in image_files:
+            image_file.file.close()
+
+    print(
+        f"writing an upload of {IMAGE_COUNT} images of {IMAGE_SIZE // (1024 * 1024)} MiB "
+        f"(buffer={IMAGE_COPY_BUFFER_SIZE} bytes, concurrency={IMAGE_SAVE_MAX_CONCURRENCY})"
+    )
+    print_table(
+        headers=["1024 byte chunks, one by one (ms)", "write_image_files (ms)", "speedup"],
+        rows=[(f"{legacy_ms:.1f}", f"{concurrent_ms:.1f}", f"{legacy_ms / concurrent_ms:.1f}x")],
+    )
+
+
+if __name__ == "__main__":
+    main()
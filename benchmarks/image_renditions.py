@@ -0,0 +1,102 @@
+"""
+Measures the bytes served for the images of a page of a listing (clubs, trucks, horses
+for sale or for rent) when the listings link the original uploads against their
+renditions (see utils/image_renditions.py), and the time it takes the rendition workers
+to build the renditions of an upload.
+
+The page is PAGE_SIZE listings of IMAGES_PER_LISTING phone-sized photos (JPEG, generated
+with a smooth noise so that they compress like photos), saved in a scratch directory
+which is removed afterwards.
+
+usage (from the project root):
+    python -m benchmarks.image_renditions
+"""
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+
+from models.uploaded_image import ImageSize
+from utils.image_renditions import (
+    LISTING_IMAGE_SIZE,
+    build_image_renditions,
+    get_rendition_path,
+)
+
+from .utils import print_table, time_call
+
+PAGE_SIZE = 20
+IMAGES_PER_LISTING = 3
+PHOTO_DIMENSIONS = (4032, 3024)
+PHOTO_QUALITY = 90
+# distinct photos, reused across the listings of the page
+PHOTO_COUNT = 6
+
+
+def generate_photo(file_path: str, seed: int):
+    # low frequency noise scaled up (the shapes) with a fine noise on top (the texture)
+    channels = [
+        Image.effect_noise((64, 48), 60 + 10 * (seed + channel)).resize(
+            PHOTO_DIMENSIONS, Image.Resampling.BICUBIC
+        )
+        for channel in range(3)
+    ]
+    photo = Image.merge("RGB", channels)
+    texture = Image.effect_noise(PHOTO_DIMENSIONS, 8).convert("RGB")
+
+    Image.blend(photo, texture, 0.15).save(file_path, "JPEG", quality=PHOTO_QUALITY)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+
+    try:
+        photo_paths = [
+            os.path.join(directory, f"photo_{index}.jpg") for index in range(PHOTO_COUNT)
+        ]
+
+        for index, photo_path in enumerate(photo_paths):
+            generate_photo(photo_path, seed=index)
+
+        def build_renditions():
+            for rendition_path in os.listdir(directory):
+                if rendition_path.endswith(".webp"):
+                    os.remove(os.path.join(directory, rendition_path))
+
+            for photo_path in photo_paths:
+                build_image_renditions(photo_path)
+
+        build_ms = time_call(build_renditions, repeat=3) / PHOTO_COUNT
+
+        page_photo_paths = [
+            photo_paths[index % PHOTO_COUNT]
+            for index in range(PAGE_SIZE * IMAGES_PER_LISTING)
+        ]
+
+        rows = [(
+            "original",
+            f"{sum(os.path.getsize(path) for path in page_photo_paths) / 1024:.0f}",
+        )]
+
+        for size in ImageSize:
+            page_bytes = sum(
+                os.path.getsize(get_rendition_path(path, size)) for path in page_photo_paths
+            )
+            label = f"{size.value} (listings)" if size == LISTING_IMAGE_SIZE else size.value
+
+            rows.append((label, f"{page_bytes / 1024:.0f}"))
+
+    finally:
+        shutil.rmtree(directory)
+
+    print(
+        f"a page of {PAGE_SIZE} listings of {IMAGES_PER_LISTING} "
+        f"{PHOTO_DIMENSIONS[0]}x{PHOTO_DIMENSIONS[1]} photos"
+    )
+    print_table(headers=["images", "bytes served (KiB)"], rows=rows)
+    print(f"\nbuilding the renditions of a photo: {build_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
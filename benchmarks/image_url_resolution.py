@@ -0,0 +1,82 @@
+"""
+Compares the ways of resolving the image urls of a listing page (e.g. 20 clubs with a
+logo and 5 images each): the legacy one query per image, the batched single $in query
+with a cold image_path_cache and the warm image_path_cache.
+
+Scratch records are inserted in the uploaded images collection and removed afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.image_url_resolution
+"""
+from data.dbapis.uploaded_imges.read_queries import (
+    get_uploaded_image_by_id,
+    uploaded_images_collection,
+)
+from utils.image_management import (
+    build_image_url,
+    generate_image_urls,
+    image_path_cache,
+)
+
+from .utils import print_table, time_call
+
+# listing items x images per item
+LISTING_SHAPES = ((20, 6), (100, 6))
+
+
+def legacy_generate_image_urls(image_ids: list[str]) -> list[str]:
+    return [
+        build_image_url(
+            image_id=image_id,
+            image_path=get_uploaded_image_by_id(uploaded_image_id=image_id).image_path,
+        )
+        for image_id in image_ids
+    ]
+
+
+def generate_image_urls_cold(image_ids: list[str]) -> list[str]:
+    image_path_cache.clear()
+    return generate_image_urls(image_ids=image_ids)
+
+
+def main():
+    rows = []
+
+    for items, images_per_item in LISTING_SHAPES:
+        image_count = items * images_per_item
+
+        result = uploaded_images_collection.insert_many(
+            [{"image_path": f"benchmark/image_{i}.jpg"} for i in range(image_count)]
+        )
+        image_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+
+        try:
+            legacy_ms = time_call(lambda: legacy_generate_image_urls(image_ids))
+            cold_ms = time_call(lambda: generate_image_urls_cold(image_ids))
+            warm_ms = time_call(lambda: generate_image_urls(image_ids=image_ids))
+        finally:
+            uploaded_images_collection.delete_many({"_id": {"$in": result.inserted_ids}})
+            image_path_cache.clear()
+
+        rows.append((
+            f"{items} x {images_per_item}",
+            image_count,
+            f"{legacy_ms:.1f}",
+            f"{cold_ms:.1f}",
+            f"{warm_ms:.2f}",
+        ))
+
+    print_table(
+        headers=[
+            "listing",
+            "images",
+            "query per image (ms)",
+            "single $in query (ms)",
+            "warm cache (ms)",
+        ],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compares the latency of a page deep in a collection with offset pagination ($skip) and
+keyset pagination (the cursor of the previous page), for page 1 and page 10,000: the
+former grows with the position of the page while the latter stays flat.
+
+The documents are seeded in a scratch collection which is dropped afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.keyset_pagination
+"""
+from pymongo import ASCENDING
+
+from data.db import get_database
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    build_generic_get_query_pipeline,
+)
+from logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic import (
+    format_sort_strings,
+)
+from models.generic_get_query_with_pagination import (
+    GenericGetQueryWithPaginationDTO,
+    Pagination,
+)
+from models.trainers import TrainerInternal
+
+from .utils import print_table, time_call
+
+PAGE_SIZE = 20
+PAGE_NOS = (1, 10_000)
+DOCUMENT_COUNT = PAGE_SIZE * max(PAGE_NOS)
+SORT_STRINGS = ["id$asc"]
+
+
+def seed(collection):
+    collection.drop()
+    collection.insert_many(
+        [{"id": f"{i:012d}", "full_name": f"trainer {i}"} for i in range(DOCUMENT_COUNT)]
+    )
+    collection.create_index([("id", ASCENDING)], unique=True)
+
+
+def offset_pipeline(page_no: int) -> list[dict]:
+    return build_generic_get_query_pipeline(GenericGetQueryWithPaginationDTO(
+        final_output_model=TrainerInternal,
+        sorts=format_sort_strings(SORT_STRINGS),
+        pagination=Pagination(page_no=page_no, page_size=PAGE_SIZE),
+    ))
+
+
+def keyset_pipeline(page_no: int) -> list[dict]:
+    # the cursor of the previous page holds the id of its last document
+    last_id = f"{(page_no - 1) * PAGE_SIZE - 1:012d}"
+
+    return build_generic_get_query_pipeline(GenericGetQueryWithPaginationDTO(
+        final_output_model=TrainerInternal,
+        sorts=format_sort_strings(SORT_STRINGS),
+        pagination=Pagination(page_no=1, page_size=PAGE_SIZE),
+        keyset_values=[last_id] if page_no > 1 else None,
+    ))
+
+
+def main():
+    collection = get_database()["benchmark_keyset_pagination"]
+    seed(collection)
+    rows = []
+
+    try:
+        for page_no in PAGE_NOS:
+            offset_ms = time_call(
+                lambda: list(collection.aggregate(offset_pipeline(page_no))), repeat=5
+            )
+            keyset_ms = time_call(
+                lambda: list(collection.aggregate(keyset_pipeline(page_no))), repeat=5
+            )
+
+            rows.append((page_no, f"{offset_ms:.1f}", f"{keyset_ms:.1f}"))
+    finally:
+        collection.drop()
+
+    print(f"{DOCUMENT_COUNT} documents, pages of {PAGE_SIZE}")
+    print_table(headers=["page", "offset (ms)", "keyset (ms)"], rows=rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Measures the latency of /trainers/get-trainers-paginated with logging fully on (DEBUG)
+and off, for a few page sizes, using an in-process TestClient so that the numbers
+aren't blurred by the network.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.logging_overhead --token <jwt of a user>
+"""
+import argparse
+import logging
+
+from fastapi.testclient import TestClient
+
+from logging_config import log
+from main import app
+
+from .utils import print_table, time_call
+
+PAGE_SIZES = (10, 100, 1_000)
+REQUESTS_PER_RUN = 20
+
+
+def run_requests(client: TestClient, token: str, page_size: int):
+    for _ in range(REQUESTS_PER_RUN):
+        response = client.get(
+            "/trainers/get-trainers-paginated",
+            params={"page_no": 1, "page_size": page_size},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response.raise_for_status()
+
+
+def main(token: str):
+    client = TestClient(app)
+    initial_level = log.level
+    rows = []
+
+    for page_size in PAGE_SIZES:
+        timings = {}
+
+        for label, level in (("on", logging.DEBUG), ("off", logging.CRITICAL)):
+            log.setLevel(level)
+            timings[label] = time_call(
+                lambda: run_requests(client=client, token=token, page_size=page_size),
+                repeat=3,
+            )
+
+        log.setLevel(initial_level)
+
+        rows.append((
+            page_size,
+            f"{timings['on'] / REQUESTS_PER_RUN:.2f}",
+            f"{timings['off'] / REQUESTS_PER_RUN:.2f}",
+            f"{(timings['on'] - timings['off']) / timings['on'] * 100:.1f}%",
+        ))
+
+    print_table(
+        headers=[
+            "page size",
+            "logging on (ms/request)",
+            "logging off (ms/request)",
+            "share spent logging",
+        ],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--token", required=True, help="access token of any user")
+    args = parser.parse_args()
+
+    main(token=args.token)
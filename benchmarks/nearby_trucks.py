@@ -0,0 +1,103 @@
+"""
+Compares the legacy nearby trucks search (read every truck and filter it in python with
+the haversine formula) against the $geoNear search backed by the 2dsphere index, for
+10k and 100k trucks scattered around a city.
+
+The trucks are seeded in a scratch collection which is dropped afterwards.
+
+usage (from the project root, requires a running database): python -m benchmarks.nearby_trucks
+"""
+import random
+
+from pymongo import GEOSPHERE
+
+from data.db import get_database
+from data.dbapis.truck.read_queries import get_nearby_trucks_pipeline
+from logic.logistics.haversine import haversine
+
+from .utils import print_table, time_call
+
+BENCHMARK_COLLECTION_NAME = "benchmark_trucks"
+TRUCK_COUNTS = (10_000, 100_000)
+# search origin (riyadh), the trucks are scattered within +/- 2 degrees of it
+ORIGIN_LAT, ORIGIN_LONG = 24.7136, 46.6753
+SPREAD_IN_DEGREES = 2.0
+RADIUS_IN_KM = 10
+
+
+def seed_trucks(collection, count: int):
+    collection.drop()
+
+    trucks = []
+    for i in range(count):
+        lat = ORIGIN_LAT + random.uniform(-SPREAD_IN_DEGREES, SPREAD_IN_DEGREES)
+        long = ORIGIN_LONG + random.uniform(-SPREAD_IN_DEGREES, SPREAD_IN_DEGREES)
+
+        trucks.append({
+            "registration_number": f"BENCHMARK-{i}",
+            "name": f"benchmark truck {i}",
+            "images": [],
+            "location": {"lat": lat, "long": long},
+            "geo_location": {"type": "Point", "coordinates": [long, lat]},
+        })
+
+    collection.insert_many(trucks)
+    collection.create_index([("geo_location", GEOSPHERE)])
+
+
+def legacy_search(collection) -> list[dict]:
+    nearby_trucks = []
+
+    for truck in collection.find({}):
+        distance = haversine(
+            lon1=ORIGIN_LONG,
+            lat1=ORIGIN_LAT,
+            lon2=truck["location"]["long"],
+            lat2=truck["location"]["lat"],
+        )
+
+        if distance <= RADIUS_IN_KM:
+            nearby_trucks.append(truck)
+
+    return nearby_trucks
+
+
+def geo_near_search(collection) -> list[dict]:
+    pipeline = get_nearby_trucks_pipeline(
+        lat=ORIGIN_LAT, long=ORIGIN_LONG, radius=RADIUS_IN_KM
+    )
+
+    return list(collection.aggregate(pipeline))
+
+
+def main():
+    collection = get_database()[BENCHMARK_COLLECTION_NAME]
+
+    rows = []
+
+    try:
+        for count in TRUCK_COUNTS:
+            seed_trucks(collection=collection, count=count)
+
+            matched_trucks = len(geo_near_search(collection))
+            legacy_ms = time_call(lambda: legacy_search(collection))
+            geo_near_ms = time_call(lambda: geo_near_search(collection))
+
+            rows.append((
+                count,
+                matched_trucks,
+                f"{legacy_ms:.1f}",
+                f"{geo_near_ms:.1f}",
+                f"{legacy_ms / geo_near_ms:.1f}x",
+            ))
+    finally:
+        collection.drop()
+
+    print_table(
+        headers=["trucks", "within radius", "legacy (ms)", "$geoNear (ms)", "speedup"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Compares the pipelines of the generic paginated query engine: the legacy order (every
+$lookup before $match/$sort/$skip/$limit) against the current one (primary filters, sorts
+and pagination before the lookups), for trainers with their certifications and club
+services with their availability, i.e. primary collections with large child collections.
+
+The documents are seeded in scratch collections which are dropped afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.paginated_query_pushdown
+"""
+import random
+import uuid
+from typing import Annotated
+
+from pymongo import ASCENDING
+
+from data.db import get_database
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    build_generic_get_query_pipeline,
+    get_lookup_stages,
+    get_match_stage,
+    get_pagination_stages,
+    get_sort_stages,
+)
+from logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic import (
+    format_filter_strings,
+    format_sort_strings,
+)
+from models.clubs.service_internal import AvailabilityInternal, ClubServiceInternal
+from models.generic_get_query_with_pagination import (
+    GenericGetQueryWithPaginationDTO,
+    Lookup,
+    Pagination,
+)
+from models.trainer_certification import TrainerCertificationInternal
+from models.trainers import TrainerInternal
+
+from .utils import print_table, time_call
+
+PRIMARY_COUNT = 20_000
+CHILDREN_PER_PRIMARY = 20
+PAGE_SIZE = 20
+
+
+class BenchmarkTrainer(TrainerInternal):
+    certifications: Annotated[
+        list[TrainerCertificationInternal],
+        Lookup(
+            from_collection="benchmark_trainer_certifications",
+            local_field="id",
+            foreign_field="trainer_id",
+            as_key_name="certifications",
+            is_one_to_one=False,
+        ),
+    ] = []
+
+
+class BenchmarkClubService(ClubServiceInternal):
+    availability: Annotated[
+        list[AvailabilityInternal],
+        Lookup(
+            from_collection="benchmark_club_service_availability",
+            local_field="id",
+            foreign_field="club_service_id",
+            as_key_name="availability",
+            is_one_to_one=False,
+        ),
+    ] = []
+
+
+# primary collection, child collection, foreign key, output model, filters, sorts
+SCENARIOS = (
+    (
+        "benchmark_trainers",
+        "benchmark_trainer_certifications",
+        "trainer_id",
+        BenchmarkTrainer,
+        ["years_of_experience$gte$5"],
+        ["full_name$asc"],
+    ),
+    (
+        "benchmark_club_services",
+        "benchmark_club_service_availability",
+        "club_service_id",
+        BenchmarkClubService,
+        ["no_of_services$gte$5"],
+        ["sub_service$asc"],
+    ),
+)
+
+
+def seed(primary_collection, child_collection, foreign_key: str):
+    primary_collection.drop()
+    child_collection.drop()
+
+    primary_ids = [str(uuid.uuid4()) for _ in range(PRIMARY_COUNT)]
+
+    primary_collection.insert_many([
+        {
+            "id": primary_id,
+            "full_name": f"trainer {random.randint(0, PRIMARY_COUNT)}",
+            "years_of_experience": random.randint(0, 10),
+            "sub_service": f"sub service {random.randint(0, PRIMARY_COUNT)}",
+            "no_of_services": random.randint(0, 10),
+        }
+        for primary_id in primary_ids
+    ])
+    child_collection.insert_many([
+        {"id": str(uuid.uuid4()), foreign_key: primary_id, "name": f"child {i}"}
+        for primary_id in primary_ids
+        for i in range(CHILDREN_PER_PRIMARY)
+    ])
+
+    # the same indexes the registry declares for the real child collections
+    child_collection.create_index([(foreign_key, ASCENDING)])
+
+
+def legacy_pipeline(generic_get_query_dto: GenericGetQueryWithPaginationDTO) -> list[dict]:
+    pipeline = get_lookup_stages(lookups=generic_get_query_dto.lookups)
+
+    if generic_get_query_dto.filters:
+        pipeline.append(get_match_stage(filters=generic_get_query_dto.filters))
+
+    pipeline.extend(get_sort_stages(generic_get_query_dto=generic_get_query_dto))
+    pipeline.extend(get_pagination_stages(generic_get_query_dto=generic_get_query_dto))
+
+    return pipeline
+
+
+def main():
+    database = get_database()
+    rows = []
+
+    for primary_name, child_name, foreign_key, model, f, s in SCENARIOS:
+        primary_collection = database[primary_name]
+        child_collection = database[child_name]
+
+        seed(primary_collection, child_collection, foreign_key)
+
+        try:
+            for filter_strings in (None, f):
+                generic_get_query_dto = GenericGetQueryWithPaginationDTO(
+                    final_output_model=model,
+                    filters=format_filter_strings(filter_strings) if filter_strings else None,
+                    sorts=format_sort_strings(s + ["id$asc"]),
+                    pagination=Pagination(page_no=1, page_size=PAGE_SIZE),
+                )
+
+                legacy_ms = time_call(lambda: list(primary_collection.aggregate(
+                    legacy_pipeline(generic_get_query_dto), allowDiskUse=True
+                )), repeat=3)
+                pushdown_ms = time_call(lambda: list(primary_collection.aggregate(
+                    build_generic_get_query_pipeline(generic_get_query_dto), allowDiskUse=True
+                )), repeat=3)
+
+                rows.append((
+                    primary_name,
+                    filter_strings or "-",
+                    f"{legacy_ms:.1f}",
+                    f"{pushdown_ms:.1f}",
+                    f"{legacy_ms / pushdown_ms:.1f}x",
+                ))
+        finally:
+            primary_collection.drop()
+            child_collection.drop()
+
+    print(
+        f"{PRIMARY_COUNT} primary documents with {CHILDREN_PER_PRIMARY} children each, "
+        f"first page of {PAGE_SIZE}"
+    )
+    print_table(
+        headers=["collection", "filters", "lookups first (ms)", "pushdown (ms)", "speedup"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares the ways a client gets a page along with the total count of the matching
+documents: the page and a second, unpaginated call (which makes the lookups for every
+matching document), against with_total (a single $facet aggregation), and the estimated
+document count used when there are no filters.
+
+The documents are seeded in scratch collections which are dropped afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.paginated_total_count
+"""
+from data.db import get_database
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    build_generic_get_query_facet_pipeline,
+    build_generic_get_query_pipeline,
+)
+from logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic import (
+    format_filter_strings,
+    format_sort_strings,
+)
+from models.generic_get_query_with_pagination import (
+    GenericGetQueryWithPaginationDTO,
+    Pagination,
+)
+
+from .paginated_query_pushdown import PAGE_SIZE, PRIMARY_COUNT, BenchmarkTrainer, seed
+from .utils import print_table, time_call
+
+FILTER_STRINGS = ["years_of_experience$gte$5"]
+SORT_STRINGS = ["full_name$asc", "id$asc"]
+
+
+def get_dto(filter_strings, with_pagination: bool = True, **kwargs):
+    return GenericGetQueryWithPaginationDTO(
+        final_output_model=BenchmarkTrainer,
+        filters=format_filter_strings(filter_strings) if filter_strings else None,
+        sorts=format_sort_strings(SORT_STRINGS),
+        pagination=Pagination(page_no=1, page_size=PAGE_SIZE) if with_pagination else None,
+        **kwargs,
+    )
+
+
+def two_calls(collection, filter_strings):
+    page = list(collection.aggregate(build_generic_get_query_pipeline(get_dto(filter_strings))))
+    total_count = len(list(collection.aggregate(
+        build_generic_get_query_pipeline(get_dto(filter_strings, with_pagination=False)),
+        allowDiskUse=True,
+    )))
+
+    return page, total_count
+
+
+def single_facet(collection, filter_strings):
+    return next(collection.aggregate(build_generic_get_query_facet_pipeline(
+        get_dto(filter_strings, with_total=True, facet_fields=["years_of_experience"]),
+        with_count=True,
+    ), allowDiskUse=True))
+
+
+def estimated_count(collection):
+    page = list(collection.aggregate(build_generic_get_query_pipeline(get_dto(None))))
+
+    return page, collection.estimated_document_count()
+
+
+def main():
+    database = get_database()
+    primary_collection = database["benchmark_trainers"]
+    child_collection = database["benchmark_trainer_certifications"]
+
+    seed(primary_collection, child_collection, "trainer_id")
+    rows = []
+
+    try:
+        for filter_strings in (None, FILTER_STRINGS):
+            rows.append((
+                filter_strings or "-",
+                f"{time_call(lambda: two_calls(primary_collection, filter_strings), repeat=3):.1f}",
+                f"{time_call(lambda: single_facet(primary_collection, filter_strings), repeat=3):.1f}",
+                f"{time_call(lambda: estimated_count(primary_collection), repeat=3):.1f}"
+                if not filter_strings else "-",
+            ))
+    finally:
+        primary_collection.drop()
+        child_collection.drop()
+
+    print(f"{PRIMARY_COUNT} trainers, first page of {PAGE_SIZE} along with the total count")
+    print_table(
+        headers=["filters", "page + unpaginated call (ms)", "$facet (ms)", "estimated (ms)"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Compares reading whole documents against reading them projected on the fields of the
+model they are read into (see data/projections.py): a page of trainers with their
+certifications from the generic paginated query engine, and single users the way
+find_user reads them. The seeded documents carry the keys real documents accumulate
+but the models don't declare (mongodb's `_id` and the fields of former versions).
+
+Reports the bytes the server returns (the size of the raw BSON documents), the duration
+of the query and the duration of the validation into the models.
+
+The documents are seeded in scratch collections which are dropped afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.projection_pushdown
+"""
+import random
+import uuid
+from typing import Annotated
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+from data.db import get_database
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    build_generic_get_query_pipeline,
+)
+from data.projections import get_projection
+from logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic import (
+    format_sort_strings,
+)
+from models.generic_get_query_with_pagination import (
+    GenericGetQueryWithPaginationDTO,
+    Lookup,
+    Pagination,
+)
+from models.trainer_certification import TrainerCertificationInternal
+from models.trainers import TrainerInternal
+from models.user import UserInternal
+
+from .utils import print_table, time_call
+
+TRAINER_COUNT = 5_000
+CERTIFICATIONS_PER_TRAINER = 10
+USER_COUNT = 5_000
+PAGE_SIZE = 100
+USER_LOOKUPS = 500
+# the size of the undeclared keys of every document
+LEGACY_FIELD_SIZE = 2_048
+
+
+class BenchmarkTrainer(TrainerInternal):
+    certifications: Annotated[
+        list[TrainerCertificationInternal],
+        Lookup(
+            from_collection="benchmark_trainer_certifications",
+            local_field="id",
+            foreign_field="trainer_id",
+            as_key_name="certifications",
+            is_one_to_one=False,
+        ),
+    ] = []
+
+
+def legacy_fields() -> dict:
+    return {
+        "legacy_profile": "x" * LEGACY_FIELD_SIZE,
+        "legacy_tags": [f"tag {i}" for i in range(20)],
+    }
+
+
+def seed(database):
+    trainers = database["benchmark_trainers"]
+    certifications = database["benchmark_trainer_certifications"]
+    users = database["benchmark_users"]
+
+    for collection in (trainers, certifications, users):
+        collection.drop()
+
+    trainer_documents = [
+        TrainerInternal(
+            full_name=f"trainer {i}",
+            phone_number="+966 50 000 0000",
+            email_address=f"trainer{i}@example.com",
+            bio="a trainer seeded by the projection benchmark",
+            club_affiliation_number=f"{i}",
+            available_services=["INDIVIDUAL_TRAINING_SESSIONS"],
+            availability=["MONDAY"],
+            preferred_time_slot=["MORNING"],
+            specializations=["dressage"],
+            years_of_experience=random.randint(0, 10),
+            user_id=str(uuid.uuid4()),
+            club_id=str(uuid.uuid4()),
+        ).model_dump() | legacy_fields()
+        for i in range(TRAINER_COUNT)
+    ]
+    trainers.insert_many(trainer_documents)
+
+    certifications.insert_many([
+        TrainerCertificationInternal(
+            name=f"certification {i}", number=f"{i}", trainer_id=trainer["id"]
+        ).model_dump() | legacy_fields()
+        for trainer in trainer_documents
+        for i in range(CERTIFICATIONS_PER_TRAINER)
+    ])
+    certifications.create_index("trainer_id")
+
+    users.insert_many([
+        UserInternal(
+            full_name=f"user {i}",
+            email_address=f"user{i}@example.com",
+            phone_number=f"+966 50 {i:07d}",
+            hashed_password="$2b$12$" + "x" * 53,
+        ).model_dump() | legacy_fields()
+        for i in range(USER_COUNT)
+    ])
+    users.create_index("email_address")
+
+    return trainers, certifications, users
+
+
+def unprojected(pipeline: list[dict]) -> list[dict]:
+    """the pipeline without the projections, i.e. the one from before data/projections.py"""
+    stages = []
+
+    for stage in pipeline:
+        if "$project" in stage:
+            continue
+
+        if "$lookup" in stage:
+            stage = {"$lookup": {k: v for k, v in stage["$lookup"].items() if k != "pipeline"}}
+
+        stages.append(stage)
+
+    return stages
+
+
+def measure(fetch, model) -> tuple[int, float, float]:
+    """returns the bytes returned by fetch (a list of raw documents), the duration of the
+    query and the duration of the validation of the documents into the model (in ms)"""
+    documents = fetch()
+    body_size = sum(len(document.raw) for document in documents)
+    decoded = [bson.decode(document.raw) for document in documents]
+
+    query_ms = time_call(fetch, repeat=5)
+    validation_ms = time_call(lambda: [model(**document) for document in decoded], repeat=5)
+
+    return body_size, query_ms, validation_ms
+
+
+def main():
+    database = get_database()
+    trainers, certifications, users = seed(database)
+
+    raw_options = CodecOptions(document_class=RawBSONDocument)
+    raw_trainers = trainers.with_options(codec_options=raw_options)
+    raw_users = users.with_options(codec_options=raw_options)
+
+    generic_get_query_dto = GenericGetQueryWithPaginationDTO(
+        final_output_model=BenchmarkTrainer,
+        sorts=format_sort_strings(["full_name$asc", "id$asc"]),
+        pagination=Pagination(page_no=1, page_size=PAGE_SIZE),
+    )
+    pipeline = build_generic_get_query_pipeline(generic_get_query_dto)
+
+    emails = [f"user{random.randrange(USER_COUNT)}@example.com" for _ in range(USER_LOOKUPS)]
+
+    scenarios = (
+        (
+            f"trainers page of {PAGE_SIZE}",
+            BenchmarkTrainer,
+            lambda: list(raw_trainers.aggregate(unprojected(pipeline))),
+            lambda: list(raw_trainers.aggregate(pipeline)),
+        ),
+        (
+            f"{USER_LOOKUPS} find_user",
+            UserInternal,
+            lambda: [raw_users.find_one({"email_address": email}) for email in emails],
+            lambda: [
+                raw_users.find_one({"email_address": email}, projection=get_projection(UserInternal))
+                for email in emails
+            ],
+        ),
+    )
+
+    try:
+        rows = []
+
+        for name, model, whole, projected in scenarios:
+            for label, fetch in (("whole", whole), ("projected", projected)):
+                body_size, query_ms, validation_ms = measure(fetch, model)
+                rows.append((
+                    name, label, f"{body_size / 2 ** 10:.0f}", f"{query_ms:.1f}", f"{validation_ms:.1f}"
+                ))
+
+    finally:
+        for collection in (trainers, certifications, users):
+            collection.drop()
+
+    print(
+        f"{TRAINER_COUNT} trainers with {CERTIFICATIONS_PER_TRAINER} certifications each, "
+        f"{USER_COUNT} users, {LEGACY_FIELD_SIZE} bytes of undeclared keys per document"
+    )
+    print_table(
+        headers=["query", "documents", "returned (KiB)", "query (ms)", "validation (ms)"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Counts the commands sent to the database (through a command listener) by a few read
+functions, run in a multi-document transaction (the former behaviour of
+@atomic_transaction) and through the read-only fast path, along with their latencies.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.read_only_round_trips
+"""
+from collections import Counter
+
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# the listener only applies to the clients created afterwards, i.e. it must be registered
+# before data.db is imported
+command_counter = CommandCounter()
+monitoring.register(command_counter)
+
+from data.dbapis.clubs import find_many_clubs  # noqa: E402
+from data.dbapis.country.read_queries import list_country  # noqa: E402
+from data.dbapis.user import find_user  # noqa: E402
+from decorators import atomic_transaction  # noqa: E402
+from logic.trainers import trainers_get_query_with_pagination  # noqa: E402
+
+from .utils import print_table, time_call  # noqa: E402
+
+CALLS = 50
+
+SCENARIOS = (
+    ("list_country", list_country, {}),
+    ("find_many_clubs", find_many_clubs, {}),
+    ("find_user", find_user, {"email_address": "nobody@example.com"}),
+    (
+        "trainers_get_query_with_pagination",
+        trainers_get_query_with_pagination,
+        {"page_no": 1, "page_size": 20},
+    ),
+)
+
+
+def count_commands(func, kwargs: dict) -> tuple[float, Counter]:
+    command_counter.commands.clear()
+
+    for _ in range(CALLS):
+        func(**kwargs)
+
+    commands = command_counter.commands.copy()
+    elapsed_ms = time_call(lambda: func(**kwargs), repeat=CALLS)
+
+    return elapsed_ms, commands
+
+
+def main():
+    rows = []
+
+    for name, read_only_func, kwargs in SCENARIOS:
+        # the same function, decorated the way it used to be
+        transactional_func = atomic_transaction(read_only_func.__wrapped__)
+
+        transactional_ms, transactional_commands = count_commands(transactional_func, kwargs)
+        read_only_ms, read_only_commands = count_commands(read_only_func, kwargs)
+
+        transactional_total = sum(transactional_commands.values())
+        read_only_total = sum(read_only_commands.values())
+
+        rows.append((
+            name,
+            f"{transactional_total / CALLS:.1f}",
+            f"{read_only_total / CALLS:.1f}",
+            f"{(transactional_total - read_only_total) / CALLS:.1f}",
+            f"{transactional_ms:.2f}",
+            f"{read_only_ms:.2f}",
+        ))
+
+    print(f"commands per call, averaged over {CALLS} calls")
+    print_table(
+        headers=[
+            "function",
+            "transaction",
+            "read-only",
+            "round trips saved",
+            "transaction (ms)",
+            "read-only (ms)",
+        ],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
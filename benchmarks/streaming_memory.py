@@ -0,0 +1,118 @@
+"""
+Compares the peak memory (traced python allocations) and the duration of serializing
+100k clubs the way /clubs/get-clubs does by default (every club validated into a list,
+the list of dtos wrapped in a Success and serialized at once) against the streamed
+responses (ndjson and the chunked json array), which hold a batch of STREAM_BATCH_SIZE
+clubs at a time.
+
+The clubs are seeded in a scratch collection which is dropped afterwards.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.streaming_memory
+"""
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api.clubs.club_apis import build_club_dtos
+from config import STREAM_BATCH_SIZE
+from data.db import get_database
+from models.clubs import ClubInternal
+from models.http_responses import Success
+from utils.json_streaming import StreamFormat, batched, iter_json_stream
+
+from .utils import print_table
+
+BENCHMARK_COLLECTION_NAME = "benchmark_clubs"
+DOCUMENT_COUNT = 100_000
+MESSAGE = "club retrieved successfully..."
+
+
+def seed(collection):
+    collection.drop()
+
+    clubs = (
+        ClubInternal(
+            name=f"benchmark club {i}",
+            owner_name=f"owner {i}",
+            phone_number="+966 50 000 0000",
+            email_id=f"club{i}@example.com",
+            commercial_registration=f"CR-{i}",
+            club_id=f"{i}",
+            iban=f"SA00000000000000000{i:06d}",
+            description="a club seeded by the streaming benchmark " * 4,
+            location={"lat": "24.7136", "long": "46.6753"},
+            platform_id=f"CLUB_{i}_BENCHMARK",
+            users=[{"user_id": f"user {i}"}],
+        ).model_dump()
+        for i in range(DOCUMENT_COUNT)
+    )
+
+    for batch in batched(clubs, 10_000):
+        collection.insert_many(batch)
+
+
+def list_response(collection) -> int:
+    clubs = [ClubInternal(**club) for club in collection.find()]
+    retval = Success(message=MESSAGE, data=build_club_dtos(clubs=clubs))
+
+    return len(JSONResponse(content=jsonable_encoder(retval)).body)
+
+
+def streamed_response(collection, stream_format: StreamFormat) -> int:
+    batches = (
+        build_club_dtos(clubs=clubs)
+        for clubs in batched(ClubInternal(**club) for club in collection.find())
+    )
+
+    # the chunks are dropped as soon as they are counted, as if written to the socket
+    return sum(
+        len(chunk)
+        for chunk in iter_json_stream(batches, stream_format=stream_format, message=MESSAGE)
+    )
+
+
+def measure(func, *args) -> tuple[int, float, float]:
+    """returns the size of the body, the peak of the traced memory (in MiB) and the
+    duration (in s) of func"""
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    body_size = func(*args)
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return body_size, peak / 2 ** 20, elapsed
+
+
+def main():
+    collection = get_database()[BENCHMARK_COLLECTION_NAME]
+    seed(collection)
+
+    try:
+        rows = []
+
+        for name, func, args in (
+            ("list + Success", list_response, (collection,)),
+            ("ndjson stream", streamed_response, (collection, StreamFormat.NDJSON)),
+            ("json array stream", streamed_response, (collection, StreamFormat.JSON)),
+        ):
+            body_size, peak_mib, elapsed = measure(func, *args)
+            rows.append((name, f"{body_size / 2 ** 20:.1f}", f"{peak_mib:.1f}", f"{elapsed:.2f}"))
+
+    finally:
+        collection.drop()
+
+    print(f"{DOCUMENT_COUNT} clubs, streamed {STREAM_BATCH_SIZE} at a time")
+    print_table(
+        headers=["response", "body (MiB)", "peak memory (MiB)", "duration (s)"],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
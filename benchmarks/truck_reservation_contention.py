@@ -0,0 +1,201 @@
+"""
+Books the same truck from THREADS concurrent clients, ROUNDS times, with the legacy
+check-then-set (read the service trucks and the truck, check its availability, save the
+booking, then mark the truck unavailable) and with the reservation transaction
+(book_service_with_truck_reservation). Every round should end with exactly one booking;
+the extra bookings are double bookings of the truck.
+
+A scratch truck and luggage transfer service are seeded in the real collections, they
+are deleted afterwards along with their bookings.
+
+usage (from the project root, requires a running database):
+    python -m benchmarks.truck_reservation_contention
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from data.db import (
+    convert_to_object_id,
+    get_logistics_bookings_collection,
+    get_truck_collection,
+)
+from data.dbapis.logistics_services_bookings import save_service_booking_db
+from data.dbapis.truck.read_queries import (
+    get_truck_details_by_id_db,
+    get_trucks_by_service_id,
+)
+from data.dbapis.truck.write_queries import update_truck_availability
+from logic.logistics.service_booking_reservation import (
+    book_service_with_truck_reservation,
+)
+from models.logistics_service_bookings import (
+    Consumer,
+    LuggageTransferServiceBookingInternal,
+)
+from models.logistics_service_bookings.enums import BookingStatus
+from models.truck.enums import TruckAvailability
+from models.user.enums import UserRoles
+from utils.date_time import get_current_utc_datetime
+from utils.logistics_utils import LOGISTICS_SERVICE_COLLECTION_MAPPING, LogisticsService
+
+from .utils import print_table
+
+THREADS = 16
+ROUNDS = 20
+SERVICE_TYPE = LogisticsService.LUGGAGE_TRANSFER.value
+LOCATION = {"latitude": 24.7136, "longitude": 46.6753}
+
+
+def check_then_set_booking(booking: LuggageTransferServiceBookingInternal) -> str:
+    """the booking flow the endpoints used before the reservation transaction"""
+    if booking.truck_id not in get_trucks_by_service_id(
+        service_id=booking.service_id, service_type=SERVICE_TYPE
+    ):
+        raise HTTPException(status_code=400)
+
+    truck_details = get_truck_details_by_id_db(
+        truck_id=booking.truck_id, fields=["logistics_company_id", "availability"]
+    )
+    if truck_details.get("logistics_company_id") != booking.logistics_company_id:
+        raise HTTPException(status_code=400)
+
+    if truck_details.get("availability") != TruckAvailability.AVAILABLE.value:
+        raise HTTPException(status_code=400)
+
+    booking_id = save_service_booking_db(booking=booking)
+    update_truck_availability(
+        truck_id=booking.truck_id, availability=TruckAvailability.UN_AVAILABLE.value
+    )
+
+    return booking_id
+
+
+def reservation_booking(booking: LuggageTransferServiceBookingInternal) -> str:
+    return book_service_with_truck_reservation(booking=booking)
+
+
+def seed(logistics_company_id: str) -> tuple[str, str]:
+    truck_id = get_truck_collection().insert_one({
+        "registration_number": "BENCHMARK-RESERVATION",
+        "name": "benchmark reservation truck",
+        "logistics_company_id": logistics_company_id,
+        "availability": TruckAvailability.AVAILABLE.value,
+    }).inserted_id
+
+    service_id = LOGISTICS_SERVICE_COLLECTION_MAPPING.get(SERVICE_TYPE).insert_one({
+        "provider": {"provider_id": logistics_company_id},
+        "trucks": [str(truck_id)],
+    }).inserted_id
+
+    return str(truck_id), str(service_id)
+
+
+def clean_up(truck_id: str, service_id: str):
+    get_truck_collection().delete_one({"_id": convert_to_object_id(truck_id)})
+    LOGISTICS_SERVICE_COLLECTION_MAPPING.get(SERVICE_TYPE).delete_one(
+        {"_id": convert_to_object_id(service_id)}
+    )
+    get_logistics_bookings_collection().delete_many({"truck_id": truck_id})
+
+
+def run_round(book, booking: LuggageTransferServiceBookingInternal) -> tuple:
+    """THREADS clients book the truck at once, returns the number of successful
+    bookings, the number of rejected ones and their latencies"""
+    barrier = threading.Barrier(THREADS)
+    latencies = []
+
+    def client():
+        barrier.wait()
+        start = time.perf_counter()
+
+        try:
+            book(booking.model_copy())
+            return True
+
+        except HTTPException:
+            return False
+
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        outcomes = list(executor.map(lambda _: client(), range(THREADS)))
+
+    return outcomes.count(True), outcomes.count(False), latencies
+
+
+def run_flow(name: str, book, truck_id: str, booking) -> tuple:
+    bookings_collection = get_logistics_bookings_collection()
+    double_booked_rounds, extra_bookings, rejected, latencies = 0, 0, 0, []
+
+    for _ in range(ROUNDS):
+        bookings_collection.delete_many({"truck_id": truck_id})
+        update_truck_availability(
+            truck_id=truck_id, availability=TruckAvailability.AVAILABLE.value
+        )
+
+        succeeded, round_rejected, round_latencies = run_round(book, booking)
+        saved = bookings_collection.count_documents({"truck_id": truck_id})
+        assert saved == succeeded, f"{name}: {succeeded} successes, {saved} bookings"
+
+        double_booked_rounds += saved > 1
+        extra_bookings += max(saved - 1, 0)
+        rejected += round_rejected
+        latencies.extend(round_latencies)
+
+    return (
+        name,
+        double_booked_rounds,
+        extra_bookings,
+        rejected,
+        f"{statistics.median(latencies):.2f}",
+    )
+
+
+def main():
+    logistics_company_id = str(ObjectId())
+    truck_id, service_id = seed(logistics_company_id=logistics_company_id)
+
+    booking = LuggageTransferServiceBookingInternal(
+        consumer=Consumer(consumer_id=str(ObjectId()), consumer_type=UserRoles.USER),
+        service_id=service_id,
+        logistics_company_id=logistics_company_id,
+        truck_id=truck_id,
+        source_location=LOCATION,
+        destination_location=LOCATION,
+        current_location=LOCATION,
+        pickup_time=get_current_utc_datetime(),
+        booking_status=BookingStatus.CREATED,
+        items_to_move=[],
+        dedicated_labour=False,
+    )
+
+    try:
+        rows = [
+            run_flow("check-then-set", check_then_set_booking, truck_id, booking),
+            run_flow("reservation", reservation_booking, truck_id, booking),
+        ]
+
+    finally:
+        clean_up(truck_id=truck_id, service_id=service_id)
+
+    print(f"{THREADS} concurrent bookings of the same truck, {ROUNDS} rounds")
+    print_table(
+        headers=[
+            "flow",
+            "double-booked rounds",
+            "extra bookings",
+            "rejected",
+            "median latency (ms)",
+        ],
+        rows=rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
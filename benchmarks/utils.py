@@ -0,0 +1,31 @@
+import statistics
+import time
+
+
+def time_call(func, repeat: int = 5) -> float:
+    """
+    runs `func` `repeat` times and returns the median wall-clock time
+    :param func: a callable that takes no arguments
+    :param repeat: the number of runs
+    :return: the median run time in milliseconds
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def print_table(headers: list[str], rows: list[tuple]):
+    """prints the benchmark results as a plain text table"""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(cell) for cell in column) for column in zip(headers, *rows)]
+
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    print("  ".join("-" * width for width in widths))
+
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
@@ -23,10 +23,43 @@ DATABASE_PORT = SECRETS['DATABASE_PORT']
 DATABASE_PASSWORD = SECRETS['DATABASE_PASSWORD']
 DATABASE_USER = SECRETS['DATABASE_USER']
 DATABASE_REPLICA_SET_NAME = SECRETS.get('DATABASE_REPLICA_SET_NAME', 'rs0')
+ENSURE_INDEXES_ON_STARTUP = SECRETS.get('ENSURE_INDEXES_ON_STARTUP', True)
+# the read preference and read concern of the reads made outside of transactions, e.g. 'secondaryPreferred' and
+# 'majority' (None keeps the server's default read concern)
+DATABASE_READ_PREFERENCE = SECRETS.get('DATABASE_READ_PREFERENCE', 'primary')
+DATABASE_READ_CONCERN_LEVEL = SECRETS.get('DATABASE_READ_CONCERN_LEVEL', None)
+READ_ONLY_CAUSAL_CONSISTENCY = SECRETS.get('READ_ONLY_CAUSAL_CONSISTENCY', True)
+# the attempts of a transaction failing with a transient error (e.g. a write conflict) or an unknown commit result
+TRANSACTION_MAX_ATTEMPTS = SECRETS.get('TRANSACTION_MAX_ATTEMPTS', 5)
+TRANSACTION_RETRY_BASE_DELAY_IN_SECONDS = SECRETS.get('TRANSACTION_RETRY_BASE_DELAY_IN_SECONDS', 0.01)
+TRANSACTION_RETRY_MAX_DELAY_IN_SECONDS = SECRETS.get('TRANSACTION_RETRY_MAX_DELAY_IN_SECONDS', 0.5)
 JWT_TOKEN_EXPIRY_IN_DAYS = SECRETS['JWT_TOKEN_EXPIRY_IN_DAYS']
 JWT_SECRET_KEY = SECRETS['JWT_SECRET_KEY']
 JWT_ALGORITHM = SECRETS['JWT_ALGORITHM']
+USER_CACHE_TTL_IN_SECONDS = SECRETS.get('USER_CACHE_TTL_IN_SECONDS', 60)
+USER_CACHE_MAX_SIZE = SECRETS.get('USER_CACHE_MAX_SIZE', 10000)
+PASSWORD_HASH_ROUNDS = SECRETS.get('PASSWORD_HASH_ROUNDS', 12)
+PASSWORD_HASH_MAX_WORKERS = SECRETS.get('PASSWORD_HASH_MAX_WORKERS', os.cpu_count() or 1)
+PASSWORD_HASH_MAX_PENDING = SECRETS.get('PASSWORD_HASH_MAX_PENDING', 64)
 IMAGES_UPLOAD_FOLDER = SECRETS['IMAGES_UPLOAD_FOLDER']
+IMAGE_PATH_CACHE_TTL_IN_SECONDS = SECRETS.get('IMAGE_PATH_CACHE_TTL_IN_SECONDS', 24 * 60 * 60)
+IMAGE_PATH_CACHE_MAX_SIZE = SECRETS.get('IMAGE_PATH_CACHE_MAX_SIZE', 50000)
+# the size of the buffer the uploaded images are copied with, and the number of images of an upload written at once
+IMAGE_COPY_BUFFER_SIZE = SECRETS.get('IMAGE_COPY_BUFFER_SIZE', 1024 * 1024)
+IMAGE_SAVE_MAX_CONCURRENCY = SECRETS.get('IMAGE_SAVE_MAX_CONCURRENCY', 4)
+# the threads building the resized webp renditions of the uploaded images, and the webp quality (0-100) of the renditions
+IMAGE_RENDITION_MAX_WORKERS = SECRETS.get('IMAGE_RENDITION_MAX_WORKERS', 2)
+IMAGE_RENDITION_QUALITY = SECRETS.get('IMAGE_RENDITION_QUALITY', 80)
+# how long the clients may keep an image (or one of its renditions) without revalidating it, they never change once saved
+IMAGE_CACHE_MAX_AGE_IN_SECONDS = SECRETS.get('IMAGE_CACHE_MAX_AGE_IN_SECONDS', 365 * 24 * 60 * 60)
+# the cached responses of the reference data endpoints: 'local' (in process) or 'database' (shared by the workers)
+RESPONSE_CACHE_BACKEND = SECRETS.get('RESPONSE_CACHE_BACKEND', 'local')
+RESPONSE_CACHE_TTL_IN_SECONDS = SECRETS.get('RESPONSE_CACHE_TTL_IN_SECONDS', 5 * 60)
+RESPONSE_CACHE_MAX_SIZE = SECRETS.get('RESPONSE_CACHE_MAX_SIZE', 100)
+# the number of documents read, validated and serialized at a time by the streamed list responses
+STREAM_BATCH_SIZE = SECRETS.get('STREAM_BATCH_SIZE', 500)
+# the longest time window the club service availability can be searched in
+AVAILABILITY_SEARCH_MAX_WINDOW_IN_DAYS = SECRETS.get('AVAILABILITY_SEARCH_MAX_WINDOW_IN_DAYS', 31)
 TAP_PAYMENT_API_URL = SECRETS['TAP_PAYMENT_API_URL']
 TAP_PAYMENT_API_KEY = SECRETS['TAP_PAYMENT_API_KEY']
 OTP_SERVICE_ACTIVATED = SECRETS['OTP_SERVICE_ACTIVATED']
@@ -1,3 +1,4 @@
+from functools import cache
 from typing import Annotated
 from urllib.parse import quote_plus
 
@@ -10,6 +11,8 @@ from config import (
     DATABASE_NAME,
     DATABASE_PASSWORD,
     DATABASE_PORT,
+    DATABASE_READ_CONCERN_LEVEL,
+    DATABASE_READ_PREFERENCE,
     DATABASE_REPLICA_SET_NAME,
     DATABASE_URL,
     DATABASE_USER,
@@ -27,223 +30,242 @@ CONNECTION_STRING = (
 
 CONNECTION_STRING += f"/?replicaSet={DATABASE_REPLICA_SET_NAME}&directConnection=true"
 
-client = MongoClient(CONNECTION_STRING, maxPoolSize=DATABASE_MAX_POOL_SIZE)
+# the read preference and read concern apply to the reads made outside of transactions, i.e. the
+# functions decorated with @atomic_transaction(read_only=True), the transactions always read from the primary
+client = MongoClient(
+    CONNECTION_STRING,
+    maxPoolSize=DATABASE_MAX_POOL_SIZE,
+    readPreference=DATABASE_READ_PREFERENCE,
+    **({"readConcernLevel": DATABASE_READ_CONCERN_LEVEL} if DATABASE_READ_CONCERN_LEVEL else {}),
+)
 
 PyObjectId = Annotated[str, BeforeValidator(str)]
 
+# the database and collection handles are cached, they are plain references that are
+# safe to share across threads. the indexes of the collections are declared in
+# data/indexes.py and created once at startup instead of by these getters.
+
 
+@cache
 def get_database():
     log.info("inside get_database()")
     return client[DATABASE_NAME]
 
 
+@cache
+def get_collection(collection_name: str):
+    log.info("inside get_collection(collection_name=%s)", collection_name)
+    return get_database()[collection_name]
+
+
+@cache
 def get_users_collection():
     log.info("inside get_users_collection()")
-    users_collection = get_database()["users"]
-
-    # TODO: figure out how to add indexes with unique constraint in nullable fields
-    users_collection.create_index([("email_address", 1)])
-    users_collection.create_index([("phone_number", 1)], unique=True)
-    return users_collection
+    return get_database()["users"]
 
 
+@cache
 def get_clubs_collection():
     log.info("inside get_club_collection()")
-    club_collection = get_database()["clubs"]
-    club_collection.create_index([("id", 1)], unique=True)
-    return club_collection
+    return get_database()["clubs"]
 
 
+@cache
 def get_clubs_service_collection():
     log.info(f"inside get_club_service_collection()")
     club_service_collection = get_database()["club_service"]
     return club_service_collection
 
 
+@cache
 def get_club_service_availability_collection():
     log.info(f"inside get_club_service_availability_collection()")
     club_service_availability_collection = get_database()["club_service_availability"]
     return club_service_availability_collection
 
 
+@cache
 def get_sign_up_otp_collection():
     log.info("inside get_sign_up_otp_collection()")
 
-    sign_up_otp_collection = get_database()["sign_up_otp"]
-
-    sign_up_otp_collection.create_index([("id", 1)], unique=True)
-
-    # TODO: figure out how to add indexes with unique constraint in nullable fields
-    sign_up_otp_collection.create_index([("email_address", 1)])
-    sign_up_otp_collection.create_index([("phone_number", 1)])
-
-    return sign_up_otp_collection
+    return get_database()["sign_up_otp"]
 
 
+@cache
 def get_reset_password_otp_collection():
     log.info("inside get_reset_password_otp_collection()")
 
-    reset_password_otp_collection = get_database()["reset_password_otp"]
-
-    reset_password_otp_collection.create_index([("id", 1)], unique=True)
-
-    # TODO: figure out how to add indexes with unique constraint in nullable fields
-    reset_password_otp_collection.create_index([("email_address", 1)])
-    reset_password_otp_collection.create_index([("phone_number", 1)])
-
-    return reset_password_otp_collection
+    return get_database()["reset_password_otp"]
 
 
+@cache
 def get_trainer_collection():
     log.info("inside get_trainer_collection()")
 
-    trainer_collection = get_database()["trainers"]
-
-    trainer_collection.create_index([("id", 1)], unique=True)
-
-    return trainer_collection
+    return get_database()["trainers"]
 
 
+@cache
 def get_trainer_affiliations_collection():
     log.info("inside get_trainer_collection()")
 
-    trainer_affiliation_collection = get_database()["trainer_affiliations"]
-
-    # primary-key field
-    trainer_affiliation_collection.create_index([("id", 1)], unique=True)
-
-    # indices to boost read query efficiencies
-    trainer_affiliation_collection.create_index([("email_address", 1)])
-    trainer_affiliation_collection.create_index([("phone_number", 1)])
-
-    # indices for foreign key fields
-    trainer_affiliation_collection.create_index([("user_id", 1)])
-    trainer_affiliation_collection.create_index([("club_id", 1)])
-
-    return trainer_affiliation_collection
+    return get_database()["trainer_affiliations"]
 
 
+@cache
 def get_trainer_certifications_collection():
     log.info("inside get_trainer_certification_collection()")
 
-    trainer_certification_collection = get_database()["trainer_certifications"]
-
-    # primary-key field
-    trainer_certification_collection.create_index([("id", 1)], unique=True)
-
-    # indices for foreign key fields
-    trainer_certification_collection.create_index([("trainer_id", 1)])
-
-    return trainer_certification_collection
+    return get_database()["trainer_certifications"]
 
 
+@cache
 def get_trainer_specializations_collection():
     log.info("inside get_trainer_specializations_collection()")
 
-    trainer_specializations_collection = get_database()["trainer_specializations"]
-
-    # primary-key field
-    trainer_specializations_collection.create_index([("id", 1)], unique=True)
-
-    # indices for foreign key fields
-    trainer_specializations_collection.create_index([("trainer_id", 1)])
-
-    return trainer_specializations_collection
+    return get_database()["trainer_specializations"]
 
 
+@cache
 def get_uploaded_images_collection():
     log.info("inside get_uploaded_images_collection")
     return get_database()["uploaded_images_collection"]
 
 
+@cache
 def get_upload_images_demo_collection():
     log.info("inside get_upload_images_demo()")
     return get_database()["upload_images_demo"]
 
 
+@cache
 def get_payment_demo_collection():
     log.info("inside get_payment_demo_collection()")
     return get_database()["payment_demo"]
 
+@cache
 def get_order_demo_collection():
     log.info("inside get_order_demo_collection()")
     return get_database()["order_demo"]
 
+@cache
 def get_horses_collection():
     log.info("inside get_horses_collection")
     return get_database()["horses_collection"]
 
 
+@cache
+def get_truck_collection():
+    log.info("inside get_truck_collection()")
+
+    return get_database()["trucks"]
+
+
+@cache
+def get_response_cache_collection():
+    log.info("inside get_response_cache_collection()")
+
+    return get_database()["response_cache"]
+
+
+@cache
+def get_logistics_bookings_collection():
+    log.info("inside get_logistics_bookings_collection()")
+
+    return get_database()["logistics_bookings"]
+
+
+@cache
 def get_logistics_company_collection():
     log.info("inside get_clubs_collection()")
     return get_database()["logistic_company"]
 
 
+@cache
 def get_riding_lesson_bookings_collection():
     log.info("inside get_clubs_collection()")
     return get_database()["riding_lesson_service_booking"]
 
 
+@cache
 def get_horse_shoeing_service_bookings_collection():
     log.info("inside get_clubs_collection()")
     return get_database()["horse_shoeing_service_bookings"]
 
 
+@cache
 def get_riding_lesson_collection():
     log.info("inside get_riding_lesson_collection()")
     return get_database()["riding_lesson_service"]
 
 
+@cache
 def get_horse_shoeing_service_collection():
     log.info("inside get_horse_shoeing_service_collection()")
     return get_database()["horse_shoeing_service"]
 
 
+@cache
 def get_horses_selling_collection():
     log.info("inside get_horses_selling_collection")
     return get_database()["horses_selling_collection"]
 
 
+@cache
 def get_horses_selling_service_collection():
     log.info("inside get_horses_selling_service_collection")
     return get_database()["horses_selling_service_collection"]
 
 
+@cache
 def get_horses_renting_service_collection():
     log.info("inside get_horses_renting_service_collection")
     return get_database()["horses_renting_service_collection"]
 
 
+@cache
 def get_horses_renting_collection():
     log.info("inside get_horses_selling_collection")
     return get_database()["horses_selling_collection"]
 
 
+@cache
 def get_horse_collection():
     log.info("inside get_horse_collection()")
     return get_database()["horses"]
 
 
+@cache
 def get_horse_selling_service_collection():
     log.info("inside get_horse_renting_service_collection()")
     return get_database()["horse_selling_service"]
 
 
+@cache
 def get_generic_activity_service_collection():
     log.info("inside get_generic_activity_service_collection")
     return get_database()["generic_activity_service"]
 
 
+@cache
 def get_generic_activity_service_bookings_collection():
     log.info("inside get_generic_activity_service_collection")
     return get_database()["generic_activity_service_booking"]
 
 
+@cache
 def get_reviews_collection():
     log.info("inside get_reviews_collection")
     return get_database()["reviews"]
 
 
+@cache
+def get_club_rating_summaries_collection():
+    log.info("inside get_club_rating_summaries_collection")
+    return get_database()["club_rating_summaries"]
+
+
+@cache
 def get_logistic_service_booking_collection():
     log.info("inside get_logistic_service_booking_collection()")
     return get_database()["logistic_service_booking"]
@@ -260,6 +282,7 @@ def convert_to_object_id(str_id: str) -> ObjectId:
     return ObjectId(str_id)
 
 
+@cache
 def get_countries_collection():
     log.info("Fetching countries collection...")
     countries_collection = get_database()["countries"]
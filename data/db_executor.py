@@ -0,0 +1,35 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from config import DATABASE_MAX_POOL_SIZE
+from logging_config import log
+
+# pymongo is a blocking driver, every call made directly inside an `async def` route
+# stalls the event loop (and with it every other in-flight request) for a full database
+# round trip. the calls are therefore handed over to this executor; it is sized to the
+# connection pool of the client so that a worker thread never waits for a connection.
+db_executor = ThreadPoolExecutor(
+    max_workers=DATABASE_MAX_POOL_SIZE, thread_name_prefix="db_executor"
+)
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """
+    runs the blocking function `func(*args, **kwargs)` on the database executor and
+    awaits its result without blocking the event loop.
+
+    functions decorated with @atomic_transaction can be passed as is, the whole call
+    (starting the session, every query and the commit/abort) runs on one worker thread,
+    which makes the transaction awaitable as a single unit.
+
+    :param func: a blocking callable, typically a dbapi or a synchronous logic function
+    :param args: positional arguments of func
+    :param kwargs: keyword arguments of func
+    :return: whatever func returns, exceptions raised by func are propagated
+    """
+    log.info("inside run_in_db_executor(func=%s)", getattr(func, "__name__", func))
+
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(db_executor, partial(func, *args, **kwargs))
@@ -1,12 +1,18 @@
 from data.dbapis.clubs.read_queries import (
+    find_available_slots,
     find_club,
     find_club_by_user,
     find_club_service,
+    find_club_service_availability_ids,
+    find_club_service_availability_in_range,
+    find_club_service_ids,
     find_many_clubs,
     get_club_count,
     get_club_service_availability,
+    iter_clubs,
 )
 from data.dbapis.clubs.write_queries import (
+    bulk_write_club_service_availability,
     save_club,
     save_club_service,
     save_club_service_availability_bulk,
@@ -1,13 +1,21 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from pymongo import ASCENDING
 
 from data.db import (
     get_club_service_availability_collection,
     get_clubs_collection,
     get_clubs_service_collection,
 )
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    get_lookup_stages,
+)
+from data.projections import get_lookup, get_lookup_projections, get_projection
 from decorators import atomic_transaction
-from logging_config import log
+from logging_config import log, summarize
 from models.clubs import ClubInternal
+from models.clubs.availability_detailed_internal import AvailabilityDetailedInternal
 from models.clubs.service_internal import AvailabilityInternal, ClubServiceInternal
 
 club_collection = get_clubs_collection()
@@ -19,15 +27,15 @@ def get_club_count() -> int:
     log.info("inside get_club_count()")
     club_count = club_collection.count_documents({})
 
-    log.info(f"returning {club_count}")
+    log.info("returning %s", club_count)
     return club_count
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_club(session=None, **kwargs) -> Optional[ClubInternal]:
     log.info(f"inside find_club({kwargs})")
 
-    club = club_collection.find_one(kwargs, session=session)
+    club = club_collection.find_one(kwargs, projection=get_projection(ClubInternal), session=session)
 
     if not club:
         log.info(f"No club exists with the provided attributes, returning None")
@@ -35,16 +43,18 @@ def find_club(session=None, **kwargs) -> Optional[ClubInternal]:
 
     retval = ClubInternal(**club)
 
-    log.info(f"returning club = {retval}")
+    log.info("returning club = %s", summarize(retval))
 
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_club_by_user(user_id, session=None) -> Optional[ClubInternal]:
     log.info(f"inside find_club_by_user(user_id={user_id})")
 
-    club = club_collection.find_one({"users.user_id": user_id}, session=session)
+    club = club_collection.find_one(
+        {"users.user_id": user_id}, projection=get_projection(ClubInternal), session=session
+    )
 
     if not club:
         log.info("no club is associated with the provided user_id, returning None")
@@ -52,29 +62,44 @@ def find_club_by_user(user_id, session=None) -> Optional[ClubInternal]:
 
     retval = ClubInternal(**club)
 
-    log.info(f"returning club = {retval}")
+    log.info("returning club = %s", summarize(retval))
 
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_many_clubs(session=None, **kwargs) -> list[ClubInternal]:
     log.info(f"inside find_many_clubs({kwargs})")
 
-    clubs_cursor = club_collection.find(kwargs, session=session)
+    clubs_cursor = club_collection.find(kwargs, projection=get_projection(ClubInternal), session=session)
 
     retval = [ClubInternal(**club) for club in clubs_cursor]
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
 
-@atomic_transaction
+def iter_clubs(**kwargs) -> Iterator[ClubInternal]:
+    """
+    the lazy counterpart of find_many_clubs for the streamed responses: the clubs are
+    validated one at a time as the cursor is iterated, instead of being held in a list.
+    the cursor outlives any session a decorated function would provide (it is iterated
+    while the response is being sent), hence it runs in an implicit one.
+    """
+    log.info("inside iter_clubs(%s)", kwargs)
+
+    for club in club_collection.find(kwargs, projection=get_projection(ClubInternal)):
+        yield ClubInternal(**club)
+
+
+@atomic_transaction(read_only=True)
 def find_club_service(session=None, **kwargs) -> Optional[ClubServiceInternal]:
     log.info(f"inside find_club_service(kwargs={kwargs})")
 
-    club_service = club_service_collection.find_one(kwargs, session=session)
+    club_service = club_service_collection.find_one(
+        kwargs, projection=get_projection(ClubServiceInternal), session=session
+    )
 
     if not club_service:
         log.info(
@@ -84,12 +109,12 @@ def find_club_service(session=None, **kwargs) -> Optional[ClubServiceInternal]:
 
     retval = ClubServiceInternal(**club_service)
 
-    log.info(f"returning club_service = {retval}")
+    log.info("returning club_service = %s", summarize(retval))
 
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def get_club_service_availability(
     club_service_id: str, availability_id: str, session=None
 ) -> AvailabilityInternal:
@@ -110,6 +135,199 @@ def get_club_service_availability(
 
     retval = AvailabilityInternal(**club_service_availability)
 
-    log.info(f"returning club_service_availability = {retval}")
+    log.info("returning club_service_availability = %s", summarize(retval))
 
     return retval
+
+
+@atomic_transaction(read_only=True)
+def find_club_service_availability_ids(
+    club_service_id: str, availability_ids: list[str], session=None
+) -> set[str]:
+    """
+    returns the ids, among the provided ones, of the availability of the club service, in a
+    single query (instead of one get_club_service_availability per id)
+
+    :param club_service_id: id of the club service
+    :param availability_ids: ids of the availability to look for
+    :return: the ids that exist for the club service
+    """
+    log.info(
+        "inside find_club_service_availability_ids(club_service_id=%s, "
+        "availability_ids=%s)",
+        club_service_id, availability_ids,
+    )
+
+    availability_cursor = availability_collection.find(
+        filter={"club_service_id": club_service_id, "id": {"$in": availability_ids}},
+        projection={"_id": 0, "id": 1},
+        session=session,
+    )
+
+    retval = {availability["id"] for availability in availability_cursor}
+
+    log.info("returning %s of %s availability ids", len(retval), len(availability_ids))
+
+    return retval
+
+
+@atomic_transaction(read_only=True)
+def find_club_service_availability_in_range(
+    club_service_id: str,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_ids: Optional[list[str]] = None,
+    session=None,
+) -> list[AvailabilityInternal]:
+    """
+    returns the availability of the club service overlapping the range [start_time, end_time),
+    i.e. starting before end_time and ending after start_time
+
+    :param club_service_id: id of the club service
+    :param start_time: start of the range
+    :param end_time: end of the range
+    :param exclude_ids: ids of the availability to leave out, e.g. the ones being updated
+    :return: the availability, ordered by start_time
+    """
+    log.info(
+        "inside find_club_service_availability_in_range(club_service_id=%s, "
+        "start_time=%s, end_time=%s, exclude_ids=%s)",
+        club_service_id,
+        start_time,
+        end_time,
+        exclude_ids,
+    )
+
+    availability_filter = {
+        "club_service_id": club_service_id,
+        "start_time": {"$lt": end_time},
+        "end_time": {"$gt": start_time},
+    }
+
+    if exclude_ids:
+        availability_filter["id"] = {"$nin": exclude_ids}
+
+    availability_cursor = availability_collection.find(
+        filter=availability_filter,
+        projection=get_projection(AvailabilityInternal),
+        sort=[("start_time", ASCENDING)],
+        session=session,
+    )
+
+    retval = [AvailabilityInternal(**availability) for availability in availability_cursor]
+
+    log.info("returning %s", summarize(retval))
+
+    return retval
+
+
+@atomic_transaction(read_only=True)
+def find_club_service_ids(session=None, **kwargs) -> list[str]:
+    log.info("inside find_club_service_ids(%s)", kwargs)
+
+    club_service_cursor = club_service_collection.find(
+        kwargs, projection={"_id": 0, "id": 1}, session=session
+    )
+
+    retval = [club_service["id"] for club_service in club_service_cursor]
+
+    log.info("returning %s club service ids", len(retval))
+
+    return retval
+
+
+@atomic_transaction(read_only=True)
+def find_available_slots(
+    start_time: datetime,
+    end_time: datetime,
+    club_service_ids: Optional[list[str]] = None,
+    page_no: int = 1,
+    page_size: int = 20,
+    session=None,
+) -> list[AvailabilityDetailedInternal]:
+    """
+    returns a page of the availability fitting in the time window (starting at or after
+    start_time and ending at or before end_time), along with their club service, ordered by
+    start_time.
+
+    the window bounds start_time on both sides, hence the index on (start_time, end_time, id)
+    (or on (club_service_id, start_time, end_time) for a few club services) is scanned over
+    the window only, in the order of the page, whatever the number of availability.
+
+    :param start_time: start of the window
+    :param end_time: end of the window
+    :param club_service_ids: ids of the club services to search the availability of, all of
+                             them if None
+    :param page_no: the page, from 1
+    :param page_size: the number of availability per page
+    :return: the page of availability, with their club_service looked up
+    """
+    log.info(
+        "inside find_available_slots(start_time=%s, end_time=%s, "
+        "club_service_ids=%s, page_no=%s, page_size=%s)",
+        start_time,
+        end_time,
+        club_service_ids,
+        page_no,
+        page_size,
+    )
+
+    pipeline = build_available_slots_pipeline(
+        start_time=start_time,
+        end_time=end_time,
+        club_service_ids=club_service_ids,
+        page_no=page_no,
+        page_size=page_size,
+    )
+
+    log.info("executing pipeline=%s", pipeline)
+
+    retval = [
+        AvailabilityDetailedInternal(**availability)
+        for availability in availability_collection.aggregate(pipeline, session=session)
+    ]
+
+    log.info("returning %s", summarize(retval))
+
+    return retval
+
+
+def build_available_slots_pipeline(
+    start_time: datetime,
+    end_time: datetime,
+    club_service_ids: Optional[list[str]] = None,
+    page_no: int = 1,
+    page_size: int = 20,
+) -> list[dict]:
+    """
+    builds the aggregation pipeline of find_available_slots. the availability whose club
+    service is not found (e.g. deleted since its id was read) is dropped ahead of the
+    pagination, so that a page is only short when it is the last one. the pipeline is
+    streamed: the club services are only looked up for the availability up to the end of
+    the page, not for the whole window
+    """
+    availability_filter = {
+        "start_time": {"$gte": start_time, "$lt": end_time},
+        "end_time": {"$lte": end_time},
+        "deleted_on": None,
+    }
+
+    if club_service_ids is not None:
+        availability_filter["club_service_id"] = {"$in": club_service_ids}
+
+    return [
+        {"$match": availability_filter},
+        {"$sort": {"start_time": 1, "end_time": 1, "id": 1}},
+        {"$project": get_projection(AvailabilityDetailedInternal)},
+        *get_lookup_stages(
+            lookups=[
+                lookup
+                for field_info in AvailabilityDetailedInternal.model_fields.values()
+                if (lookup := get_lookup(field_info))
+            ],
+            lookup_projections=get_lookup_projections(AvailabilityDetailedInternal),
+        ),
+        {"$match": {"club_service": {"$ne": None}}},
+        {"$skip": (page_no - 1) * page_size},
+        {"$limit": page_size},
+    ]
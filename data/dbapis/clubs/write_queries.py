@@ -1,20 +1,25 @@
 from fastapi import HTTPException, status
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from data.db import (
     get_club_service_availability_collection,
     get_clubs_collection,
     get_clubs_service_collection,
 )
-from decorators import atomic_transaction
+from decorators import atomic_transaction, run_after_commit
 from logging_config import log
 from models.clubs import ClubInternal, UpdateClubInternal
 from models.clubs.service_internal import (
+    AvailabilityBulkWriteResult,
     AvailabilityInternal,
     ClubServiceInternal,
     UpdateClubServiceInternal,
 )
+from utils.date_time import as_utc
+from utils.response_cache import CLUBS_RESPONSE_CACHE_KEY, response_cache
 
-from . import find_club
+from . import find_club, find_club_service_availability_in_range
 
 club_collection = get_clubs_collection()
 club_service_collection = get_clubs_service_collection()
@@ -26,7 +31,9 @@ def save_club(new_club: ClubInternal, session=None) -> ClubInternal:
 
     log.info(f"inside save_club(new_club={new_club})")
 
-    result = club_collection.insert_one(new_club.model_dump(), session=session)
+    result = club_collection.insert_one(
+        new_club.model_dump(exclude={"rating_summary"}), session=session
+    )
 
     if not result.acknowledged:
         log.info("new club can't be inserted in the database, raising exception...")
@@ -37,6 +44,8 @@ def save_club(new_club: ClubInternal, session=None) -> ClubInternal:
 
     log.info(f"new club has successfully been inserted (club_id={new_club.id})")
 
+    run_after_commit(session, response_cache.invalidate, CLUBS_RESPONSE_CACHE_KEY)
+
     return new_club
 
 
@@ -65,6 +74,8 @@ def update_club(update_club_data: UpdateClubInternal, session=None) -> ClubInter
             detail="club cannot be updated in the database due to unknown reasons",
         )
 
+    run_after_commit(session, response_cache.invalidate, CLUBS_RESPONSE_CACHE_KEY)
+
     updated_club = find_club(id=club_database_id, session=session)
 
     return updated_club
@@ -140,6 +151,10 @@ def update_club_service(
     return
 
 
+# the fields of an availability written when it is inserted only, its updates keep them
+AVAILABILITY_INSERT_ONLY_FIELDS = {"id", "club_service_id", "created_on", "created_by"}
+
+
 @atomic_transaction
 def save_club_service_availability_bulk(
     service_availability: list[AvailabilityInternal], session=None
@@ -149,9 +164,26 @@ def save_club_service_availability_bulk(
         f"inside save_club_service_availability_bulk(availability={service_availability})"
     )
 
-    result = club_service_availability_collection.insert_many(
-        [availability.model_dump() for availability in service_availability]
-    )
+    for club_service_id in {availability.club_service_id for availability in service_availability}:
+        raise_overlapping_availability(
+            availability=[
+                availability
+                for availability in service_availability
+                if availability.club_service_id == club_service_id
+            ],
+            club_service_id=club_service_id,
+            session=session,
+        )
+
+    try:
+        result = club_service_availability_collection.insert_many(
+            [availability.model_dump() for availability in service_availability],
+            ordered=False,
+            session=session,
+        )
+
+    except BulkWriteError as e:
+        raise_failed_availability(e, service_availability)
 
     if not result.acknowledged:
         log.info(
@@ -172,38 +204,230 @@ def save_club_service_availability_bulk(
 
 
 @atomic_transaction
-def update_club_service_availability(
-    update_availability: list[AvailabilityInternal], club_service_id: str, session=None
-) -> AvailabilityInternal:
+def bulk_write_club_service_availability(
+    availability: list[AvailabilityInternal],
+    club_service_id: str,
+    upsert: bool = True,
+    session=None,
+) -> AvailabilityBulkWriteResult:
+    """
+    writes the availability of a club service in a single round trip (an unordered
+    bulk_write of one update per availability): the existing availability is updated,
+    keeping the fields it was created with, and the rest is inserted if upsert is set.
+
+    :param availability: the availability to write, identified by their id
+    :param club_service_id: id of the club service the availability belongs to
+    :param upsert: whether to insert the availability which doesn't exist yet, otherwise
+                   all of it must exist
+    :return: the ids of the inserted and of the updated availability
+    :raises HTTPException: 409 listing the availability overlapping each other or the
+                           existing availability of the club service (see
+                           raise_overlapping_availability), 409 listing the availability
+                           which failed to be written (e.g. an id belonging to another
+                           club service), 404 if upsert isn't
+                           set and some of the availability doesn't exist. nothing is
+                           written in both cases, the transaction is aborted
+    """
     log.info(
-        f"inside update_club_service_availability(update_availability={update_availability})"
+        "inside bulk_write_club_service_availability(club_service_id=%s, "
+        "availability_count=%s, upsert=%s)",
+        club_service_id, len(availability), upsert,
     )
 
-    update_filter = {"club_service_id": club_service_id}
+    if not availability:
+        return AvailabilityBulkWriteResult()
 
-    for availability in update_availability:
-        update_filter["id"] = str(availability.id)
+    raise_overlapping_availability(
+        availability=availability, club_service_id=club_service_id, session=session
+    )
 
-        update_availability_dict = availability.model_dump(exclude={"id"})
+    operations = []
 
-        result = club_service_availability_collection.update_one(
-            update_filter,
-            {"$set": update_availability_dict},
-            session=session,
+    for slot in availability:
+        update = {"$set": slot.model_dump(exclude=AVAILABILITY_INSERT_ONLY_FIELDS)}
+
+        if upsert:
+            # the id and the club_service_id of an inserted availability come from the filter
+            update["$setOnInsert"] = slot.model_dump(include={"created_on", "created_by"})
+
+        operations.append(
+            UpdateOne(
+                {"id": str(slot.id), "club_service_id": club_service_id},
+                update,
+                upsert=upsert,
+            )
         )
 
-        log.info(
-            f"club service availability update executed, matched_count={result.matched_count}, "
-            f"modified_count={result.modified_count}"
+    try:
+        result = club_service_availability_collection.bulk_write(
+            operations, ordered=False, session=session
         )
 
-        if not result.modified_count:
-            log.info(
-                "could not update club service due to unknown reasons, raising exception"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="club service cannot be updated in the database due to unknown reasons",
+    except BulkWriteError as e:
+        raise_failed_availability(e, availability)
+
+    log.info(
+        "club service availability bulk write executed, matched_count=%s, "
+        "upserted_count=%s, modified_count=%s",
+        result.matched_count, result.upserted_count, result.modified_count,
+    )
+
+    if result.matched_count + result.upserted_count != len(availability):
+        log.info("some of the availability doesn't exist, raising exception")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"some of the availability doesn't exist for the club service (club_service_id={club_service_id})",
+        )
+
+    # the keys of upserted_ids are the indexes of the operations which inserted
+    retval = AvailabilityBulkWriteResult(
+        inserted_ids=[str(availability[index].id) for index in result.upserted_ids],
+        updated_ids=[
+            str(slot.id)
+            for index, slot in enumerate(availability)
+            if index not in result.upserted_ids
+        ],
+    )
+
+    log.info("returning %s", retval)
+
+    return retval
+
+
+@atomic_transaction
+def raise_overlapping_availability(
+    availability: list[AvailabilityInternal], club_service_id: str, session=None
+):
+    """
+    raises a 409 listing the availability overlapping each other, or the existing
+    availability of the club service (the one being written aside), read in one query over
+    the range the availability spans.
+
+    the club service is written in the same transaction (its availability_version is
+    incremented): two transactions writing the availability of the same club service
+    conflict, and the one run again reads the availability written by the other, hence
+    concurrent writes can't overlap either.
+
+    :param availability: the availability about to be written, of the club service
+    :param club_service_id: id of the club service
+    """
+    log.info(
+        "inside raise_overlapping_availability(club_service_id=%s, "
+        "availability_count=%s)",
+        club_service_id, len(availability),
+    )
+
+    if not availability:
+        return
+
+    club_service_collection.update_one(
+        {"id": club_service_id}, {"$inc": {"availability_version": 1}}, session=session
+    )
+
+    existing_availability = find_club_service_availability_in_range(
+        club_service_id=club_service_id,
+        start_time=min(slot.start_time for slot in availability),
+        end_time=max(slot.end_time for slot in availability),
+        exclude_ids=[str(slot.id) for slot in availability],
+        session=session,
+    )
+
+    overlapping_availability = find_overlapping_availability(
+        availability=availability, existing_availability=existing_availability
+    )
+
+    if overlapping_availability:
+        log.info("the availability overlaps, overlapping_availability=%s", overlapping_availability)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "the availability of a club service can't overlap",
+                "overlapping_availability": overlapping_availability,
+            },
+        )
+
+
+def find_overlapping_availability(
+    availability: list[AvailabilityInternal],
+    existing_availability: list[AvailabilityInternal],
+) -> list[dict]:
+    """
+    returns the overlaps of the availability with each other and with the existing one, in a
+    single pass over them ordered by start_time: an availability overlaps the previous one
+    ending last if it starts before that one ends. the ranges are half-open, an availability
+    may start when another ends.
+
+    :return: [{"availability_id": ..., "overlapping_availability_id": ...}], the first id
+             being one of the availability (not of the existing one)
+    """
+    slots = sorted(
+        [
+            (as_utc(slot.start_time), as_utc(slot.end_time), str(slot.id), is_new)
+            for slots, is_new in ((availability, True), (existing_availability, False))
+            for slot in slots
+        ],
+        key=lambda slot: slot[:2],
+    )
+
+    overlaps = []
+    # the slot ending last among the previous ones
+    latest_slot = None
+
+    for slot in slots:
+        start_time, end_time, slot_id, is_new = slot
+
+        if latest_slot and start_time < latest_slot[1] and (is_new or latest_slot[3]):
+            new_slot, other_slot = (slot, latest_slot) if is_new else (latest_slot, slot)
+            overlaps.append(
+                {"availability_id": new_slot[2], "overlapping_availability_id": other_slot[2]}
             )
 
-    return
+        if latest_slot is None or end_time > latest_slot[1]:
+            latest_slot = slot
+
+    return overlaps
+
+
+def raise_failed_availability(e: BulkWriteError, availability: list[AvailabilityInternal]):
+    """
+    raises the HTTPException listing the availability whose write failed, from the write
+    errors of an unordered bulk write (every other write was attempted)
+    """
+    # the transient errors (e.g. a write conflict with a concurrent transaction) are left
+    # to atomic_transaction, which runs the transaction again
+    if e.has_error_label("TransientTransactionError"):
+        raise e
+
+    failed_availability = [
+        {
+            "availability_id": str(availability[error["index"]].id),
+            "error": error["errmsg"],
+        }
+        for error in e.details.get("writeErrors", [])
+    ]
+
+    if not failed_availability:
+        raise e
+
+    log.info("the availability can't be written, failed_availability=%s", failed_availability)
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "some of the availability can't be written, none was",
+            "failed_availability": failed_availability,
+        },
+    )
+
+
+@atomic_transaction
+def update_club_service_availability(
+    update_availability: list[AvailabilityInternal], club_service_id: str, session=None
+) -> AvailabilityBulkWriteResult:
+    log.info("inside update_club_service_availability(update_availability=%s)", update_availability)
+
+    return bulk_write_club_service_availability(
+        availability=update_availability,
+        club_service_id=club_service_id,
+        upsert=False,
+        session=session,
+    )
@@ -2,14 +2,14 @@ from uuid import UUID
 
 from models.user.country_internal import CountryInternal
 from data.db import get_countries_collection
-from logging_config import log
+from logging_config import log, summarize
 from decorators import atomic_transaction
 from typing import Optional
 
 country_collection = get_countries_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def list_country(session=None) -> Optional[list[CountryInternal]]:
     log.info("Fetching all countries")
 
@@ -35,6 +35,6 @@ def fetch_country_by_uuid(country_id: UUID) -> CountryInternal | None:
     else:
         retval = CountryInternal(**country)
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
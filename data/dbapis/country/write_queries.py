@@ -2,7 +2,8 @@ from data.db import get_countries_collection
 from logging_config import log
 from models.user.country_internal import CountryInternal
 from fastapi import HTTPException, status
-from decorators import atomic_transaction
+from decorators import atomic_transaction, run_after_commit
+from utils.response_cache import COUNTRIES_RESPONSE_CACHE_KEY, response_cache
 
 country_collection = get_countries_collection()
 
@@ -30,4 +31,6 @@ def save_country(country: CountryInternal, session=None) -> CountryInternal:
             detail="Failed to insert the country into the database"
         )
 
+    run_after_commit(session, response_cache.invalidate, COUNTRIES_RESPONSE_CACHE_KEY)
+
     return country
@@ -1 +1,4 @@
-from .generic_get_query_with_pagination import generic_get_query_with_pagination
\ No newline at end of file
+from .generic_get_query_with_pagination import (
+    generic_get_query_with_pagination,
+    generic_get_query_with_pagination_and_facets
+)
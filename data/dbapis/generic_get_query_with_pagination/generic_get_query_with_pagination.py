@@ -1,95 +1,370 @@
-from models.generic_get_query_with_pagination import GenericGetQueryWithPaginationDTO
+from typing import Any, Optional
+
+from data.projections import get_lookup_projections, get_projection
+from models.generic_get_query_with_pagination import Filter, GenericGetQueryWithPaginationDTO, Lookup, Sort
 from decorators import atomic_transaction
 from logging_config import log
 
 
-# NOTE ON POTENTIAL PERFORMANCE OPTIMIZATION:
-#  A possible way of performance improvement is to apply the filters before the lookups,
-# thus limiting the number of documents for joins to be made. However, filters on fields which
-# become available only after a lookup cannot be applied this way. To take advantage of this
-# procedure, in filter predicates, there should be a way to differentiate between fields which
-# belong to the primary collection and which become accessible only after the lookups; potentially
-# passing the info from the logic layer through dtos.
-@atomic_transaction
+# NOTE ON THE ORDER OF THE STAGES:
+#  The filters and sorts are classified as the ones on the fields of the primary collection and
+# the ones on the fields which become available only after a lookup (i.e. the field_name starts
+# with the `as_key_name` of a lookup). The primary filters are always applied before the lookups,
+# thus limiting the number of documents for joins to be made (and letting the $match use the
+# indexes of the primary collection). If additionally no filter or sort refers to a looked-up
+# field, the sort and the pagination are applied before the lookups as well, and the joins are
+# made only for the documents of the page being returned.
+#  In keyset pagination mode the predicate selecting the documents after the cursor is applied
+# right before the sort (MongoDB coalesces it with a preceding $match, so that the indexes are
+# still used).
+#  When the total count or the facets are requested, the filters and the sort are applied ahead
+# of a single $facet stage, whose branches select the page and count the documents.
+#  The documents are projected on the fields of the final_output_model (see data/projections.py),
+# the page right after it is selected, and the looked-up documents on the fields of the models of
+# the looked-up fields, inside the $lookup. Hence neither the fields discarded by the model nor
+# the whole joined documents are transferred.
+@atomic_transaction(read_only=True)
 def generic_get_query_with_pagination(
         primary_collection,
         generic_get_query_dto: GenericGetQueryWithPaginationDTO,
         session=None
 ):
-    log.info(f"inside generic_get_query_with_pagination(primary_collection={primary_collection}, "
-             f"generic_get_query_dto={generic_get_query_dto})")
-
-    pipeline = []
-
-    # formulate all the lookup stages and unwind stages if applicable
-    # and append it to the pipeline
-    # if the DTO includes lookups
-    if generic_get_query_dto.lookups:
-        for lookup in generic_get_query_dto.lookups:
-            lookup_stage = {
-                "$lookup": {
-                    "from": lookup.from_collection,
-                    "localField": lookup.local_field,
-                    "foreignField": lookup.foreign_field,
-                    "as": lookup.as_key_name
-                }
+    log.info("inside generic_get_query_with_pagination(primary_collection=%s, generic_get_query_dto=%s)",
+             primary_collection.name, generic_get_query_dto)
+
+    pipeline = build_generic_get_query_pipeline(generic_get_query_dto=generic_get_query_dto)
+
+    log.info("executing pipeline=%s", pipeline)
+
+    database_cursor = primary_collection.aggregate(pipeline=pipeline, session=session)
+
+    return database_cursor
+
+
+@atomic_transaction(read_only=True)
+def generic_get_query_with_pagination_and_facets(
+        primary_collection,
+        generic_get_query_dto: GenericGetQueryWithPaginationDTO,
+        session=None
+) -> dict:
+    """
+    fetches the page along with the total count of the matching documents (if with_total is set)
+    and the grouped counts of the facet fields, in a single aggregation. without filters, the
+    total count is the estimated document count of the collection (from its metadata) instead.
+
+    :return: {"items": [...], "total_count": int | None, "facets": {field_name: [{"value": ..., "count": int}]}}
+    """
+    log.info("inside generic_get_query_with_pagination_and_facets(primary_collection=%s, "
+             "generic_get_query_dto=%s)", primary_collection.name, generic_get_query_dto)
+
+    facet_fields = generic_get_query_dto.facet_fields or []
+    is_estimated_count = generic_get_query_dto.with_total and not generic_get_query_dto.filters
+
+    pipeline = build_generic_get_query_facet_pipeline(
+        generic_get_query_dto=generic_get_query_dto,
+        with_count=generic_get_query_dto.with_total and not is_estimated_count
+    )
+
+    log.info("executing pipeline=%s", pipeline)
+
+    facet_result = next(primary_collection.aggregate(pipeline=pipeline, session=session))
+
+    total_count = None
+
+    if is_estimated_count:
+        # the count command can't run in a transaction, hence no session
+        total_count = primary_collection.estimated_document_count()
+
+    elif generic_get_query_dto.with_total:
+        # $count yields no document at all when nothing matches
+        total_count = facet_result["total_count"][0]["count"] if facet_result["total_count"] else 0
+
+    retval = {
+        "items": facet_result["items"],
+        "total_count": total_count,
+        "facets": {
+            field_name: [
+                {"value": group["_id"], "count": group["count"]}
+                for group in facet_result[f"facet_{field_name}"]
+            ]
+            for field_name in facet_fields
+        }
+    }
+
+    log.info("returning total_count=%s, facets=%s", retval["total_count"], retval["facets"])
+
+    return retval
+
+
+def build_generic_get_query_pipeline(generic_get_query_dto: GenericGetQueryWithPaginationDTO) -> list[dict]:
+    """
+    builds the aggregation pipeline for the provided DTO, see the note above for the order of the stages
+
+    :param generic_get_query_dto: GenericGetQueryWithPaginationDTO
+    :return: the aggregation pipeline
+    """
+    filter_stages, keyset_stages, sort_stages, page_stages = build_generic_get_query_stages(
+        generic_get_query_dto=generic_get_query_dto
+    )
+
+    return filter_stages + keyset_stages + sort_stages + page_stages
+
+
+def build_generic_get_query_facet_pipeline(
+        generic_get_query_dto: GenericGetQueryWithPaginationDTO,
+        with_count: bool
+) -> list[dict]:
+    """
+    builds the aggregation pipeline yielding a single document with the page (`items`), the total
+    count (`total_count`, if with_count is set) and the grouped counts of every facet field
+    (`facet_<field_name>`)
+
+    :param generic_get_query_dto: GenericGetQueryWithPaginationDTO
+    :param with_count: whether to count the matching documents
+    :return: the aggregation pipeline
+    """
+    filter_stages, keyset_stages, sort_stages, page_stages = build_generic_get_query_stages(
+        generic_get_query_dto=generic_get_query_dto
+    )
+
+    # the documents of the previous pages still count, hence the keyset predicate only
+    # applies to the page. the page must be paginated (see
+    # generic_get_query_with_pagination_logic), the result is a single BSON document
+    facet = {"items": keyset_stages + page_stages}
+
+    if with_count:
+        facet["total_count"] = [{"$count": "count"}]
+
+    for field_name in generic_get_query_dto.facet_fields or []:
+        facet[f"facet_{field_name}"] = [
+            {"$group": {"_id": f"${field_name}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ]
+
+    # the sort stays ahead of the $facet, where it can still be served by an index
+    return filter_stages + sort_stages + [{"$facet": facet}]
+
+
+def build_generic_get_query_stages(
+        generic_get_query_dto: GenericGetQueryWithPaginationDTO
+) -> tuple[list[dict], list[dict], list[dict], list[dict]]:
+    """
+    builds the stages selecting the matching documents, the stage selecting the documents after
+    the keyset (if any), the stage sorting them, and the stages selecting the page (along with
+    the lookups which can be made for the page alone)
+
+    :param generic_get_query_dto: GenericGetQueryWithPaginationDTO
+    :return: (filter_stages, keyset_stages, sort_stages, page_stages)
+    """
+    lookups = generic_get_query_dto.lookups or []
+    lookup_key_names = {lookup.as_key_name for lookup in lookups}
+
+    primary_filters, lookup_filters = [], []
+
+    for filter_predicate in generic_get_query_dto.filters or []:
+        if is_lookup_field(field_name=filter_predicate.field_name, lookup_key_names=lookup_key_names):
+            lookup_filters.append(filter_predicate)
+        else:
+            primary_filters.append(filter_predicate)
+
+    is_sorted_by_lookup_field = any(
+        is_lookup_field(field_name=sort.field_name, lookup_key_names=lookup_key_names)
+        for sort in generic_get_query_dto.sorts or []
+    )
+
+    filter_stages, keyset_stages = [], []
+
+    if primary_filters:
+        filter_stages.append(get_match_stage(filters=primary_filters))
+
+    if generic_get_query_dto.keyset_values:
+        keyset_stages.append({
+            "$match": get_keyset_predicate(
+                sorts=generic_get_query_dto.sorts,
+                keyset_values=generic_get_query_dto.keyset_values
+            )
+        })
+
+    sort_stages = get_sort_stages(generic_get_query_dto=generic_get_query_dto)
+    page_stages = get_pagination_stages(generic_get_query_dto=generic_get_query_dto)
+    page_stages.extend(get_projection_stages(generic_get_query_dto=generic_get_query_dto))
+
+    lookup_projections = get_lookup_projections(model=generic_get_query_dto.final_output_model)
+
+    if lookup_filters or is_sorted_by_lookup_field:
+        filter_stages.extend(get_lookup_stages(lookups=lookups, lookup_projections=lookup_projections))
+
+        if lookup_filters:
+            filter_stages.append(get_match_stage(filters=lookup_filters))
+
+    else:
+        # $lookup and $unwind (of a one-to-one lookup, where preserveNullAndEmptyArrays is set)
+        # preserve the order and the number of the documents, so the page can be selected first
+        page_stages.extend(get_lookup_stages(lookups=lookups, lookup_projections=lookup_projections))
+
+    return filter_stages, keyset_stages, sort_stages, page_stages
+
+
+def is_lookup_field(field_name: str, lookup_key_names: set[str]) -> bool:
+    """
+    whether the field (e.g. `certifications.name`) becomes available only after a lookup
+    """
+    return field_name.split(".")[0] in lookup_key_names
+
+
+def get_projection_stages(generic_get_query_dto: GenericGetQueryWithPaginationDTO) -> list[dict]:
+    projection = get_projection(model=generic_get_query_dto.final_output_model)
+
+    return [{"$project": projection}] if projection else []
+
+
+def get_lookup_stages(lookups: list[Lookup], lookup_projections: Optional[dict[str, dict]] = None) -> list[dict]:
+    """
+    formulates the lookup stages, and the unwind stages of the one-to-one lookups
+
+    :param lookups: the lookups of the final_output_model
+    :param lookup_projections: {as_key_name: projection} of the looked-up documents (see
+                               get_lookup_projections), the documents of the other lookups are
+                               joined whole
+    :return: the stages
+    """
+    lookup_projections = lookup_projections or {}
+    stages = []
+
+    for lookup in lookups:
+        lookup_stage = {
+            "$lookup": {
+                "from": lookup.from_collection,
+                "localField": lookup.local_field,
+                "foreignField": lookup.foreign_field,
+                "as": lookup.as_key_name
             }
+        }
+
+        # localField/foreignField along with a pipeline (mongodb 5.0+) keeps the equality
+        # match (and the index on the foreignField) while projecting the joined documents
+        if lookup.as_key_name in lookup_projections:
+            lookup_stage["$lookup"]["pipeline"] = [{"$project": lookup_projections[lookup.as_key_name]}]
 
-            pipeline.append(lookup_stage)
+        stages.append(lookup_stage)
 
-            if lookup.is_one_to_one:
-                unwind_stage = {
-                    "$unwind": {
-                        "path": f"${lookup.as_key_name}",
-                        "preserveNullAndEmptyArrays": True
-                    }
+        if lookup.is_one_to_one:
+            unwind_stage = {
+                "$unwind": {
+                    "path": f"${lookup.as_key_name}",
+                    "preserveNullAndEmptyArrays": True
                 }
+            }
+
+            stages.append(unwind_stage)
+
+    return stages
 
-                pipeline.append(unwind_stage)
 
+def get_match_stage(filters: list[Filter]) -> dict:
     # formulate all the filter predicates
     # format the filter stage using the predicates
-    # append the stage to the pipeline
-    # if the DTO includes filters
-    if generic_get_query_dto.filters:
-        filter_dict = {}
-
-        for filter_predicate in generic_get_query_dto.filters:
-            filter_dict[filter_predicate.field_name] = {
-                f"${filter_predicate.operator}": filter_predicate.value
-            }
+    filter_dict = {}
 
-        pipeline.append({
-            "$match": filter_dict
-        })
+    for filter_predicate in filters:
+        filter_dict[filter_predicate.field_name] = {
+            f"${filter_predicate.operator}": filter_predicate.value
+        }
+
+    return {
+        "$match": filter_dict
+    }
+
+
+def get_keyset_predicate(sorts: list[Sort], keyset_values: list[Any]) -> dict:
+    """
+    formulates the predicate matching the documents that come after the keyset in the sort order,
+    e.g. for the sorts `a$asc, id$asc` and the keyset (x, y): a > x OR (a == x AND id > y).
+    the last sort is always `id$asc`, hence the keyset is unique.
+
+    $gt/$lt only compare the values of the same type, whereas the null (and missing) values are
+    sorted before all the others, so they are matched explicitly (see get_keyset_range_predicate).
+
+    :param sorts: the sorts of the query
+    :param keyset_values: the values of the sort fields of the last document of the previous page
+    :return: the predicate of a $match stage
+    """
+    or_predicates = []
+
+    for index, sort in enumerate(sorts):
+        range_predicate = get_keyset_range_predicate(
+            field_name=sort.field_name, operator=sort.operator, keyset_value=keyset_values[index]
+        )
+
+        # nothing comes after a null in descending order
+        if range_predicate is None:
+            continue
+
+        # {field_name: None} matches the null and the missing values alike
+        predicate = {
+            previous_sort.field_name: keyset_values[previous_index]
+            for previous_index, previous_sort in enumerate(sorts[:index])
+        }
+        predicate.update(range_predicate)
+
+        or_predicates.append(predicate)
+
+    # a $match can't take an empty $or, the keyset was the last document
+    return {"$or": or_predicates} if or_predicates else {"_id": {"$exists": False}}
+
+
+def get_keyset_range_predicate(field_name: str, operator: str, keyset_value: Any) -> Optional[dict]:
+    """
+    formulates the predicate matching the values of the field that come after the keyset value,
+    None if no value does
+
+    :param field_name: the sort field
+    :param operator: the sort operator, asc or desc
+    :param keyset_value: the value of the field of the last document of the previous page
+    :return: the predicate, or None
+    """
+    if operator == "asc":
+        if keyset_value is None:
+            return {field_name: {"$ne": None}}
+
+        return {field_name: {"$gt": keyset_value}}
+
+    if keyset_value is None:
+        return None
+
+    return {"$or": [{field_name: {"$lt": keyset_value}}, {field_name: None}]}
+
+
+def get_sort_stages(generic_get_query_dto: GenericGetQueryWithPaginationDTO) -> list[dict]:
+    stages = []
 
     # formulate all the sort predicates
-    # format the filter stage using the predicates
-    # append the stage to the pipeline
+    # format the sort stage using the predicates
     # if the DTO includes sorts
     if generic_get_query_dto.sorts:
-        log.debug(f"sorts: {generic_get_query_dto.sorts}")
+        log.debug("sorts: %s", generic_get_query_dto.sorts)
 
         sort_dict = {sort.field_name: 1 if sort.operator == "asc" else -1 for sort in generic_get_query_dto.sorts}
 
-        pipeline.append({
+        stages.append({
             "$sort": sort_dict
         })
 
+    return stages
+
+
+def get_pagination_stages(generic_get_query_dto: GenericGetQueryWithPaginationDTO) -> list[dict]:
+    stages = []
+
     # formulate skip and limit as per pagination requirements
-    # append the stage to the pipeline
     # if the DTO includes pagination
     if generic_get_query_dto.pagination:
-        pipeline.append({
+        stages.append({
             "$skip": (generic_get_query_dto.pagination.page_no - 1) * generic_get_query_dto.pagination.page_size
         })
 
-        pipeline.append({
+        stages.append({
             "$limit": generic_get_query_dto.pagination.page_size
         })
 
-    log.info(f"executing pipeline={pipeline}")
-
-    database_cursor = primary_collection.aggregate(pipeline=pipeline, session=session)
-
-    return database_cursor
+    return stages
@@ -1,15 +1,10 @@
 from .read_queries import (
-    get_all_club_to_club_service_bookings_db,
-    get_all_user_transfer_service_bookings_db,
-    get_club_to_club_service_booking_by_booking_id_db,
-    get_luggage_transfer_service_by_booking_id,
-    get_user_transfer_service_booking_by_booking_id,
+    get_all_service_bookings_db,
+    get_service_booking_by_booking_id_db,
+    get_service_bookings_paginated_db,
 )
 from .write_queries import (
-    save_club_to_club_service_booking_db,
-    save_luggage_transfer_service_booking_db,
-    save_user_transfer_service_booking_db,
-    update_club_to_club_service_booking_db,
-    update_luggage_transfer_service_booking_db,
-    update_user_transfer_service_booking_db,
+    migrate_legacy_service_bookings,
+    save_service_booking_db,
+    update_service_booking_db,
 )
@@ -1,191 +1,117 @@
-from pymongo.collection import Collection
+from pymongo import DESCENDING
+from pymongo.cursor import Cursor
 
-from data.db import convert_to_object_id
+from data.db import convert_to_object_id, get_logistics_bookings_collection
 from logging_config import log
-from utils.logistics_utils import (
-    LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING,
-    LogisticsService,
-)
+from utils.logistics_utils import LogisticsService
 
+# newest first, _id breaks the ties (see the index of logistics_bookings)
+BOOKINGS_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
 
-def get_booking(collection: Collection, booking_id: str, consumer_id: str):
-    """based on the collection, booking_id and consumer_id return the booking"""
 
-    log.info(
-        f"get_booking() invoked for booking_id {booking_id} consumer_id {consumer_id}"
-    )
-
-    filter = {
-        "consumer.consumer_id": consumer_id,
-        "_id": convert_to_object_id(booking_id),
-    }
-
-    return collection.find_one(filter=filter)
-
-
-def get_all_bookings(consumer_id: str, collection: Collection):
-    """return all the bookings for the consumer
-
-    Args:
-        collection (Collection)
-    """
-    log.info(f"get_all_bookings() invoked consumer_id {consumer_id}")
-    return collection.find({"consumer.consumer_id": consumer_id})
-
-
-def get_all_club_to_club_service_bookings_db(consumer_id: str):
-    """returns all the club to club service booking for the user
-
-    Returns:
-        list of all bookings
-    """
-    log.info(f"get_all_club_to_club_service_bookings_db() invoked")
-
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.CLUB_TO_CLUB.value
-    )
-    return get_all_bookings(consumer_id=consumer_id, collection=collection)
-
-
-def get_club_to_club_service_booking_by_booking_id_db(
+def get_service_booking_by_booking_id_db(
     consumer_id: str,
     booking_id: str,
+    service_type: str,
 ) -> dict:
-    """return the club to club service booking for a particular booking id
+    """return the consumer's booking of the given service type for a particular
+    booking id
 
     Args:
         consumer_id (str)
         booking_id (str)
+        service_type (str): type of logistics service of the booking
 
     """
 
     log.info(
-        f"get_club_to_club_service_booking_by_booking_id_db() invoked consumer_id {consumer_id} booking_id {booking_id}"
+        "get_service_booking_by_booking_id_db() invoked consumer_id %s "
+        "booking_id %s service_type %s",
+        consumer_id, booking_id, service_type,
     )
 
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.CLUB_TO_CLUB.value
-    )
+    filter = {
+        "consumer.consumer_id": consumer_id,
+        "service_type": service_type,
+        "_id": convert_to_object_id(booking_id),
+    }
 
-    booking = get_booking(
-        collection=collection, booking_id=booking_id, consumer_id=consumer_id
-    )
+    booking = get_logistics_bookings_collection().find_one(filter=filter)
 
-    log.info(f"get_club_to_club_service_booking_by_booking_id_db() returning {booking}")
+    log.info("get_service_booking_by_booking_id_db() returning %s", booking)
 
     return booking
 
 
-def get_user_transfer_service_booking_by_booking_id(
-    consumer_id: str,
-    booking_id: str,
-) -> dict:
-    """return the user transfer service booking for a particular booking id
+def get_all_service_bookings_db(consumer_id: str, service_type: str) -> Cursor:
+    """returns all the bookings of the given service type for the consumer, newest
+    first
 
     Args:
         consumer_id (str)
-        booking_id (str)
-
-    """
-
-    log.info(
-        f"get_user_transfer_service_booking_by_booking_id() invoked consumer_id {consumer_id} booking_id {booking_id}"
-    )
-
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.USER_TRANSFER.value
-    )
-
-    booking = get_booking(
-        collection=collection, booking_id=booking_id, consumer_id=consumer_id
-    )
-
-    log.info(f"get_user_transfer_service_booking_by_booking_id() returning {booking}")
-
-    return booking
-
-
-def get_all_user_transfer_service_bookings_db(consumer_id: str):
-    """returns all the user transfer service booking for the user
+        service_type (str): type of logistics service
 
     Returns:
-        list of all bookings
+        Cursor: the bookings
     """
-    log.info(f"get_all_user_transfer_service_bookings_db() invoked")
-
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.USER_TRANSFER.value
-    )
-    return get_all_bookings(consumer_id=consumer_id, collection=collection)
-
-
-def get_user_transfer_service_booking_by_booking_id(
-    consumer_id: str,
-    booking_id: str,
-) -> dict:
-    """return the user transfer service booking for a particular booking id
-
-    Args:
-        consumer_id (str)
-        booking_id (str)
-
-    """
-
     log.info(
-        f"get_user_transfer_service_booking_by_booking_id() invoked consumer_id {consumer_id} booking_id {booking_id}"
+        "get_all_service_bookings_db() invoked consumer_id %s "
+        "service_type %s",
+        consumer_id, service_type,
     )
 
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.USER_TRANSFER.value
-    )
+    filter = {"consumer.consumer_id": consumer_id, "service_type": service_type}
 
-    booking = get_booking(
-        collection=collection, booking_id=booking_id, consumer_id=consumer_id
-    )
+    return get_logistics_bookings_collection().find(filter).sort(BOOKINGS_SORT)
 
-    log.info(f"get_user_transfer_service_booking_by_booking_id() returning {booking}")
 
-    return booking
-
-
-def get_luggage_transfer_service_by_booking_id(
+def get_service_bookings_paginated_db(
     consumer_id: str,
-    booking_id: str,
-) -> dict:
-    """return the luggage transfer service booking for a particular booking id
+    service_types: list[str] | None = None,
+    page_no: int = 1,
+    page_size: int = 20,
+) -> list[dict]:
+    """returns a page of the consumer's bookings across the given service types (all of
+    them by default), newest first, in a single query
+
+    The service types are always matched with an $in (all the types when none is
+    given): the index on (consumer.consumer_id, service_type, created_at) then serves
+    the query for any number of types, the planner merges the already sorted runs of
+    each type instead of sorting all the bookings of the consumer in memory.
 
     Args:
         consumer_id (str)
-        booking_id (str)
+        service_types (list[str] | None): types of logistics service to include
+        page_no (int): 1-based page number
+        page_size (int)
 
+    Returns:
+        list[dict]: the bookings of the page
     """
-
     log.info(
-        f"get_luggage_transfer_service_by_booking_id() invoked consumer_id {consumer_id} booking_id {booking_id}"
+        "get_service_bookings_paginated_db() invoked consumer_id %s "
+        "service_types %s page_no %s page_size %s",
+        consumer_id,
+        service_types,
+        page_no,
+        page_size,
     )
 
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.LUGGAGE_TRANSFER.value
-    )
+    filter = {
+        "consumer.consumer_id": consumer_id,
+        "service_type": {
+            "$in": service_types or [service.value for service in LogisticsService]
+        },
+    }
 
-    booking = get_booking(
-        collection=collection, booking_id=booking_id, consumer_id=consumer_id
+    bookings = list(
+        get_logistics_bookings_collection()
+        .find(filter)
+        .sort(BOOKINGS_SORT)
+        .skip((page_no - 1) * page_size)
+        .limit(page_size)
     )
 
-    log.info(f"get_luggage_transfer_service_by_booking_id() returning {booking}")
-
-    return booking
-
+    log.info("get_service_bookings_paginated_db() returning %s bookings", len(bookings))
 
-def get_all_luggage_transfer_service_bookings_db(consumer_id: str):
-    """returns all the luggage transfer service booking for the user
-
-    Returns:
-        list of all bookings
-    """
-    log.info(f"get_all_luggage_transfer_service_bookings_db() invoked")
-
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.LUGGAGE_TRANSFER.value
-    )
-    return get_all_bookings(consumer_id=consumer_id, collection=collection)
+    return bookings
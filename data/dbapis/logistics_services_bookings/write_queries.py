@@ -1,204 +1,146 @@
-from pymongo.collection import Collection
+from pymongo import UpdateOne
 
 from api.logistics.models import (
     UpdateClubToClubServiceBooking,
     UpdateLuggageTransferServiceBooking,
     UpdateUserTransferServiceBooking,
 )
-from data.db import convert_to_object_id, get_collection
+from data.db import (
+    convert_to_object_id,
+    get_collection,
+    get_logistics_bookings_collection,
+)
 from logging_config import log
 from models.logistics_service_bookings import (
     ClubToClubServiceBookingInternal,
     LuggageTransferServiceBookingInternal,
     UserTransferServiceBookingInternal,
 )
-from utils.logistics_utils import (
-    LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING,
-    LogisticsService,
-)
+from utils.logistics_utils import LEGACY_LOGISTICS_SERVICE_BOOKINGS_COLLECTION_NAMES
+
+MIGRATION_BATCH_SIZE = 1000
 
 
-def save_booking(
-    booking: ClubToClubServiceBookingInternal | None,
-    collection: Collection,
+def save_service_booking_db(
+    booking: (
+        ClubToClubServiceBookingInternal
+        | UserTransferServiceBookingInternal
+        | LuggageTransferServiceBookingInternal
+    ),
+    session=None,
 ) -> str:
-    """saves the provided booking details for a particular service
+    """saves a booking of any service type, the type is saved along with it
+    (`service_type`)
 
     Args:
-        booking (ClubToClubServiceBookingInternal | None): booking details
-        collection (Collection): collection to save in
+        booking: booking details
+        session: the session of the transaction to save the booking in, if any
 
     Returns:
         str: booking id of the booking
     """
 
-    log.info(f"save_booking invoked {booking}")
+    log.info("save_service_booking_db() invoked %s", booking)
 
-    booking_id = (collection.insert_one(booking.model_dump())).inserted_id
+    collection = get_logistics_bookings_collection()
+    booking_id = (
+        collection.insert_one(booking.model_dump(), session=session)
+    ).inserted_id
     retval = str(booking_id)
 
-    log.info(f"save_booking() returning booking id {retval}")
+    log.info("save_service_booking_db() returning booking id %s", retval)
 
     return retval
 
 
-def save_club_to_club_service_booking_db(
-    booking: ClubToClubServiceBookingInternal,
-) -> str:
-    """saves a club to club service booking in the database
-
-    Args:
-        booking (ClubToClubServiceBookingInternal): booking details
-    """
-    log.info(f"save_club_to_club_service_booking_db() invoked")
-
-    club_to_club_service_booking_collection = (
-        LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-            LogisticsService.CLUB_TO_CLUB.value
-        )
-    )
-    return save_booking(
-        booking=booking, collection=club_to_club_service_booking_collection
-    )
-
-
-def update_club_to_club_service_booking_db(
+def update_service_booking_db(
+    consumer_id: str,
     booking_id: str,
-    booking: UpdateClubToClubServiceBooking,
+    service_type: str,
+    booking: (
+        UpdateClubToClubServiceBooking
+        | UpdateUserTransferServiceBooking
+        | UpdateLuggageTransferServiceBooking
+    ),
 ) -> bool:
-    """update the club to club service booking based on booking id
+    """update the consumer's booking of the given service type based on booking id,
+    the bookings of the other consumers are never matched
 
     Args:
+        consumer_id (str)
         booking_id: str
-        booking (UpdateClubToClubServiceBooking)
+        service_type (str): type of logistics service of the booking
+        booking: the fields to update
     """
 
     log.info(
-        f"update_club_to_club_service_booking_db() invoked booking_id {booking_id} booking {booking}"
+        "update_service_booking_db() invoked consumer_id %s booking_id %s "
+        "service_type %s booking %s",
+        consumer_id, booking_id, service_type, booking,
     )
 
-    filter = {"_id": convert_to_object_id(booking_id)}
+    filter = {
+        "consumer.consumer_id": consumer_id,
+        "service_type": service_type,
+        "_id": convert_to_object_id(booking_id),
+    }
     update = {k: v for k, v in booking.model_dump().items() if v != None and k != "_id"}
 
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.CLUB_TO_CLUB.value
-    )
-
     if not update:
         return False
 
+    collection = get_logistics_bookings_collection()
     update_response = collection.update_one(filter=filter, update={"$set": update})
 
     log.info(
-        f"matched_count={update_response.matched_count}, modified_count={update_response.modified_count}"
+        "matched_count=%s, modified_count=%s",
+        update_response.matched_count, update_response.modified_count,
     )
 
     return update_response.modified_count == 1
 
 
-def save_user_transfer_service_booking_db(
-    booking: UserTransferServiceBookingInternal,
-) -> str:
-    """saves a user transfer service booking in the database
-
-    Args:
-        booking (UserTransferServiceBookingInternal): booking details
-    """
-    log.info(f"save_user_transfer_service_booking_db() invoked")
-
-    user_transfer_service_booking_collection = (
-        LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-            LogisticsService.USER_TRANSFER.value
-        )
-    )
-    return save_booking(
-        booking=booking, collection=user_transfer_service_booking_collection
-    )
-
-
-def update_user_transfer_service_booking_db(
-    booking_id: str,
-    booking: UpdateUserTransferServiceBooking,
-) -> bool:
-    """update the user transfer service booking based on booking id
-
-    Args:
-        booking_id: str
-        booking (UpdateUserTransferServiceBooking)
-    """
-
-    log.info(
-        f"update_user_transfer_service_booking_db() invoked booking_id {booking_id} booking {booking}"
-    )
-
-    filter = {"_id": convert_to_object_id(booking_id)}
-    update = {k: v for k, v in booking.model_dump().items() if v != None and k != "_id"}
-
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.USER_TRANSFER.value
-    )
-
-    if not update:
-        return False
-
-    update_response = collection.update_one(filter=filter, update={"$set": update})
-
-    log.info(
-        f"matched_count={update_response.matched_count}, modified_count={update_response.modified_count}"
-    )
-
-    return update_response.modified_count == 1
-
+def migrate_legacy_service_bookings() -> dict[str, int]:
+    """one-off migration of the bookings saved in one collection per service type
+    (LEGACY_LOGISTICS_SERVICE_BOOKINGS_COLLECTION_NAMES) to the bookings collection.
 
-def save_luggage_transfer_service_booking_db(
-    booking: LuggageTransferServiceBookingInternal,
-) -> str:
-    """saves a luggage transfer service booking in the database
+    The bookings keep their _id, so the booking ids handed out stay valid, and get
+    their `service_type`. Only the bookings that are not in the bookings collection yet
+    are inserted, hence the migration is safe to run more than once (e.g. again right
+    before switching over): the bookings migrated earlier, and possibly updated since,
+    are left untouched, as are the legacy collections.
 
-    Args:
-        booking (LuggageTransferServiceBookingInternal): booking details
+    Returns:
+        dict[str, int]: service type -> number of bookings migrated by this run
     """
-    log.info(f"save_luggage_transfer_service_booking_db() invoked")
 
-    luggage_transfer_service_booking_collection = (
-        LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-            LogisticsService.LUGGAGE_TRANSFER.value
-        )
-    )
-    return save_booking(
-        booking=booking, collection=luggage_transfer_service_booking_collection
-    )
+    log.info("migrate_legacy_service_bookings() invoked")
 
+    bookings_collection = get_logistics_bookings_collection()
+    migrated = {}
 
-def update_luggage_transfer_service_booking_db(
-    booking_id: str,
-    booking: UpdateLuggageTransferServiceBooking,
-) -> bool:
-    """update the luggage transfer service booking based on booking id
+    for service_type, collection_name in (
+        LEGACY_LOGISTICS_SERVICE_BOOKINGS_COLLECTION_NAMES.items()
+    ):
+        legacy_collection = get_collection(collection_name=collection_name)
+        migrated[service_type] = 0
+        requests = []
 
-    Args:
-        booking_id: str
-        booking (UpdateLuggageTransferServiceBooking)
-    """
+        for booking in legacy_collection.find(batch_size=MIGRATION_BATCH_SIZE):
+            booking["service_type"] = service_type
+            requests.append(
+                UpdateOne({"_id": booking["_id"]}, {"$setOnInsert": booking}, upsert=True)
+            )
 
-    log.info(
-        f"update_luggage_transfer_service_booking_db() invoked booking_id {booking_id} booking {booking}"
-    )
+            if len(requests) == MIGRATION_BATCH_SIZE:
+                result = bookings_collection.bulk_write(requests, ordered=False)
+                migrated[service_type] += result.upserted_count
+                requests = []
 
-    filter = {"_id": convert_to_object_id(booking_id)}
-    update = {k: v for k, v in booking.model_dump().items() if v != None and k != "_id"}
+        if requests:
+            result = bookings_collection.bulk_write(requests, ordered=False)
+            migrated[service_type] += result.upserted_count
 
-    collection = LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING.get(
-        LogisticsService.LUGGAGE_TRANSFER.value
-    )
+    log.info("migrate_legacy_service_bookings() returning : %s", migrated)
 
-    if not update:
-        return False
-
-    update_response = collection.update_one(filter=filter, update={"$set": update})
-
-    log.info(
-        f"matched_count={update_response.matched_count}, modified_count={update_response.modified_count}"
-    )
-
-    return update_response.modified_count == 1
+    return migrated
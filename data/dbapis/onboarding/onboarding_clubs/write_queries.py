@@ -1,8 +1,13 @@
 from bson import ObjectId
 from data.db import get_clubs_collection
+from utils.response_cache import CLUBS_RESPONSE_CACHE_KEY, response_cache
 
 clubs_collection = get_clubs_collection()
 
 
 def update_club(club_id: str, updated_club_request: dict):
-    return clubs_collection.update_one({'_id': ObjectId(club_id)}, {'$set': updated_club_request})
+    result = clubs_collection.update_one({'_id': ObjectId(club_id)}, {'$set': updated_club_request})
+
+    response_cache.invalidate(CLUBS_RESPONSE_CACHE_KEY)
+
+    return result
@@ -7,7 +7,7 @@ from data.db import get_reset_password_otp_collection
 reset_password_otp_collection = get_reset_password_otp_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_reset_password_otp(session=None, **kwargs) -> Optional[ResetPasswordOtpInternal]:
     log.info(f"inside find_reset_password_otp({kwargs})")
 
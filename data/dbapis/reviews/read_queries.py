@@ -1,6 +1,10 @@
-from data.db import get_reviews_collection
+from data.db import get_club_rating_summaries_collection, get_reviews_collection
+from data.projections import get_projection
+from logging_config import log, summarize
+from models.ratings import ClubRatingSummaryInternal
 
 reviews_collection = get_reviews_collection()
+club_rating_summaries_collection = get_club_rating_summaries_collection()
 
 
 def get_review_by_reviewer_for_reviewee(reviwer: str, reviewee: str):
@@ -9,3 +13,28 @@ def get_review_by_reviewer_for_reviewee(reviwer: str, reviewee: str):
         'reviewer.reviewer_id': reviwer
     }
     return reviews_collection.find_one(query)
+
+
+def find_club_rating_summaries(club_ids: list[str], session=None) -> dict[str, ClubRatingSummaryInternal]:
+    """
+    returns the rating summaries of the clubs with a single query, the clubs without
+    reviews have none
+
+    :param club_ids: the ids of the clubs
+    :return: {club_id: ClubRatingSummaryInternal}
+    """
+    log.info("inside find_club_rating_summaries(club_ids=%s)", summarize(club_ids))
+
+    club_rating_summaries = club_rating_summaries_collection.find(
+        {"club_id": {"$in": club_ids}},
+        projection=get_projection(ClubRatingSummaryInternal),
+        session=session,
+    )
+
+    retval = {
+        club_rating_summary["club_id"]: ClubRatingSummaryInternal(**club_rating_summary)
+        for club_rating_summary in club_rating_summaries
+    }
+
+    log.info("returning %s", summarize(retval))
+    return retval
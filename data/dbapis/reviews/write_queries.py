@@ -1,7 +1,236 @@
-from data.db import get_reviews_collection
+from collections import Counter, defaultdict
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import DeleteMany, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from data.db import (
+    convert_to_object_id,
+    get_club_rating_summaries_collection,
+    get_reviews_collection,
+)
+from decorators import atomic_transaction, run_after_commit
+from logging_config import log
+from models.ratings import ClubRatingSummaryInternal
+from models.user.enums import UserRoles
+from utils.date_time import get_current_utc_datetime
+from utils.response_cache import CLUBS_RESPONSE_CACHE_KEY, response_cache
 
 reviews_collection = get_reviews_collection()
+club_rating_summaries_collection = get_club_rating_summaries_collection()
+
+
+@atomic_transaction
+def create_review_for_club_by_user(review_instance: dict, session=None):
+    """
+    inserts the review of a club, and counts it in the rating summary of the club in the
+    same transaction
+
+    :param review_instance: the review (a dumped Review)
+    :return: the InsertOneResult
+    :raises HTTPException: 409 if the user has already reviewed the club
+    """
+    log.info("inside create_review_for_club_by_user(review_instance=%s)", review_instance)
+
+    try:
+        result = reviews_collection.insert_one(review_instance, session=session)
+
+    except DuplicateKeyError:
+        log.info("the user has already reviewed the club, raising exception...")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="the club has already been reviewed by the user",
+        )
+
+    update_club_rating_summary(
+        club_id=review_instance["reviewee"]["reviewee_id"],
+        rating=review_instance["rating"],
+        is_approved=review_instance.get("approved_by_khayyal_admin", False),
+        session=session,
+    )
+
+    return result
+
+
+@atomic_transaction
+def update_review_approval(review_id: str, approved: bool, session=None) -> bool:
+    """
+    approves (or withdraws the approval of) a review, and moves it in or out of the
+    approved ratings of the summary of the club in the same transaction
+
+    :param review_id: the _id of the review
+    :param approved: whether the review is approved
+    :return: True if the approval of the review changed, False if it was already set
+    :raises HTTPException: 404 if the review does not exist
+    """
+    log.info("inside update_review_approval(review_id=%s, approved=%s)", review_id, approved)
+
+    if not ObjectId.is_valid(review_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"review with id {review_id} not found",
+        )
+
+    review_filter = {"_id": convert_to_object_id(review_id)}
+
+    # the filter only matches a review whose approval changes, a repeated call leaves the
+    # summary untouched
+    review = reviews_collection.find_one_and_update(
+        {**review_filter, "approved_by_khayyal_admin": {"$ne": approved}},
+        {"$set": {"approved_by_khayyal_admin": approved}},
+        session=session,
+    )
+
+    if review is None:
+        if not reviews_collection.count_documents(review_filter, limit=1, session=session):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"review with id {review_id} not found",
+            )
+
+        log.info("the approval of the review is already set")
+        return False
+
+    if review["reviewee"]["reviewee_type"] == UserRoles.CLUB.value:
+        update_club_rating_summary(
+            club_id=review["reviewee"]["reviewee_id"],
+            rating=review["rating"],
+            delta=1 if approved else -1,
+            is_approved=True,
+            is_counted=False,
+            session=session,
+        )
+
+    return True
+
+
+def update_club_rating_summary(
+    club_id: str,
+    rating: float,
+    is_approved: bool,
+    delta: int = 1,
+    is_counted: bool = True,
+    session=None,
+):
+    """
+    adds (delta=1) or removes (delta=-1) a rating to the summary of the club, upserting
+    it, with a single update recomputing the averages. must be called in the transaction
+    writing the review, the cached club responses are invalidated once it commits
+
+    :param club_id: the id of the club
+    :param rating: the rating of the review
+    :param is_approved: whether the rating is counted in the approved ratings
+    :param delta: 1 to add the rating, -1 to remove it
+    :param is_counted: whether the rating is counted in the ratings of every review
+    """
+    log.info(
+        "inside update_club_rating_summary(club_id=%s, rating=%s, "
+        "is_approved=%s, delta=%s, is_counted=%s)",
+        club_id,
+        rating,
+        is_approved,
+        delta,
+        is_counted,
+    )
+
+    prefixes = ([""] if is_counted else []) + (["approved_"] if is_approved else [])
+
+    if not prefixes:
+        return
+
+    def add(field_name: str, value):
+        return {"$add": [{"$ifNull": [f"${field_name}", 0]}, value]}
+
+    counts, averages = {}, {}
+
+    for prefix in prefixes:
+        counts[f"{prefix}count"] = add(f"{prefix}count", delta)
+        counts[f"{prefix}sum"] = add(f"{prefix}sum", delta * rating)
+        histogram_field_name = f"{prefix}histogram.{get_rating_bucket(rating)}"
+        counts[histogram_field_name] = add(histogram_field_name, delta)
+
+        averages[f"{prefix}average"] = {
+            "$cond": [
+                {"$gt": [f"${prefix}count", 0]},
+                {"$divide": [f"${prefix}sum", f"${prefix}count"]},
+                None,
+            ]
+        }
+
+    club_rating_summaries_collection.update_one(
+        {"club_id": club_id},
+        [
+            {"$set": {**counts, "last_updated_on": "$$NOW"}},
+            {"$set": averages},
+        ],
+        upsert=True,
+        session=session,
+    )
+
+    run_after_commit(session, response_cache.invalidate, CLUBS_RESPONSE_CACHE_KEY)
+
+
+def get_rating_bucket(rating: float) -> str:
+    return str(round(rating))
+
+
+def rebuild_club_rating_summaries() -> int:
+    """
+    recomputes the rating summaries of every club from its reviews, replacing the
+    maintained ones, and removes the summaries of the clubs without reviews. the reviews
+    written while it runs may be missed, it is meant to be run when no review is written
+    (see scripts/rebuild_club_rating_summaries.py)
+
+    :return: the number of summaries written
+    """
+    log.info("inside rebuild_club_rating_summaries()")
+
+    rebuilt_on = get_current_utc_datetime()
+
+    # club_id -> prefix ("" for every review, "approved_" for the approved ones) -> ratings
+    ratings = defaultdict(lambda: {"": [], "approved_": []})
+
+    reviews = reviews_collection.find(
+        {"reviewee.reviewee_type": UserRoles.CLUB.value},
+        projection={"_id": 0, "reviewee.reviewee_id": 1, "rating": 1, "approved_by_khayyal_admin": 1},
+    )
+
+    for review in reviews:
+        club_ratings = ratings[review["reviewee"]["reviewee_id"]]
+        club_ratings[""].append(review["rating"])
+
+        if review.get("approved_by_khayyal_admin"):
+            club_ratings["approved_"].append(review["rating"])
+
+    requests = []
+
+    for club_id, club_ratings in ratings.items():
+        club_rating_summary = {"club_id": club_id, "last_updated_on": rebuilt_on}
+
+        for prefix, prefix_ratings in club_ratings.items():
+            club_rating_summary[f"{prefix}count"] = len(prefix_ratings)
+            club_rating_summary[f"{prefix}sum"] = sum(prefix_ratings)
+            club_rating_summary[f"{prefix}average"] = (
+                sum(prefix_ratings) / len(prefix_ratings) if prefix_ratings else None
+            )
+            club_rating_summary[f"{prefix}histogram"] = dict(
+                Counter(get_rating_bucket(rating) for rating in prefix_ratings)
+            )
+
+        requests.append(ReplaceOne(
+            {"club_id": club_id},
+            ClubRatingSummaryInternal(**club_rating_summary).model_dump(),
+            upsert=True,
+        ))
+
+    # the summaries neither rebuilt nor updated since, i.e. of the clubs without reviews
+    requests.append(DeleteMany({"last_updated_on": {"$lt": rebuilt_on}}))
+
+    club_rating_summaries_collection.bulk_write(requests, ordered=False)
+
+    response_cache.invalidate(CLUBS_RESPONSE_CACHE_KEY)
 
+    log.info("rebuilt %s club rating summaries", len(ratings))
 
-def create_review_for_club_by_user(review_instance):
-    return reviews_collection.insert_one(review_instance)
+    return len(ratings)
@@ -7,7 +7,7 @@ from data.db import get_sign_up_otp_collection
 sign_up_otp_collection = get_sign_up_otp_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_sign_up_otp(session=None, **kwargs) -> Optional[SignUpOtpInternal]:
     log.info(f"inside find_sign_up_otp({kwargs})")
 
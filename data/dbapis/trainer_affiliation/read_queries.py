@@ -7,7 +7,7 @@ from data.db import get_trainer_affiliations_collection
 trainer_affiliation_collection = get_trainer_affiliations_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_trainer_affiliation(session=None, **kwargs) -> Optional[TrainerAffiliationInternal]:
     log.info(f"inside find_trainer_affiliation({kwargs})")
 
@@ -23,7 +23,7 @@ def find_trainer_affiliation(session=None, **kwargs) -> Optional[TrainerAffiliat
 
     return retval
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_many_trainer_affiliations(session=None, **kwargs) -> list[TrainerAffiliationInternal]:
     log.info(f"inside find_many_trainer_affiliations({kwargs})")
 
@@ -7,7 +7,7 @@ from models.trainer_certification import TrainerCertificationInternal
 trainer_certification_collection = get_trainer_certifications_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_trainer_certification(session=None, **kwargs) -> Optional[TrainerCertificationInternal]:
     log.info(f"inside find_trainer_certification({kwargs})")
 
@@ -24,7 +24,7 @@ def find_trainer_certification(session=None, **kwargs) -> Optional[TrainerCertif
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_trainer_certifications_with_ids(
         trainer_certification_ids: list[str],
         session=None
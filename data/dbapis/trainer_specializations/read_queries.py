@@ -7,7 +7,7 @@ from models.trainer_specialization import TrainerSpecializationInternal
 trainer_specializations_collection = get_trainer_specializations_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_trainer_specialization(session=None, **kwargs) -> Optional[TrainerSpecializationInternal]:
     log.info(f"inside find_trainer_specialization({kwargs})")
 
@@ -24,7 +24,7 @@ def find_trainer_specialization(session=None, **kwargs) -> Optional[TrainerSpeci
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_trainer_specializations_with_ids(
         trainer_specialization_ids: list[str],
         session=None
@@ -2,13 +2,13 @@ from typing import Optional
 
 from data.db import get_trainer_collection
 from decorators import atomic_transaction
-from logging_config import log
+from logging_config import log, summarize
 from models.trainers import TrainerInternal
 
 trainer_collection = get_trainer_collection()
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_trainer(session=None, **kwargs) -> Optional[TrainerInternal]:
     log.info(f"inside find_trainer({kwargs})")
 
@@ -22,12 +22,12 @@ def find_trainer(session=None, **kwargs) -> Optional[TrainerInternal]:
 
     retval = TrainerInternal(**trainer)
 
-    log.info(f"returning trainer = {retval}")
+    log.info("returning trainer = %s", summarize(retval))
 
     return retval
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_many_trainers(session=None, **kwargs) -> list[TrainerInternal]:
     log.info(f"inside find_many_trainers({kwargs})")
 
@@ -35,6 +35,6 @@ def find_many_trainers(session=None, **kwargs) -> list[TrainerInternal]:
 
     retval = [TrainerInternal(**trainer) for trainer in trainers_cursor]
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
@@ -1,13 +1,14 @@
 from typing import List
 
+from pymongo.command_cursor import CommandCursor
 from pymongo.cursor import Cursor
 
-from data.db import convert_to_object_id, get_collection
+from data.db import convert_to_object_id, get_truck_collection
 from logging_config import log
 from models.truck.enums import TruckAvailability
 from utils.logistics_utils import LOGISTICS_SERVICE_COLLECTION_MAPPING
 
-truck_collection = get_collection(collection_name="trucks")
+truck_collection = get_truck_collection()
 
 
 def get_trucks_by_logistics_company_id(
@@ -35,7 +36,9 @@ def get_trucks_by_logistics_company_id(
     return trucks_list
 
 
-def get_truck_details_by_id_db(truck_id: str, fields: List = None) -> dict:
+def get_truck_details_by_id_db(
+    truck_id: str, fields: List = None, session=None
+) -> dict:
     """fetches the details of the truck based on truck_id
 
     Args:
@@ -46,7 +49,7 @@ def get_truck_details_by_id_db(truck_id: str, fields: List = None) -> dict:
 
     filter = {"_id": convert_to_object_id(truck_id)}
     truck_details = truck_collection.find_one(
-        filter=filter, **({"projection": fields} if fields else {})
+        filter=filter, **({"projection": fields} if fields else {}), session=session
     )
 
     log.info(f"get_truck_details_by_id_db() returning : {truck_details}")
@@ -54,7 +57,9 @@ def get_truck_details_by_id_db(truck_id: str, fields: List = None) -> dict:
     return truck_details
 
 
-def get_trucks_by_service_id(service_id: str, service_type: str) -> List[str]:
+def get_trucks_by_service_id(
+    service_id: str, service_type: str, session=None
+) -> List[str]:
     """get all trucks id based on logistics service id and service type
 
     Args:
@@ -72,7 +77,7 @@ def get_trucks_by_service_id(service_id: str, service_type: str) -> List[str]:
 
     filter = {"_id": convert_to_object_id(service_id)}
     projection = {"trucks": True, "_id": False}
-    trucks_for_service = service_collection.find(filter, projection)
+    trucks_for_service = service_collection.find(filter, projection, session=session)
 
     trucks = []
     for trucks_for_service in trucks_for_service:
@@ -148,3 +153,99 @@ def get_all_trucks(fields: List[str] = None) -> Cursor:
     log.info(f"get_all_trucks() returning {trucks_list}")
 
     return trucks_list
+
+
+def get_nearby_trucks_pipeline(
+    lat: float,
+    long: float,
+    radius: float,
+    fields: List[str] = None,
+    page_no: int = None,
+    page_size: int = None,
+) -> List[dict]:
+    """builds the aggregation pipeline for the nearby trucks search. radius filtering,
+    distance sorting and pagination are all done by the database using the 2dsphere
+    index on `geo_location`
+
+    Args:
+        lat (float): latitude of the search origin
+        long (float): longitude of the search origin
+        radius (float): search radius in kilometres
+        fields (List[str]): fields to be returned, all the fields if not provided
+        page_no (int): page number (starting from 1), requires page_size
+        page_size (int): number of trucks per page
+
+    Returns:
+        List[dict]: the aggregation pipeline
+    """
+
+    pipeline = [
+        {
+            "$geoNear": {
+                "near": {"type": "Point", "coordinates": [long, lat]},
+                "key": "geo_location",
+                # distances of GeoJSON points are measured in metres
+                "distanceField": "distance",
+                "maxDistance": radius * 1000,
+                "spherical": True,
+            }
+        }
+    ]
+
+    if page_no and page_size:
+        pipeline.append({"$skip": (page_no - 1) * page_size})
+        pipeline.append({"$limit": page_size})
+
+    if fields:
+        pipeline.append({"$project": {field: True for field in [*fields, "distance"]}})
+
+    return pipeline
+
+
+def find_trucks_near_location(
+    lat: float,
+    long: float,
+    radius: float,
+    fields: List[str] = None,
+    page_no: int = None,
+    page_size: int = None,
+) -> CommandCursor:
+    """get the trucks within `radius` kilometres of the provided location, nearest
+    first. every returned document carries its `distance` from the location in metres
+
+    Args:
+        lat (float)
+        long (float)
+        radius (float): search radius in kilometres
+        fields (List[str]): fields to be returned, all the fields if not provided
+        page_no (int)
+        page_size (int)
+
+    Returns:
+        CommandCursor: trucks sorted by distance
+    """
+
+    log.info(
+        "find_trucks_near_location() invoked : lat %s long %s radius %s "
+        "page_no %s page_size %s",
+        lat,
+        long,
+        radius,
+        page_no,
+        page_size,
+    )
+
+    pipeline = get_nearby_trucks_pipeline(
+        lat=lat,
+        long=long,
+        radius=radius,
+        fields=fields,
+        page_no=page_no,
+        page_size=page_size,
+    )
+
+    trucks = truck_collection.aggregate(pipeline=pipeline)
+
+    log.info("find_trucks_near_location() returning")
+
+    return trucks
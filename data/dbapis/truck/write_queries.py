@@ -1,14 +1,16 @@
 from typing import List
 
+from pymongo import ReturnDocument
+
 from api.logistics.models.logistics_company_trucks import UpdateTruckDetails
 from data.db import (
     convert_to_object_id,
-    get_collection,
     get_logistics_company_collection,
     get_truck_collection,
 )
 from logging_config import log
 from models.truck import TruckInternal
+from models.truck.enums import TruckAvailability
 from utils.logistics_utils import LOGISTICS_SERVICE_COLLECTION_MAPPING, LogisticsService
 
 truck_collection = get_truck_collection()
@@ -149,6 +151,47 @@ def update_truck_availability(truck_id: str, availability: str) -> bool:
     return updated.modified_count == 1
 
 
+def reserve_truck(
+    truck_id: str, logistics_company_id: str, session=None
+) -> dict | None:
+    """reserves the truck for a booking: marks it unavailable if, and only if, it is
+    currently available and belongs to the logistics company.
+
+    The check and the update are a single conditional write, so of any number of
+    concurrent reservations of the same truck exactly one succeeds (unlike reading
+    the availability and updating it afterwards).
+
+    Args:
+        truck_id (str)
+        logistics_company_id (str)
+        session: the session of the transaction the reservation is part of, if any
+
+    Returns:
+        dict | None: the reserved truck, None if it was not available to reserve
+    """
+
+    log.info("reserve_truck() invoked : %s %s", truck_id, logistics_company_id)
+
+    filter = {
+        "_id": convert_to_object_id(truck_id),
+        "logistics_company_id": logistics_company_id,
+        "availability": TruckAvailability.AVAILABLE.value,
+    }
+    update = {"$set": {"availability": TruckAvailability.UN_AVAILABLE.value}}
+
+    reserved_truck = truck_collection.find_one_and_update(
+        filter=filter,
+        update=update,
+        projection=["logistics_company_id", "availability"],
+        return_document=ReturnDocument.AFTER,
+        session=session,
+    )
+
+    log.info("reserve_truck() returning : %s", reserved_truck)
+
+    return reserved_truck
+
+
 def update_truck_details(truck_id: str, truck_details: UpdateTruckDetails) -> bool:
     """given the truck_id update the details of the truck
 
@@ -165,3 +208,40 @@ def update_truck_details(truck_id: str, truck_details: UpdateTruckDetails) -> bo
     updated = truck_collection.update_one(filter=filter, update={"$set": update})
 
     return updated.modified_count == 1
+
+
+def backfill_truck_geo_locations() -> int:
+    """one-off migration for the trucks saved before the nearby trucks search moved to
+    the 2dsphere index: derives the GeoJSON `geo_location` point from the existing
+    `location.lat/long` fields (which may have been stored as strings)
+
+    Returns:
+        int: number of trucks updated
+    """
+
+    log.info("backfill_truck_geo_locations() invoked")
+
+    filter = {
+        "geo_location": {"$exists": False},
+        "location.lat": {"$exists": True},
+        "location.long": {"$exists": True},
+    }
+    update = [
+        {
+            "$set": {
+                "geo_location": {
+                    "type": "Point",
+                    "coordinates": [
+                        {"$toDouble": "$location.long"},
+                        {"$toDouble": "$location.lat"},
+                    ],
+                }
+            }
+        }
+    ]
+
+    updated = truck_collection.update_many(filter=filter, update=update)
+
+    log.info("backfill_truck_geo_locations() returning : modified_count %s", updated.modified_count)
+
+    return updated.modified_count
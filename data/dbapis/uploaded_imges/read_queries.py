@@ -1,6 +1,6 @@
 from data.db import get_uploaded_images_collection, convert_to_object_id
 from models.uploaded_image import UploadedImageInternal
-from logging_config import log
+from logging_config import log, summarize
 from typing import Optional
 
 uploaded_images_collection = get_uploaded_images_collection()
@@ -24,5 +24,44 @@ def get_uploaded_image_by_id(uploaded_image_id: str) -> Optional[UploadedImageIn
     else:
         retval = UploadedImageInternal(**uploaded_image)
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
+    return retval
+
+
+def get_uploaded_images_by_ids(uploaded_image_ids: list[str]) -> list[UploadedImageInternal]:
+    """
+    returns the records of all the provided ids with a single query,
+    ids without a record are skipped
+
+    :param uploaded_image_ids: the _ids of the database records
+    :return: list of UploadedImageInternal, in no particular order
+    """
+
+    log.info("inside get_uploaded_images_by_ids(uploaded_image_ids=%s)", summarize(uploaded_image_ids))
+
+    uploaded_images = uploaded_images_collection.find(
+        {"_id": {"$in": [convert_to_object_id(uploaded_image_id) for uploaded_image_id in uploaded_image_ids]}}
+    )
+
+    retval = [UploadedImageInternal(**uploaded_image) for uploaded_image in uploaded_images]
+
+    log.info("returning %s", summarize(retval))
+    return retval
+
+
+def find_referenced_image_paths(image_paths: list[str]) -> set[str]:
+    """
+    returns the provided image_paths that are still referenced by a record, the images
+    with the same content share their file (see save_images in utils/image_management.py)
+    which can only be removed once no record references it
+
+    :param image_paths: the paths of the image files
+    :return: the subset of image_paths referenced by at least one record
+    """
+
+    log.info("inside find_referenced_image_paths(image_paths=%s)", summarize(image_paths))
+
+    retval = set(uploaded_images_collection.distinct("image_path", {"image_path": {"$in": image_paths}}))
+
+    log.info("returning %s", summarize(retval))
     return retval
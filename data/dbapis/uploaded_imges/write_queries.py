@@ -17,6 +17,26 @@ def save_uploaded_image(uploaded_image: UploadedImageInternal) -> str:
     return retval
 
 
+def save_uploaded_images(uploaded_images: list[UploadedImageInternal]) -> list[str]:
+    """
+    inserts the records with a single query
+
+    :param uploaded_images: the records to insert
+    :return: the ids of the records, in the order of uploaded_images
+    """
+    log.info("inside save_uploaded_images(uploaded_image_count=%s)", len(uploaded_images))
+
+    inserted_ids = uploaded_images_collection.insert_many(
+        [uploaded_image.model_dump() for uploaded_image in uploaded_images]
+    ).inserted_ids
+
+    retval = [str(uploaded_image_id) for uploaded_image_id in inserted_ids]
+
+    log.info("returning %s", retval)
+
+    return retval
+
+
 def delete_uploaded_image(uploaded_image_id: str) -> bool:
     log.info(f"inside delete_uploaded_image(uploaded_image_id={uploaded_image_id})")
 
@@ -25,3 +45,15 @@ def delete_uploaded_image(uploaded_image_id: str) -> bool:
     log.info(f"deleted count = {result.deleted_count}")
 
     return result.deleted_count == 1
+
+
+def delete_uploaded_images(uploaded_image_ids: list[str]) -> int:
+    log.info("inside delete_uploaded_images(uploaded_image_ids=%s)", uploaded_image_ids)
+
+    result = uploaded_images_collection.delete_many(
+        {"_id": {"$in": [convert_to_object_id(uploaded_image_id) for uploaded_image_id in uploaded_image_ids]}}
+    )
+
+    log.info("deleted count = %s", result.deleted_count)
+
+    return result.deleted_count
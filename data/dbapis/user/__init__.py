@@ -1,2 +1,3 @@
 from .read_queries import find_user, get_user_by_email, get_user_by_phone_number
-from .write_queries import save_user, update_user
\ No newline at end of file
+from .write_queries import save_user, update_user
+from .user_cache import cache_user, get_cached_user, get_user_cache_generation, invalidate_cached_user
@@ -1,16 +1,17 @@
 from models.user import UserInternal
 from data.db import get_users_collection, convert_to_object_id
-from logging_config import log
+from data.projections import get_projection
+from logging_config import log, summarize
 from decorators import atomic_transaction
 from typing import Optional
 
 users_collection = get_users_collection()
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def find_user(session=None, **kwargs) -> Optional[UserInternal]:
     log.info(f"inside find_user({kwargs})")
 
-    user = users_collection.find_one(kwargs, session=session)
+    user = users_collection.find_one(kwargs, projection=get_projection(UserInternal), session=session)
 
     if not user:
         log.info(f"No user exists with the provided attributes, returning None")
@@ -18,7 +19,7 @@ def find_user(session=None, **kwargs) -> Optional[UserInternal]:
 
     retval = UserInternal(**user)
 
-    log.info(f"returning user = {retval}")
+    log.info("returning user = %s", summarize(retval))
 
     return retval
 
@@ -33,14 +34,14 @@ def get_user_by_email(email: str) -> UserInternal | None:
 
     log.info(f"get_user_by_email invoked: email={email}")
 
-    user = users_collection.find_one({"email_address": email})
+    user = users_collection.find_one({"email_address": email}, projection=get_projection(UserInternal))
 
     if user is None:
         retval = None
     else:
         retval = UserInternal(**user)
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -56,14 +57,14 @@ def get_user_by_phone_number(phone_number: str) -> UserInternal | None:
 
     log.info(f"get_user_by_phone_number invoked: phone_number={phone_number}")
 
-    user = users_collection.find_one({"phone_number": phone_number})
+    user = users_collection.find_one({"phone_number": phone_number}, projection=get_projection(UserInternal))
 
     if user is None:
         retval = None
     else:
         retval = UserInternal(**user)
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -0,0 +1,87 @@
+import threading
+from typing import Optional
+from uuid import UUID
+
+from config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL_IN_SECONDS
+from logging_config import log
+from models.user import UserInternal
+from utils.cache import TTLCache
+
+# authenticated users keyed by the subject of their access token (either the email
+# address or the phone number), so that get_current_user doesn't need a database round
+# trip on every authorized request.
+# the write queries of the users collection invalidate the affected entries, the TTL
+# bounds the staleness of writes that bypass them.
+user_cache = TTLCache(
+    name="user_cache",
+    ttl_in_seconds=USER_CACHE_TTL_IN_SECONDS,
+    max_size=USER_CACHE_MAX_SIZE,
+)
+
+# incremented by every invalidation: a user read from the database is only cached if no
+# invalidation happened since the read began, otherwise a read that began before a write
+# and finished after its invalidation would put the user back as it was before the write
+_invalidation_generation = 0
+_invalidation_lock = threading.Lock()
+
+
+def get_user_cache_generation() -> int:
+    """
+    returns the invalidation generation, to be taken before reading the user that is
+    passed to cache_user
+    """
+    with _invalidation_lock:
+        return _invalidation_generation
+
+
+def get_cached_user(subject: str) -> Optional[UserInternal]:
+    """
+    returns a copy of the user cached against the access token subject, None on a miss
+    :param subject: the email address or phone number stored as the "sub" of the token
+    :return: UserInternal or None
+    """
+    user = user_cache.get(subject)
+
+    log.info(
+        "user cache %s (subject=%s), stats=%s",
+        "hit" if user else "miss",
+        subject,
+        user_cache.stats(),
+    )
+
+    # callers are free to modify the returned user, the cached instance must stay intact
+    return user.model_copy() if user else None
+
+
+def cache_user(subject: str, user: UserInternal, generation: int):
+    """
+    caches the user against the access token subject, unless a user was invalidated since
+    the generation was taken, i.e. while the user was being read
+    :param subject: the email address or phone number stored as the "sub" of the token
+    :param user: the user read from the database
+    :param generation: get_user_cache_generation() as of before the user was read
+    """
+    with _invalidation_lock:
+        if generation != _invalidation_generation:
+            log.info("user not cached, invalidated while it was read (subject=%s)", subject)
+            return
+
+        user_cache.set(subject, user.model_copy())
+
+
+def invalidate_cached_user(user_id: UUID | str):
+    """
+    removes the user from the cache, the user is looked up by id since the email
+    address/phone number (i.e. the cache key) may be the very thing being modified
+    :param user_id: the id of the user that is being modified
+    """
+    global _invalidation_generation
+
+    with _invalidation_lock:
+        _invalidation_generation += 1
+
+        invalidated_count = user_cache.invalidate_where(
+            lambda _, cached_user: str(cached_user.id) == str(user_id)
+        )
+
+    log.info("invalidated %s user cache entries (user_id=%s)", invalidated_count, user_id)
@@ -2,8 +2,9 @@ from data.db import get_users_collection
 from logging_config import log
 from models.user import UpdateUserInternal, UserInternal
 from .read_queries import find_user
+from .user_cache import invalidate_cached_user
 from fastapi import HTTPException, status
-from decorators import atomic_transaction
+from decorators import atomic_transaction, run_after_commit
 
 users_collection = get_users_collection()
 
@@ -24,6 +25,8 @@ def save_user(user: UserInternal, session=None) -> UserInternal:
 
     log.info(f"new user has successfully been inserted (user_id={user.id})")
 
+    run_after_commit(session, invalidate_cached_user, user_id=user.id)
+
     return user
 
 @atomic_transaction
@@ -54,6 +57,8 @@ def update_user(update_user_dto: UpdateUserInternal, session=None) -> UserIntern
             detail="user cannot be updated in the database due to unknown reasons"
         )
 
+    run_after_commit(session, invalidate_cached_user, user_id=user_database_id)
+
     updated_user = find_user(id=user_database_id, session=session)
 
     return updated_user
@@ -0,0 +1,199 @@
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel, errors
+
+from data.db import get_database
+from logging_config import log
+
+# every index of the database is declared here, collection name -> indexes.
+# the indexes are created once at startup (see ensure_indexes in main.py) or through
+# `python -m scripts.manage_indexes`, never from the request path.
+INDEX_REGISTRY: dict[str, list[IndexModel]] = {
+    "users": [
+        # TODO: figure out how to add indexes with unique constraint in nullable fields
+        IndexModel([("email_address", ASCENDING)]),
+        IndexModel([("phone_number", ASCENDING)], unique=True),
+    ],
+    "clubs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "sign_up_otp": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # TODO: figure out how to add indexes with unique constraint in nullable fields
+        IndexModel([("email_address", ASCENDING)]),
+        IndexModel([("phone_number", ASCENDING)]),
+    ],
+    "reset_password_otp": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # TODO: figure out how to add indexes with unique constraint in nullable fields
+        IndexModel([("email_address", ASCENDING)]),
+        IndexModel([("phone_number", ASCENDING)]),
+    ],
+    "trainers": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "trainer_affiliations": [
+        # primary-key field
+        IndexModel([("id", ASCENDING)], unique=True),
+        # indices to boost read query efficiencies
+        IndexModel([("email_address", ASCENDING)]),
+        IndexModel([("phone_number", ASCENDING)]),
+        # indices for foreign key fields
+        IndexModel([("user_id", ASCENDING)]),
+        IndexModel([("club_id", ASCENDING)]),
+    ],
+    "trainer_certifications": [
+        # primary-key field
+        IndexModel([("id", ASCENDING)], unique=True),
+        # indices for foreign key fields
+        IndexModel([("trainer_id", ASCENDING)]),
+    ],
+    "trainer_specializations": [
+        # primary-key field
+        IndexModel([("id", ASCENDING)], unique=True),
+        # indices for foreign key fields
+        IndexModel([("trainer_id", ASCENDING)]),
+    ],
+    "club_service_availability": [
+        # primary-key field, an availability id can't be taken over by another club
+        # service through the upserts of bulk_write_club_service_availability
+        IndexModel([("id", ASCENDING)], unique=True),
+        # the availability of a club service in a time range: the overlap checks of the
+        # availability writes, and the search restricted to a set of club services
+        IndexModel(
+            [
+                ("club_service_id", ASCENDING),
+                ("start_time", ASCENDING),
+                ("end_time", ASCENDING),
+            ]
+        ),
+        # the availability of every club service in a time window, in the order of the
+        # search (see find_available_slots), which can stop at the end of the page
+        IndexModel(
+            [("start_time", ASCENDING), ("end_time", ASCENDING), ("id", ASCENDING)]
+        ),
+    ],
+    "club_service": [
+        # primary-key field, the availability search looks the club services up by id
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "trucks": [
+        # geospatial index backing the $geoNear stage of the nearby trucks search,
+        # `geo_location` holds a GeoJSON point: {"type": "Point", "coordinates": [long, lat]}
+        IndexModel([("geo_location", GEOSPHERE)]),
+    ],
+    "reviews": [
+        # a user reviews a club once, the rating summaries count every review once
+        IndexModel(
+            [("reviewer.reviewer_id", ASCENDING), ("reviewee.reviewee_id", ASCENDING)],
+            unique=True,
+        ),
+    ],
+    "club_rating_summaries": [
+        # primary-key field, the clubs look their summary up by club_id
+        IndexModel([("club_id", ASCENDING)], unique=True),
+    ],
+    "uploaded_images_collection": [
+        # the images sharing a content-addressed file, its reference count
+        # (see find_referenced_image_paths)
+        IndexModel([("image_path", ASCENDING)]),
+    ],
+    "response_cache": [
+        # removes the expired responses of the shared response cache
+        # (RESPONSE_CACHE_BACKEND=database), see utils/response_cache.py
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "logistics_bookings": [
+        # the bookings of a consumer, of one or (merged by the query planner for a
+        # service_type $in) several service types, newest first. _id breaks the ties of
+        # created_at so that the pages are stable
+        IndexModel(
+            [
+                ("consumer.consumer_id", ASCENDING),
+                ("service_type", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ]
+        ),
+    ],
+}
+
+
+def ensure_indexes() -> list[str]:
+    """creates the indexes of INDEX_REGISTRY that don't exist yet, existing ones are left
+    untouched by the database so this is safe to run on every startup.
+
+    an index that can't be created (e.g. a unique index over duplicate documents) is
+    logged and skipped along with the other indexes of its collection, the indexes of the
+    other collections are still created
+
+    Returns:
+        list[str]: the names of the collections whose indexes couldn't be created
+    """
+    log.info("inside ensure_indexes()")
+
+    database = get_database()
+    failed_collection_names = []
+
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        try:
+            index_names = database[collection_name].create_indexes(indexes)
+
+        except errors.OperationFailure as e:
+            log.error("cannot create the indexes of %s (error=%s)", collection_name, e)
+            failed_collection_names.append(collection_name)
+            continue
+
+        log.info("ensured indexes of %s: %s", collection_name, index_names)
+
+    return failed_collection_names
+
+
+def check_indexes() -> dict[str, dict[str, list[str]]]:
+    """compares INDEX_REGISTRY with the indexes that exist in the database
+
+    Returns:
+        dict[str, dict[str, list[str]]]: collection name -> {
+            "missing": declared indexes that don't exist,
+            "undeclared": existing indexes that are not in the registry,
+            "unused": existing indexes that haven't served a single operation since the
+                database server started (as reported by $indexStats)
+        }, collections without any finding are omitted
+    """
+    log.info("inside check_indexes()")
+
+    database = get_database()
+    existing_collections = set(database.list_collection_names())
+
+    report = {}
+
+    for collection_name in sorted(existing_collections | INDEX_REGISTRY.keys()):
+        declared_index_names = {
+            index.document["name"] for index in INDEX_REGISTRY.get(collection_name, [])
+        }
+
+        if collection_name in existing_collections:
+            index_stats = list(
+                database[collection_name].aggregate([{"$indexStats": {}}])
+            )
+        else:
+            index_stats = []
+
+        existing_index_names = {
+            index_stat["name"] for index_stat in index_stats
+        } - {"_id_"}
+
+        findings = {
+            "missing": sorted(declared_index_names - existing_index_names),
+            "undeclared": sorted(existing_index_names - declared_index_names),
+            "unused": sorted(
+                index_stat["name"]
+                for index_stat in index_stats
+                if index_stat["name"] != "_id_" and index_stat["accesses"]["ops"] == 0
+            ),
+        }
+
+        if any(findings.values()):
+            report[collection_name] = findings
+
+    log.info("returning %s", report)
+
+    return report
@@ -0,0 +1,107 @@
+from functools import cache
+from typing import Any, Optional, get_args
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+from logging_config import log
+from models.generic_get_query_with_pagination import Lookup
+
+
+# the documents are read into models, e.g. ClubInternal(**document), which ignore every
+# key they don't declare (mongodb's `_id`, the fields of the former versions of the
+# model, ...). these keys are still read, transferred and parsed by the driver, hence the
+# queries project the documents on the fields of the model they are read into.
+def get_projection(model: type[BaseModel]) -> Optional[dict]:
+    """
+    returns the projection of the documents read into the model: its fields (by their
+    alias, if any) and the fields its lookups (see Lookup) join on and populate. the
+    nested models are projected as a whole.
+
+    :param model: the model the documents are read into
+    :return: the projection, None for the models keeping the undeclared keys
+             (extra="allow"), which need whole documents
+    """
+    projection = _get_projection(model)
+
+    # the projection is cached, the callers get their own copy
+    return dict(projection) if projection is not None else None
+
+
+@cache
+def _get_projection(model: type[BaseModel]) -> Optional[dict]:
+    if model.model_config.get("extra") == "allow":
+        log.info("%s keeps the undeclared keys, its documents are not projected", model.__name__)
+        return None
+
+    # mongodb returns `_id` unless it is excluded, whereas the models declare it (as an
+    # alias) only when they read it
+    projection = {"_id": 0}
+
+    for field_name, field_info in model.model_fields.items():
+        projection[get_database_field_name(field_name, field_info)] = 1
+
+        lookup = get_lookup(field_info)
+
+        if lookup:
+            projection[lookup.local_field.split(".")[0]] = 1
+
+    log.debug("projection of %s: %s", model.__name__, projection)
+
+    return projection
+
+
+def get_database_field_name(field_name: str, field_info: FieldInfo) -> str:
+    if isinstance(field_info.validation_alias, str):
+        return field_info.validation_alias
+
+    return field_info.alias or field_name
+
+
+def get_lookup(field_info: FieldInfo) -> Optional[Lookup]:
+    # see GenericGetQueryWithPaginationDTO, the lookup is the metadata of the field
+    if field_info.metadata and isinstance(field_info.metadata[0], Lookup):
+        return field_info.metadata[0]
+
+    return None
+
+
+def get_lookup_projections(model: type[BaseModel]) -> dict[str, dict]:
+    """
+    returns the projections of the documents joined by the lookups of the model, i.e. the
+    projections of the models of the looked-up fields (e.g. TrainerCertificationInternal
+    for `certifications: Annotated[list[TrainerCertificationInternal], Lookup(...)]`)
+
+    :param model: the model the documents are read into
+    :return: {as_key_name: projection}, without the lookups whose documents can't be
+             projected
+    """
+    lookup_projections = {}
+
+    for field_info in model.model_fields.values():
+        lookup = get_lookup(field_info)
+        looked_up_model = find_model(field_info.annotation)
+
+        if lookup is None or looked_up_model is None:
+            continue
+
+        projection = get_projection(looked_up_model)
+
+        if projection is not None:
+            lookup_projections[lookup.as_key_name] = projection
+
+    return lookup_projections
+
+
+def find_model(annotation: Any) -> Optional[type[BaseModel]]:
+    """returns the model of an annotation, e.g. X for X, Optional[X] or list[X]"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+
+    for argument in get_args(annotation):
+        model = find_model(argument)
+
+        if model is not None:
+            return model
+
+    return None
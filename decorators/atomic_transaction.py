@@ -1,38 +1,184 @@
-from functools import wraps
+import random
+import threading
+import time
+import weakref
+from collections import defaultdict
+from functools import partial, wraps
+from config import (
+    READ_ONLY_CAUSAL_CONSISTENCY,
+    TRANSACTION_MAX_ATTEMPTS,
+    TRANSACTION_RETRY_BASE_DELAY_IN_SECONDS,
+    TRANSACTION_RETRY_MAX_DELAY_IN_SECONDS,
+)
 from data.db import client
-from pymongo import errors
+from logging_config import log
+from pymongo import ReadPreference, errors
 
+# per function (module and qualified name) counters of the transactions: the calls, the retries of the whole
+# transaction (TransientTransactionError), the retries of the commit alone
+# (UnknownTransactionCommitResult) and the calls that failed after exhausting the attempts
+_transaction_stats = defaultdict(lambda: {"calls": 0, "retries": 0, "commit_retries": 0, "exhausted": 0})
+_transaction_stats_lock = threading.Lock()
+
+
+def transaction_stats() -> dict[str, dict[str, int]]:
+    with _transaction_stats_lock:
+        return {name: dict(stats) for name, stats in _transaction_stats.items()}
+
+
+def _count(func_name: str, counter: str):
+    with _transaction_stats_lock:
+        _transaction_stats[func_name][counter] += 1
+
+
+# session -> the callbacks to run once its transaction commits, see run_after_commit
+_after_commit_callbacks = weakref.WeakKeyDictionary()
+
+
+def run_after_commit(session, callback, *args, **kwargs):
+    """
+    Runs callback(*args, **kwargs) once the transaction of the session is committed, e.g. to invalidate the
+    caches of the written data: invalidated before the commit, a cache may be refilled from the data the
+    transaction is about to replace. The callbacks of an attempt that is aborted (and possibly run again)
+    are dropped. Without a session, or outside a transaction, callback runs right away.
+    A failing callback is logged, the transaction is committed anyway.
+    """
+    if session is None or not session.in_transaction:
+        _run_callback(callback, *args, **kwargs)
+        return
+
+    _after_commit_callbacks.setdefault(session, []).append(partial(callback, *args, **kwargs))
+
+
+def _run_callback(callback, *args, **kwargs):
+    try:
+        callback(*args, **kwargs)
+
+    except Exception as e:
+        log.exception("after commit callback %s failed (error=%s)", callback, e)
+
+
+def _backoff(attempt: int):
+    # exponential backoff with full jitter, so that the contending transactions spread out
+    # instead of conflicting again in lockstep
+    time.sleep(random.uniform(
+        0, min(TRANSACTION_RETRY_MAX_DELAY_IN_SECONDS, TRANSACTION_RETRY_BASE_DELAY_IN_SECONDS * 2 ** (attempt - 1))
+    ))
+
+
+def _has_error_label(e: Exception, label: str) -> bool:
+    return isinstance(e, errors.PyMongoError) and e.has_error_label(label)
+
+
+def atomic_transaction(func=None, *, read_only: bool = False):
+    """
+    Runs func in a multi-document transaction, or, with read_only=True (`@atomic_transaction(read_only=True)`),
+    in a causally consistent session without a transaction (or without any session if
+    READ_ONLY_CAUSAL_CONSISTENCY is false). A read-only function skips the commit round trip and doesn't
+    hold a snapshot open; its reads use the read concern and the read preference of the client
+    (DATABASE_READ_CONCERN_LEVEL/DATABASE_READ_PREFERENCE). It must not write, the functions it passes
+    its session to don't start a transaction of their own.
+
+    When a session is provided (i.e. func is called by another decorated function), func runs in it as is,
+    whether read-only or not, hence a read-only function called from a transaction reads its snapshot.
+
+    The initiator of a transaction retries it (up to TRANSACTION_MAX_ATTEMPTS attempts in total, with a
+    jittered backoff): the whole of func when the transaction fails with a TransientTransactionError (e.g. a
+    write conflict with a concurrent transaction), and the commit alone when its outcome is unknown
+    (UnknownTransactionCommitResult). func must therefore be safe to run again, its database writes are
+    rolled back but not its other side effects, those that must only happen once the transaction is committed
+    are deferred with run_after_commit.
+    """
+    if func is None:
+        return partial(atomic_transaction, read_only=read_only)
 
-def atomic_transaction(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
 
         # If session is provided, then func is not an initiator function in the transaction chain.
         is_session_provided = "session" in kwargs
 
-        # If session is not provided, then func is an initiator function.
-        # Initiator functions are responsible for starting the transaction as well as aborting it
-        # in cases of exceptions.
-        if not is_session_provided:
-            session = client.start_session()
-            session.start_transaction()
-            kwargs["session"] = session
+        if is_session_provided:
+            return func(*args, **kwargs)
+
+        if read_only:
+            if not READ_ONLY_CAUSAL_CONSISTENCY:
+                return func(*args, **kwargs, session=None)
+
+            with client.start_session(causal_consistency=True) as session:
+                return func(*args, **kwargs, session=session)
+
+        # func is an initiator function, it is responsible for starting the transaction, committing it, as well
+        # as aborting it in cases of exceptions
+        _count(f"{func.__module__}.{func.__qualname__}", "calls")
+
+        with client.start_session() as session:
+            return _run_transaction(func, session, *args, **kwargs)
+
+    return wrapper
+
+
+def _run_transaction(func, session, *args, **kwargs):
+    func_name = f"{func.__module__}.{func.__qualname__}"
+
+    for attempt in range(1, TRANSACTION_MAX_ATTEMPTS + 1):
+        # the reads in a transaction must be made from the primary, whatever the client's default is
+        session.start_transaction(read_preference=ReadPreference.PRIMARY)
+        _after_commit_callbacks.pop(session, None)
 
         try:
-            retval = func(*args, **kwargs)
+            retval = func(*args, **kwargs, session=session)
 
         except (errors.PyMongoError, Exception) as e:
 
-            if not is_session_provided:
+            if session.in_transaction:
                 session.abort_transaction()
-                session.end_session()
 
+            if _has_error_label(e, "TransientTransactionError") and attempt < TRANSACTION_MAX_ATTEMPTS:
+                log.warning("transient transaction error in %s, retrying (attempt=%s, error=%s)",
+                            func_name, attempt, e)
+                _count(func_name, "retries")
+                _backoff(attempt)
+                continue
+
+            if _has_error_label(e, "TransientTransactionError"):
+                _count(func_name, "exhausted")
+
+            _after_commit_callbacks.pop(session, None)
             raise e
 
-        if not is_session_provided:
-            session.commit_transaction()
-            session.end_session()
+        commit_attempt = 1
 
-        return retval
+        while True:
+            try:
+                session.commit_transaction()
 
-    return wrapper
+                for callback in _after_commit_callbacks.pop(session, []):
+                    _run_callback(callback)
+
+                return retval
+
+            except errors.PyMongoError as e:
+                # the commit may or may not have been applied, committing again is safe
+                if _has_error_label(e, "UnknownTransactionCommitResult") and commit_attempt < TRANSACTION_MAX_ATTEMPTS:
+                    log.warning("unknown commit result in %s, retrying the commit (attempt=%s, error=%s)",
+                                func_name, commit_attempt, e)
+                    _count(func_name, "commit_retries")
+                    _backoff(commit_attempt)
+                    commit_attempt += 1
+                    continue
+
+                # the transaction has been aborted by the server, it is run again from the start
+                if _has_error_label(e, "TransientTransactionError") and attempt < TRANSACTION_MAX_ATTEMPTS:
+                    log.warning("transient transaction error in %s at commit, retrying (attempt=%s, error=%s)",
+                                func_name, attempt, e)
+                    _count(func_name, "retries")
+                    _backoff(attempt)
+                    break
+
+                if _has_error_label(e, "TransientTransactionError") or _has_error_label(
+                        e, "UnknownTransactionCommitResult"):
+                    _count(func_name, "exhausted")
+
+                _after_commit_callbacks.pop(session, None)
+                raise e
@@ -1,7 +1,11 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 from datetime import datetime
-import os
+from reprlib import Repr
 
 WS_LOG_PATH = os.path.join(os.path.curdir, "logs")  # '.\\logs'
 
@@ -12,16 +16,144 @@ DATE_FORMAT = "%Y-%m-%d"
 TODAY = datetime.now().strftime(DATE_FORMAT)
 LOG_FILE = os.path.join(WS_LOG_PATH, f"{TODAY}_logs.log")  # '.\\2023_03_11_10_18_logs.log'
 
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_log_level(setting: str, level_name: str) -> int:
+    """
+    returns the numeric level of a level name (i.e. "warning"), an unknown name is
+    rejected instead of being turned into the "Level <name>" string of logging.getLevelName
+    """
+    level = logging.getLevelNamesMapping().get(level_name.strip().upper())
+
+    if level is None:
+        raise ValueError(
+            f"{setting}: unknown log level {level_name.strip()!r}, "
+            f"expected one of {', '.join(logging.getLevelNamesMapping())}"
+        )
+
+    return level
+
+
+# the logging configuration is read from the environment, not from secrets.json,
+# since config.py itself logs while it is being loaded
+# e.g. LOG_LEVEL=INFO LOG_MODULE_LEVELS="data.dbapis=WARNING,logic.auth=DEBUG"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "DEBUG").upper()
+LOG_LEVEL_NUMBER = parse_log_level("LOG_LEVEL", LOG_LEVEL)
+LOG_MODULE_LEVELS = {
+    module.strip(): parse_log_level(f"LOG_MODULE_LEVELS ({module.strip()})", level)
+    for module, level in (
+        module_level.split("=")
+        for module_level in os.environ.get("LOG_MODULE_LEVELS", "").split(",")
+        if "=" in module_level
+    )
+}
+# bounds of the payloads rendered through summarize()
+LOG_MAX_ITEMS = int(os.environ.get("LOG_MAX_ITEMS", 5))
+LOG_MAX_PAYLOAD_LENGTH = int(os.environ.get("LOG_MAX_PAYLOAD_LENGTH", 2000))
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    drops the records below the level configured for the module that emitted them,
+    the most specific entry of LOG_MODULE_LEVELS wins (i.e. "data.dbapis.user" over
+    "data.dbapis"), modules without an entry fall back to LOG_LEVEL.
+
+    the filter is attached to the logger, a dropped record is never formatted.
+    """
+
+    def __init__(self, module_levels: dict[str, int]):
+        super().__init__()
+        # longest prefix first so that the first match is the most specific one
+        self.module_levels = sorted(
+            module_levels.items(), key=lambda module_level: len(module_level[0]), reverse=True
+        )
+        self.pathname_levels = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        level = self.pathname_levels.get(record.pathname)
+
+        if level is None:
+            level = self.pathname_levels[record.pathname] = self.level_of(record.pathname)
+
+        return record.levelno >= level
+
+    def level_of(self, pathname: str) -> int:
+        module = os.path.splitext(os.path.relpath(pathname, PROJECT_ROOT))[0]
+        module = module.replace(os.sep, ".")
+
+        for module_prefix, level in self.module_levels:
+            if module == module_prefix or module.startswith(f"{module_prefix}."):
+                return level
+
+        return LOG_LEVEL_NUMBER
+
+
+class summarize:
+    """
+    wraps a (potentially large) payload for logging, the payload is only rendered if
+    the record is emitted and the rendering is bounded: at most LOG_MAX_ITEMS elements of
+    every collection are shown and the result is cut at LOG_MAX_PAYLOAD_LENGTH characters.
+
+    usage: log.info("returning %s", summarize(retval))
+    """
+
+    __slots__ = ("payload",)
+
+    _repr = Repr()
+    _repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = LOG_MAX_ITEMS
+    _repr.maxstring = _repr.maxother = LOG_MAX_PAYLOAD_LENGTH
+    _repr.maxlevel = 3
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        payload = self.payload
+
+        if isinstance(payload, (list, tuple, set, dict)):
+            rendered = f"({len(payload)} items) {self._repr.repr(payload)}"
+        else:
+            rendered = str(payload)
+
+        if len(rendered) > LOG_MAX_PAYLOAD_LENGTH:
+            rendered = (
+                f"{rendered[:LOG_MAX_PAYLOAD_LENGTH]}... "
+                f"(truncated {len(rendered) - LOG_MAX_PAYLOAD_LENGTH} characters)"
+            )
+
+        return rendered
+
+    __repr__ = __str__
+
+
 # logging
 
 log = logging.getLogger("khayyal_logger")
-log.setLevel(logging.DEBUG)
+# the logger lets everything through to the ModuleLevelFilter, which enforces both
+# LOG_LEVEL and LOG_MODULE_LEVELS, unless no module is configured more verbosely than
+# LOG_LEVEL in which case the cheaper logger level check short-circuits the records
+log.setLevel(
+    min([LOG_LEVEL_NUMBER, *LOG_MODULE_LEVELS.values()])
+)
+log.addFilter(ModuleLevelFilter(module_levels=LOG_MODULE_LEVELS))
 logFormatter = logging.Formatter('%(asctime)s - %(pathname)s > %(funcName)s() # %(lineno)d [%(levelname)s] %(message)s')
 
 consoleHandler = logging.StreamHandler(stream=sys.stderr)
 consoleHandler.setFormatter(logFormatter)
-log.addHandler(consoleHandler)
 
 fileHandler = logging.FileHandler(LOG_FILE)  # '.\\logs/.\\2023_03_11_10_18_logs.log'
 fileHandler.setFormatter(logFormatter)
-log.addHandler(fileHandler)
+
+# the request handling threads only put the records in a queue, writing them to the
+# console and the file is done by the listener's own thread
+log_queue = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(log_queue))
+
+log_queue_listener = logging.handlers.QueueListener(
+    log_queue, consoleHandler, fileHandler, respect_handler_level=True
+)
+log_queue_listener.start()
+
+# flush the records which are still in the queue when the process exits
+atexit.register(log_queue_listener.stop)
@@ -1,6 +1,8 @@
 from .password_hash_utility import (
     verify_password,
-    generate_password_hash
+    generate_password_hash,
+    verify_password_async,
+    generate_password_hash_async
 )
 from .user_auth import (
     create_access_token,
@@ -1,11 +1,107 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from config import (
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_MAX_WORKERS,
+    PASSWORD_HASH_ROUNDS,
+)
+from logging_config import log
+
+# the hashes made with fewer rounds than PASSWORD_HASH_ROUNDS are reported as needing an
+# update by verify_password_and_update, so that they get rehashed on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=PASSWORD_HASH_ROUNDS
+)
+
+# a bcrypt hash takes hundreds of milliseconds of cpu, run on the event loop it stalls every
+# other in-flight request. the hashes are therefore computed on this executor (bcrypt releases
+# the GIL), which also caps the cores spent hashing during a burst of logins.
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_MAX_WORKERS, thread_name_prefix="password_hash"
+)
+
+# the hashing jobs either running or waiting for a worker, beyond which the requests are
+# turned down right away instead of piling up behind the executor
+password_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_password_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """verifies the password, and rehashes it if its hash is outdated
+
+    Args:
+        plain_password (str)
+        hashed_password (str)
+
+    Returns:
+        tuple[bool, Optional[str]]: whether the password is valid, and the new hash to
+            be saved if the current one was made with an outdated cost factor (None
+            otherwise)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def generate_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def run_in_password_hash_executor(func, *args, **kwargs):
+    """runs the blocking hashing function `func(*args, **kwargs)` on the password hash
+    executor and awaits its result without blocking the event loop
+
+    Raises:
+        HTTPException: 503 if PASSWORD_HASH_MAX_PENDING jobs are already running or waiting
+    """
+    if not password_hash_slots.acquire(blocking=False):
+        log.warning("the password hash executor is saturated, raising HTTPException...")
+
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="too many concurrent authentication requests, please try again",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        future = password_hash_executor.submit(partial(func, *args, **kwargs))
+    except BaseException:
+        password_hash_slots.release()
+        raise
+
+    # the slot is held until the job itself is done (or cancelled before it started), not
+    # until the await ends: a request cancelled on a client disconnect would otherwise
+    # free its slot while its hash keeps a worker busy
+    future.add_done_callback(lambda _: password_hash_slots.release())
+
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_in_password_hash_executor(
+        verify_password, plain_password=plain_password, hashed_password=hashed_password
+    )
+
+
+async def verify_password_and_update_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    return await run_in_password_hash_executor(
+        verify_password_and_update,
+        plain_password=plain_password,
+        hashed_password=hashed_password,
+    )
+
+
+async def generate_password_hash_async(password: str) -> str:
+    return await run_in_password_hash_executor(generate_password_hash, password=password)
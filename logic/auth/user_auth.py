@@ -1,13 +1,15 @@
+from data.db_executor import run_in_db_executor
+from data.dbapis.user import cache_user, get_cached_user, get_user_cache_generation, update_user
 from data.dbapis.user.read_queries import get_user_by_email, get_user_by_phone_number
-from .password_hash_utility import verify_password
-from models.user import UserInternal
+from .password_hash_utility import verify_password_and_update_async
+from models.user import UpdateUserInternal, UserInternal
 from datetime import timedelta, datetime, timezone
 from config import JWT_TOKEN_EXPIRY_IN_DAYS, JWT_SECRET_KEY, JWT_ALGORITHM
 from jose import jwt, JWTError
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
 from typing import Annotated, Optional
-from logging_config import log
+from logging_config import log, summarize
 from validators.regex_validators import is_valid_email
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -27,36 +29,63 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
-    log.info(f"returning {encoded_jwt}")
+    log.info("returning %s", encoded_jwt)
 
     return encoded_jwt
 
 
-def authenticate_user(
+async def authenticate_user(
         plain_password: str,
         email: Optional[str] = None,
         phone_number: Optional[str] = None
 ) -> UserInternal | None:
     log.info(f"authenticate_user invoked: email={email}, phone_number={phone_number}")
 
-    user = get_user_by_email(email=email) if email else get_user_by_phone_number(phone_number=phone_number)
+    user = await (
+        run_in_db_executor(get_user_by_email, email=email) if email else
+        run_in_db_executor(get_user_by_phone_number, phone_number=phone_number)
+    )
 
     if user is None:
         return None
 
-    is_verified = verify_password(plain_password=plain_password, hashed_password=user.hashed_password)
+    is_verified, new_hashed_password = await verify_password_and_update_async(
+        plain_password=plain_password,
+        hashed_password=user.hashed_password
+    )
 
     log.info(f"is_verified = {is_verified}")
 
+    # the hash was made with an outdated cost factor, the plain password is only known now
+    if is_verified and new_hashed_password:
+        await rehash_user_password(user=user, new_hashed_password=new_hashed_password)
+
     retval = user if is_verified else None
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
 
+async def rehash_user_password(user: UserInternal, new_hashed_password: str):
+    log.info("inside rehash_user_password(user_id=%s)", user.id)
+
+    try:
+        await run_in_db_executor(
+            update_user,
+            update_user_dto=UpdateUserInternal(
+                id=user.id,
+                last_updated_on=datetime.now(timezone.utc),
+                hashed_password=new_hashed_password
+            )
+        )
+    except HTTPException as e:
+        # the current hash still verifies, the rehash is retried on the next login
+        log.warning("could not rehash the password (user_id=%s, detail=%s)", user.id, e.detail)
+
+
 def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> UserInternal | None:
-    log.info(f"get_current_user invoked: token={token}")
+    log.info("get_current_user invoked: token=%s", token)
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,9 +102,17 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> UserInter
     except JWTError:
         raise credentials_exception
 
-    retval = (get_user_by_email(email=sub) if is_valid_email(email=sub) else
-              get_user_by_phone_number(phone_number=sub))
+    retval = get_cached_user(subject=sub)
+
+    if retval is None:
+        generation = get_user_cache_generation()
+
+        retval = (get_user_by_email(email=sub) if is_valid_email(email=sub) else
+                  get_user_by_phone_number(phone_number=sub))
+
+        if retval is not None:
+            cache_user(subject=sub, user=retval, generation=generation)
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
@@ -1,6 +1,7 @@
 from .club_service import (
     add_club_service,
     club_service_detailed_get_query_with_pagination,
+    search_available_club_service_slots,
     update_club_service,
 )
 from .logo_and_image import upload_images_logic, upload_logo_logic
@@ -1,19 +1,31 @@
+from datetime import datetime, timedelta
 from typing import Optional
 
+from fastapi import HTTPException, status
+
 from api.clubs.models.club_service import Availability, UpdateAvailability
+from config import AVAILABILITY_SEARCH_MAX_WINDOW_IN_DAYS
 from data.db import get_clubs_service_collection
-from data.dbapis.clubs import save_club_service, save_club_service_availability_bulk
+from data.dbapis.clubs import (
+    find_available_slots,
+    find_club_service_ids,
+    save_club_service,
+    save_club_service_availability_bulk,
+)
 from data.dbapis.clubs import update_club_service as update_club_service_db
 from data.dbapis.clubs import update_club_service_availability
 from decorators import atomic_transaction
-from logging_config import log
+from logging_config import log, summarize
+from models.clubs.availability_detailed_internal import AvailabilityDetailedInternal
 from models.clubs.clubs_service_detailed_internal import ClubServiceDetailedInternal
+from models.clubs.enums.service import ServiceStatus, ServiceType, SubServices
 from models.clubs.service_internal import (
     AvailabilityInternal,
     ClubServiceInternal,
     UpdateClubServiceInternal,
 )
 from models.user.user_internal import UserInternal
+from utils.date_time import as_utc
 
 from ..generic_get_query_with_pagination import generic_get_query_with_pagination_logic
 
@@ -46,7 +58,7 @@ def add_club_service(
         service_availability=availability_internal, session=session
     )
 
-    log.info(f"returning {newly_created_club_service}")
+    log.info("returning %s", summarize(newly_created_club_service))
 
     return newly_created_club_service
 
@@ -64,7 +76,9 @@ def update_club_service(
         f"inside update_club_service; club_service={club_service}, user_id={user.id}"
     )
 
-    updated_club_service = update_club_service_db(update_club_service_data=club_service)
+    updated_club_service = update_club_service_db(
+        update_club_service_data=club_service, session=session
+    )
 
     if service_availability:
         update_availability = [
@@ -85,17 +99,28 @@ def update_club_service(
     return updated_club_service
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def club_service_detailed_get_query_with_pagination(
     f: Optional[list[str]] = None,
     s: Optional[list[str]] = None,
     page_no: Optional[int] = None,
     page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    facets: Optional[list[str]] = None,
     session=None,
 ) -> list[ClubServiceDetailedInternal]:
     log.info(
         "inside club_service_detailed_get_query_with_pagination("
-        f"f={f}, s={s}, page_no={page_no}, page_size={page_size})"
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
     )
 
     result = generic_get_query_with_pagination_logic(
@@ -105,9 +130,92 @@ def club_service_detailed_get_query_with_pagination(
         s=s,
         page_no=page_no,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        facets=facets,
+        session=session,
+    )
+
+    log.info("returning %s", summarize(result))
+
+    return result
+
+
+@atomic_transaction(read_only=True)
+def search_available_club_service_slots(
+    start_time: datetime,
+    end_time: datetime,
+    service_type: Optional[ServiceType] = None,
+    sub_service: Optional[SubServices] = None,
+    club_id: Optional[str] = None,
+    page_no: int = 1,
+    page_size: int = 20,
+    session=None,
+) -> list[AvailabilityDetailedInternal]:
+    """
+    returns a page of the availability of the enabled club services (of the service_type,
+    sub_service and club, if provided) fitting in the time window, across the clubs. the
+    bounds without an offset are taken as UTC
+
+    :raises HTTPException: 400 if the window is empty or longer than
+                           AVAILABILITY_SEARCH_MAX_WINDOW_IN_DAYS
+    """
+    log.info(
+        "inside search_available_club_service_slots("
+        "start_time=%s, end_time=%s, service_type=%s, "
+        "sub_service=%s, club_id=%s, page_no=%s, page_size=%s)",
+        start_time,
+        end_time,
+        service_type,
+        sub_service,
+        club_id,
+        page_no,
+        page_size,
+    )
+
+    # a bound with an offset can't be compared with one without, the latter are in UTC
+    start_time, end_time = as_utc(start_time), as_utc(end_time)
+
+    if end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_time must be after start_time",
+        )
+
+    if end_time - start_time > timedelta(days=AVAILABILITY_SEARCH_MAX_WINDOW_IN_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"the time window can't be longer than {AVAILABILITY_SEARCH_MAX_WINDOW_IN_DAYS} days",
+        )
+
+    club_service_filter = {"service_status": ServiceStatus.ENABLE.value}
+
+    if service_type:
+        club_service_filter["service_type"] = service_type.value
+
+    if sub_service:
+        club_service_filter["sub_service"] = sub_service.value
+
+    if club_id:
+        club_service_filter["club_id"] = club_id
+
+    # the club services are few compared to their availability, the availability is
+    # searched among the ids of the matching ones
+    club_service_ids = find_club_service_ids(session=session, **club_service_filter)
+
+    if not club_service_ids:
+        log.info("no club service matches, returning []")
+        return []
+
+    result = find_available_slots(
+        start_time=start_time,
+        end_time=end_time,
+        club_service_ids=club_service_ids,
+        page_no=page_no,
+        page_size=page_size,
         session=session,
     )
 
-    log.info(f"returning {result}")
+    log.info("returning %s", summarize(result))
 
     return result
@@ -2,23 +2,34 @@ from typing import Optional
 
 from data.db import get_clubs_collection
 from decorators import atomic_transaction
-from logging_config import log
+from logging_config import log, summarize
 from models.clubs.clubs_internal import ClubInternal
 
 from ..generic_get_query_with_pagination import generic_get_query_with_pagination_logic
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def clubs_get_query_with_pagination(
     f: Optional[list[str]] = None,
     s: Optional[list[str]] = None,
     page_no: Optional[int] = None,
     page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    facets: Optional[list[str]] = None,
     session=None,
 ) -> list[ClubInternal]:
     log.info(
         "inside clubs_get_query_with_pagination("
-        f"f={f}, s={s}, page_no={page_no}, page_size={page_size})"
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
     )
 
     result = generic_get_query_with_pagination_logic(
@@ -28,9 +39,12 @@ def clubs_get_query_with_pagination(
         s=s,
         page_no=page_no,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        facets=facets,
         session=session,
     )
 
-    log.info(f"returning {result}")
+    log.info("returning %s", summarize(result))
 
     return result
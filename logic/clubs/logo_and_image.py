@@ -1,6 +1,7 @@
+from data.db_executor import run_in_db_executor
 from data.dbapis.clubs import find_club, update_club
 from models.clubs import UpdateClubInternal, ClubInternal
-from utils.image_management import save_image, delete_image
+from utils.image_management import save_image, save_images, delete_image, delete_images
 from fastapi import UploadFile
 from logging_config import log
 from datetime import datetime
@@ -10,7 +11,7 @@ import pytz
 async def upload_logo_logic(club_id: str, logo: UploadFile) -> ClubInternal:
     log.info(f"inside upload_logo_logic(club_id={club_id}, logo_filename={logo.filename})")
 
-    club = find_club(id=club_id)
+    club = await run_in_db_executor(find_club, id=club_id)
 
     existing_logo_id = club.logo
 
@@ -26,7 +27,7 @@ async def upload_logo_logic(club_id: str, logo: UploadFile) -> ClubInternal:
         logo=new_logo_id
     )
 
-    updated_club = update_club(update_club_data=update_club_dto)
+    updated_club = await run_in_db_executor(update_club, update_club_data=update_club_dto)
 
     return updated_club
 
@@ -35,15 +36,13 @@ async def upload_images_logic(club_id: str, images: list[UploadFile]) -> ClubInt
              f"images_filenames={[image.filename for image in images]})")
 
 
-    club = find_club(id=club_id)
+    club = await run_in_db_executor(find_club, id=club_id)
 
     existing_image_ids = club.images
 
-    if existing_image_ids:
-        for image_id in existing_image_ids:
-            await delete_image(image_id)
-
-    new_image_ids = [await save_image(image_file=image) for image in images]
+    # the new images are saved before the existing ones are deleted, a failed upload
+    # leaves the club with its current images
+    new_image_ids = await save_images(image_files=images)
 
     update_club_dto = UpdateClubInternal(
         id=club_id,
@@ -51,8 +50,10 @@ async def upload_images_logic(club_id: str, images: list[UploadFile]) -> ClubInt
         images=new_image_ids
     )
 
-    updated_club = update_club(update_club_data=update_club_dto)
-
-    return updated_club
+    updated_club = await run_in_db_executor(update_club, update_club_data=update_club_dto)
 
+    if existing_image_ids:
+        log.info("deleting the existing images...")
+        await delete_images(image_ids=existing_image_ids)
 
+    return updated_club
@@ -2,17 +2,24 @@ from models.generic_get_query_with_pagination import (
     GenericGetQueryWithPaginationDTO,
     Filter,
     Sort,
-    Pagination
+    Pagination,
+    PaginatedResult
+)
+from data.dbapis.generic_get_query_with_pagination import (
+    generic_get_query_with_pagination,
+    generic_get_query_with_pagination_and_facets
 )
-from data.dbapis.generic_get_query_with_pagination import generic_get_query_with_pagination
 from decorators.atomic_transaction import atomic_transaction
-from logging_config import log
-from typing import Optional
+from logging_config import log, summarize
+from typing import Any, Optional
+import base64
+import binascii
 import re
+from bson import json_util
 from fastapi import HTTPException, status
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def generic_get_query_with_pagination_logic(
         primary_collection,
         final_output_model,
@@ -20,40 +27,165 @@ def generic_get_query_with_pagination_logic(
         s: Optional[list[str]] = None,
         page_no: Optional[int] = None,
         page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+        facets: Optional[list[str]] = None,
         session=None
-):
+) -> PaginatedResult:
+    """
+    :param cursor: opt-in keyset pagination; an empty string requests the first page, and the
+                   next_cursor of a returned page requests the page right after it. page_no is
+                   ignored in this mode, the cost of a page doesn't grow with its position.
+    :param with_total: whether to count all the matching documents in the same aggregation, requires
+                       the pagination
+    :param facets: the fields to count the matching documents per value of, requires the pagination
+    :return: the page, with its next_cursor set in keyset pagination mode if there may be more,
+             and its total_count and facets if requested
+    """
     log.info("inside generic_get_query_with_pagination_logic("
-             f"final_output_model={final_output_model}, "
-             f"f={f}, "
-             f"s={s}, "
-             f"page_no={page_no}, "
-             f"page_size={page_size})")
+             "final_output_model=%s, f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+             "with_total=%s, facets=%s)",
+             final_output_model.__name__, f, s, page_no, page_size, cursor, with_total, facets)
+
+    s = list(s) if s else []
+    sorts = format_sort_strings(sort_strings=s)
+
+    # sorting by the unique id last makes the order total (and the keyset of a page unique),
+    # unless the documents are already sorted by id, in which case the sorts after it never
+    # come into play and a second sort on id would contradict or duplicate the provided one
+    if not any(sort.field_name == "id" for sort in sorts):
+        s.append("id$asc")
+        sorts.extend(format_sort_strings(sort_strings=["id$asc"]))
+
+    is_keyset_pagination = cursor is not None
+
+    if is_keyset_pagination and not page_size:
+        log.info("page_size is required in keyset pagination mode")
 
-    s = s + ["id$asc"] if s else ["id$asc"]
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="page_size is required in keyset pagination mode (when a cursor is provided)"
+        )
+
+    # the page is returned inside the single document of the $facet, which can't exceed the
+    # 16MB limit of a BSON document, hence it must be bounded
+    if (with_total or facets) and not (page_no or is_keyset_pagination):
+        log.info("pagination is required along with with_total or facets")
+
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="page_no and page_size (or a cursor) are required along with with_total or facets"
+        )
 
     generic_get_query_dto = GenericGetQueryWithPaginationDTO(
         final_output_model=final_output_model,
         filters=format_filter_strings(filter_strings=f) if f else None,
-        sorts=format_sort_strings(sort_strings=s),
+        sorts=sorts,
         pagination=Pagination(
-            page_no=page_no,
+            page_no=1 if is_keyset_pagination else page_no,
             page_size=page_size
-        ) if page_no else None
+        ) if page_no or is_keyset_pagination else None,
+        keyset_values=decode_cursor(cursor=cursor, sort_strings=s) if cursor else None,
+        with_total=with_total,
+        facet_fields=facets
     )
 
-    database_cursor = generic_get_query_with_pagination(
-        primary_collection=primary_collection,
-        generic_get_query_dto=generic_get_query_dto,
-        session=session
-    )
+    total_count, facet_counts = None, None
 
-    retval = [final_output_model(**data) for data in database_cursor]
+    if with_total or facets:
+        facet_result = generic_get_query_with_pagination_and_facets(
+            primary_collection=primary_collection,
+            generic_get_query_dto=generic_get_query_dto,
+            session=session
+        )
+
+        documents = facet_result["items"]
+        total_count = facet_result["total_count"]
+        facet_counts = facet_result["facets"] if facets else None
+
+    else:
+        documents = generic_get_query_with_pagination(
+            primary_collection=primary_collection,
+            generic_get_query_dto=generic_get_query_dto,
+            session=session
+        )
+
+    items = []
+    last_document = None
 
-    log.info(f"returning {retval}")
+    for document in documents:
+        items.append(final_output_model(**document))
+        last_document = document
+
+    next_cursor = None
+
+    # a full page means there may be more documents after it
+    if is_keyset_pagination and len(items) == page_size:
+        next_cursor = encode_cursor(
+            sort_strings=s,
+            keyset_values=[get_field_value(last_document, sort.field_name) for sort in sorts]
+        )
+
+    retval = PaginatedResult(
+        items=items,
+        next_cursor=next_cursor,
+        total_count=total_count,
+        facets=facet_counts
+    )
+
+    log.info("returning %s (next_cursor=%s, total_count=%s)", summarize(retval), next_cursor, total_count)
 
     return retval
 
 
+def get_field_value(document: dict, field_name: str) -> Any:
+    # dotted field names refer to the fields of the looked-up documents
+    for key in field_name.split("."):
+        document = document.get(key) if isinstance(document, dict) else None
+
+    return document
+
+
+def encode_cursor(sort_strings: list[str], keyset_values: list[Any]) -> str:
+    """
+    the cursor is opaque to the clients; it embeds the sorts it was produced for, so that it
+    can't be replayed against a differently sorted query.
+    """
+    serialized = json_util.dumps({"s": sort_strings, "v": keyset_values})
+
+    return base64.urlsafe_b64encode(serialized.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_strings: list[str]) -> list[Any]:
+    log.info("inside decode_cursor(cursor=%s, sort_strings=%s)", cursor, sort_strings)
+
+    try:
+        decoded = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+        cursor_sort_strings, keyset_values = decoded["s"], decoded["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        log.info("invalid cursor (cursor=%s)", cursor)
+
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"invalid cursor (cursor={cursor})"
+        )
+
+    if cursor_sort_strings != sort_strings or len(keyset_values) != len(sort_strings):
+        log.info(
+            "the cursor doesn't belong to a query with the same sorts "
+            "(cursor=%s, sort_strings=%s)",
+            cursor, sort_strings,
+        )
+
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="the cursor doesn't belong to a query with the same sorts, "
+                   f"the same s must be provided along with the cursor (cursor={cursor})"
+        )
+
+    return keyset_values
+
+
 def format_filter_strings(filter_strings: list[str]) -> list[Filter]:
     log.info(f"inside format_filter_strings(filter_strings={filter_strings})")
 
@@ -97,7 +229,7 @@ def format_filter_strings(filter_strings: list[str]) -> list[Filter]:
 
         formatted_filters.append(formatted_filter)
 
-    log.info(f"returning {formatted_filters}")
+    log.info("returning %s", summarize(formatted_filters))
 
     return formatted_filters
 
@@ -143,6 +275,6 @@ def format_sort_strings(sort_strings: list[str]) -> list[Sort]:
 
         formatted_sorts.append(formatted_sort)
 
-    log.info(f"returning {formatted_sorts}")
+    log.info("returning %s", summarize(formatted_sorts))
 
     return formatted_sorts
@@ -1,8 +1,18 @@
 import math
+from typing import Sequence
+
+# numpy is an optional dependency, it computes the distances of many points in one pass.
+# the pure python implementation below is used as a fallback where it is not installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EARTH_RADIUS_IN_KM = 6371.0
 
 
 def haversine(lon1, lat1, lon2, lat2):
-    R = 6371.0
+    R = EARTH_RADIUS_IN_KM
 
     lon1, lat1, lon2, lat2 = map(math.radians, [lon1, lat1, lon2, lat2])
 
@@ -16,3 +26,94 @@ def haversine(lon1, lat1, lon2, lat2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     return R * c
+
+
+def haversine_one_to_many(
+    lon: float,
+    lat: float,
+    lons: Sequence[float],
+    lats: Sequence[float],
+) -> Sequence[float]:
+    """distances in kilometres from one origin to many destinations
+
+    Args:
+        lon (float): longitude of the origin
+        lat (float): latitude of the origin
+        lons (Sequence[float]): longitudes of the destinations
+        lats (Sequence[float]): latitudes of the destinations, same length as lons
+
+    Returns:
+        Sequence[float]: the i-th element is the distance to the i-th destination, a numpy
+            array when numpy is installed (not converted, to keep the vectorized speed on
+            large batches) and a list otherwise
+    """
+
+    if len(lons) != len(lats):
+        raise ValueError("lons and lats must have the same length")
+
+    if np is None:
+        return [haversine(lon, lat, lon2, lat2) for lon2, lat2 in zip(lons, lats)]
+
+    distances = _haversine_kernel(
+        lon1=np.radians(np.float64(lon)),
+        lat1=np.radians(np.float64(lat)),
+        lon2=np.radians(np.asarray(lons, dtype=np.float64)),
+        lat2=np.radians(np.asarray(lats, dtype=np.float64)),
+    )
+
+    return distances
+
+
+def haversine_many_to_many(
+    lons1: Sequence[float],
+    lats1: Sequence[float],
+    lons2: Sequence[float],
+    lats2: Sequence[float],
+) -> Sequence[Sequence[float]]:
+    """N x M matrix of the distances in kilometres between every origin and every
+    destination, e.g. many pickup points against many trucks
+
+    Args:
+        lons1 (Sequence[float]): longitudes of the N origins
+        lats1 (Sequence[float]): latitudes of the N origins
+        lons2 (Sequence[float]): longitudes of the M destinations
+        lats2 (Sequence[float]): latitudes of the M destinations
+
+    Returns:
+        Sequence[Sequence[float]]: element [i][j] is the distance from origin i to
+            destination j, an N x M numpy array when numpy is installed and a list of
+            lists otherwise
+    """
+
+    if len(lons1) != len(lats1) or len(lons2) != len(lats2):
+        raise ValueError("longitudes and latitudes must have the same length")
+
+    if np is None:
+        return [
+            haversine_one_to_many(lon=lon, lat=lat, lons=lons2, lats=lats2)
+            for lon, lat in zip(lons1, lats1)
+        ]
+
+    # the origins are laid out as a column and the destinations as a row so that
+    # numpy broadcasting yields the full N x M matrix in a single pass
+    distances = _haversine_kernel(
+        lon1=np.radians(np.asarray(lons1, dtype=np.float64))[:, np.newaxis],
+        lat1=np.radians(np.asarray(lats1, dtype=np.float64))[:, np.newaxis],
+        lon2=np.radians(np.asarray(lons2, dtype=np.float64))[np.newaxis, :],
+        lat2=np.radians(np.asarray(lats2, dtype=np.float64))[np.newaxis, :],
+    )
+
+    return distances
+
+
+def _haversine_kernel(lon1, lat1, lon2, lat2):
+    """vectorized haversine over numpy arrays of radians, broadcasting the inputs"""
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+
+    # floating point error can push `a` marginally above 1 for antipodal points
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    return EARTH_RADIUS_IN_KM * c
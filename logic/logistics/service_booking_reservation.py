@@ -0,0 +1,96 @@
+from fastapi import HTTPException, status
+
+from data.dbapis.logistics_services_bookings.write_queries import (
+    save_service_booking_db,
+)
+from data.dbapis.truck.read_queries import (
+    get_truck_details_by_id_db,
+    get_trucks_by_service_id,
+)
+from data.dbapis.truck.write_queries import reserve_truck
+from decorators import atomic_transaction
+from logging_config import log
+from models.logistics_service_bookings import (
+    ClubToClubServiceBookingInternal,
+    LuggageTransferServiceBookingInternal,
+    UserTransferServiceBookingInternal,
+)
+
+
+@atomic_transaction
+def book_service_with_truck_reservation(
+    booking: (
+        ClubToClubServiceBookingInternal
+        | UserTransferServiceBookingInternal
+        | LuggageTransferServiceBookingInternal
+    ),
+    session=None,
+) -> str:
+    """reserves the truck of the booking and saves the booking, in one transaction.
+
+    The truck is reserved with a conditional update (available and owned by the
+    logistics company of the booking) instead of checking its availability first
+    and updating it afterwards, hence two concurrent bookings can't both get the
+    same truck: the second one finds it unavailable (or conflicts with the first
+    one and is retried until it does) and is turned down with a 409.
+
+    Args:
+        booking: booking details, with the service (and its type), the company and
+            the truck
+
+    Raises:
+        HTTPException: 400 if the truck doesn't work for the service or doesn't
+            belong to the logistics company, 409 if it is not currently available
+
+    Returns:
+        str: booking id of the booking
+    """
+
+    log.info(
+        "book_service_with_truck_reservation() invoked : %s "
+        "service_id %s truck_id %s",
+        booking.service_type, booking.service_id, booking.truck_id,
+    )
+
+    trucks_for_service = get_trucks_by_service_id(
+        service_id=booking.service_id,
+        service_type=booking.service_type,
+        session=session,
+    )
+    if booking.truck_id not in (trucks_for_service or []):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="provided truck is not available for this service",
+        )
+
+    reserved_truck = reserve_truck(
+        truck_id=booking.truck_id,
+        logistics_company_id=booking.logistics_company_id,
+        session=session,
+    )
+
+    if reserved_truck is None:
+        truck_details = get_truck_details_by_id_db(
+            truck_id=booking.truck_id,
+            fields=["logistics_company_id"],
+            session=session,
+        )
+
+        if (truck_details or {}).get(
+            "logistics_company_id"
+        ) != booking.logistics_company_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="invalid logistics company selected",
+            )
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="selected truck is not currently available",
+        )
+
+    booking_id = save_service_booking_db(booking=booking, session=session)
+
+    log.info("book_service_with_truck_reservation() returning : %s", booking_id)
+
+    return booking_id
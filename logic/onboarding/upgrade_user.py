@@ -1,5 +1,6 @@
 from api.user.models import UpdateUserRole
 from bson import ObjectId
+from data.dbapis.user import invalidate_cached_user
 from logging_config import log
 from logic.onboarding.logistics import users_collection
 from models.user import UserInternal
@@ -14,4 +15,6 @@ def upgrade_user_role(user_update_request: UpdateUserRole, user: UserInternal):
 
     log.info(f"matched_count={result.matched_count}, modified_count={result.modified_count}")
 
+    invalidate_cached_user(user_id=user.id)
+
     return result.modified_count == 1
@@ -3,11 +3,12 @@ from datetime import datetime
 import pytz
 from fastapi import UploadFile
 
+from data.db_executor import run_in_db_executor
 from data.dbapis.trainer_certifications import (
     find_trainer_certification,
     update_trainer_certifications_bulk,
 )
-from logging_config import log
+from logging_config import log, summarize
 from models.trainer_certification import (
     TrainerCertificationInternal,
     UpdateTrainerCertificationInternal,
@@ -23,7 +24,9 @@ async def upload_trainer_certificate_image(
         f"image_filename={image.filename})"
     )
 
-    trainer_certification = find_trainer_certification(id=certificate_id)
+    trainer_certification = await run_in_db_executor(
+        find_trainer_certification, id=certificate_id
+    )
 
     existing_image_id = trainer_certification.image
 
@@ -39,12 +42,13 @@ async def upload_trainer_certificate_image(
         image=new_image_id,
     )
 
-    updated_trainer_certifications = update_trainer_certifications_bulk(
-        update_trainer_certification_dtos=[update_trainer_certification_dto]
+    updated_trainer_certifications = await run_in_db_executor(
+        update_trainer_certifications_bulk,
+        update_trainer_certification_dtos=[update_trainer_certification_dto],
     )
 
     retval = updated_trainer_certifications[0]
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
@@ -3,26 +3,40 @@ from ..generic_get_query_with_pagination import generic_get_query_with_paginatio
 from data.db import get_trainer_collection
 from decorators import atomic_transaction
 from typing import Optional
-from logging_config import log
+from logging_config import log, summarize
 
 
-@atomic_transaction
+@atomic_transaction(read_only=True)
 def trainers_get_query_with_pagination(
         f: Optional[list[str]] = None,
         s: Optional[list[str]] = None,
         page_no: Optional[int] = None,
         page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+        facets: Optional[list[str]] = None,
         session=None
 ) -> list[TrainerDetailedInternal]:
-    log.info("inside trainers_get_query_with_pagination("
-             f"f={f}, s={s}, page_no={page_no}, page_size={page_size})")
+    log.info(
+        "inside trainers_get_query_with_pagination("
+        "f=%s, s=%s, page_no=%s, page_size=%s, cursor=%s, "
+        "with_total=%s, facets=%s)",
+        f,
+        s,
+        page_no,
+        page_size,
+        cursor,
+        with_total,
+        facets,
+    )
 
     result = generic_get_query_with_pagination_logic(
         primary_collection=get_trainer_collection(),
         final_output_model=TrainerDetailedInternal,
-        f=f, s=s, page_no=page_no, page_size=page_size, session=session
+        f=f, s=s, page_no=page_no, page_size=page_size, cursor=cursor,
+        with_total=with_total, facets=facets, session=session
     )
 
-    log.info(f"returning {result}")
+    log.info("returning %s", summarize(result))
 
     return result
@@ -1,4 +1,5 @@
 import uuid
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.exception_handlers import http_exception_handler
@@ -16,10 +17,29 @@ from api.payment_demo import payment_demo_router
 from api.trainers import trainers_api_router
 from api.countries.country_api import country_api_router
 from api.order_demo import order_demo_api_router
-from config import DEBUG, HOST, PORT
+from config import DEBUG, ENSURE_INDEXES_ON_STARTUP, HOST, PORT
+from data.indexes import ensure_indexes
 from logging_config import log
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the indexes are created once here instead of on every collection access
+    if ENSURE_INDEXES_ON_STARTUP:
+        failed_collection_names = ensure_indexes()
+
+        # the api still starts, e.g. the unique index of the reviews can't be created
+        # over duplicate reviews (see scripts/rebuild_club_rating_summaries.py)
+        if failed_collection_names:
+            log.error(
+                "the indexes of %s are missing, run `python -m scripts.manage_indexes`",
+                failed_collection_names,
+            )
+
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(user_api_router)
 app.include_router(user_auth_router)
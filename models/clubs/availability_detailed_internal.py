@@ -0,0 +1,18 @@
+from typing import Annotated, Optional
+
+from models.generic_get_query_with_pagination import Lookup
+
+from .service_internal import AvailabilityInternal, ClubServiceInternal
+
+
+class AvailabilityDetailedInternal(AvailabilityInternal):
+    club_service: Annotated[
+        Optional[ClubServiceInternal],
+        Lookup(
+            from_collection="club_service",
+            local_field="club_service_id",
+            foreign_field="id",
+            as_key_name="club_service",
+            is_one_to_one=True,
+        ),
+    ] = None
@@ -1,8 +1,10 @@
 from pydantic import BaseModel, field_serializer
 from ..common_base import CommonBase
+from ..generic_get_query_with_pagination import Lookup
 from ..location.location_internal import LocationInternal
+from ..ratings import ClubRatingSummaryInternal
 from .enums.verification_status import VerificationStatus
-from typing import Optional
+from typing import Annotated, Optional
 
 
 class ClubUser(BaseModel):
@@ -39,6 +41,18 @@ class ClubInternal(CommonBase):
     images: Optional[list[str]] = None
     verification_status: VerificationStatus = VerificationStatus.PENDING
     users: list[ClubUser]
+    # not stored with the club, joined by the paginated queries (which can sort and filter
+    # on it, e.g. rating_summary.approved_average$desc), None for the clubs without reviews
+    rating_summary: Annotated[
+        ClubRatingSummaryInternal,
+        Lookup(
+            from_collection="club_rating_summaries",
+            local_field="id",
+            foreign_field="club_id",
+            as_key_name="rating_summary",
+            is_one_to_one=True,
+        ),
+    ] = None
 
     @field_serializer("verification_status")
     def verification_status_serializer(self, verification_status):
@@ -13,6 +13,13 @@ class AvailabilityInternal(CommonBase):
     end_time: datetime
 
 
+class AvailabilityBulkWriteResult(BaseModel):
+    # ids of the availability inserted (upserted) and updated by a bulk write, see
+    # bulk_write_club_service_availability
+    inserted_ids: list[str] = []
+    updated_ids: list[str] = []
+
+
 class ClubServiceInternal(CommonBase):
     club_id: str
     capacity: Optional[int] = None
@@ -4,4 +4,5 @@ from .generic_get_query_with_pagination_dto import (
     Sort,
     Pagination,
     Lookup
-)
\ No newline at end of file
+)
+from .paginated_result import PaginatedResult
@@ -74,6 +74,13 @@ class GenericGetQueryWithPaginationDTO(BaseModel):
     filters: Optional[list[Filter]] = None
     sorts: Optional[list[Sort]] = None
     pagination: Optional[Pagination] = None
+    # keyset pagination: the values of the sort fields (in the order of `sorts`) of the last
+    # document of the previous page, only the documents that come after it are returned
+    keyset_values: Optional[list[Any]] = None
+    # whether to count all the matching documents along with the page
+    with_total: bool = False
+    # the fields (of the primary collection) to count the matching documents per value of
+    facet_fields: Optional[list[str]] = None
 
     @model_validator(mode="before")
     def extract_lookups_and_run_type_checks(cls, data: Any) -> Any:
@@ -93,9 +100,38 @@ class GenericGetQueryWithPaginationDTO(BaseModel):
             if data.get("sorts"):
                 field_name_check_sorts(data["sorts"], fields)
 
+            if data.get("facet_fields"):
+                field_name_check_facet_fields(data["facet_fields"], fields)
+
         return data
 
 
+def field_name_check_facet_fields(facet_fields, fields):
+    """
+    Checks that every facet field is a field of the final_output_model, which is not populated by a lookup
+    (the facets are computed on the documents of the primary collection).
+    :param facet_fields: list of field names
+    :param fields: {field_name: FieldInfo} dict of the final_output_model, can be obtained by
+    final_output_model.model_fields
+    :return: True in case the validation succeeds, otherwise raises ValueError
+    """
+
+    log.info("inside field_name_check_facet_fields(facet_fields=%s)", facet_fields)
+
+    for field_name in facet_fields:
+        field_info = fields.get(field_name)
+
+        if not field_info:
+            log.info("invalid facet field_name (field_name=%s)", field_name)
+            raise ValueError(f"invalid facet field_name (field_name={field_name})")
+
+        if field_info.metadata and isinstance(field_info.metadata[0], Lookup):
+            log.info("facets are not supported on looked-up fields (field_name=%s)", field_name)
+            raise ValueError(f"facets are not supported on looked-up fields (field_name={field_name})")
+
+    return True
+
+
 def field_name_check_sorts(sorts, fields):
     """
     Checks the accuracy of the field_names in the sort directives. For non-nested fields,
@@ -0,0 +1,22 @@
+from typing import Any, Iterable, Optional
+
+
+class PaginatedResult(list):
+    """
+    the items of a page, along with the opaque cursor that continues right after the
+    last item (None if there are no more items), the total count of the matching items
+    and the facets (field_name -> [{"value": ..., "count": ...}]) if requested. it is a
+    plain list otherwise, hence the callers that only need the items are unaffected.
+    """
+
+    def __init__(
+            self,
+            items: Iterable = (),
+            next_cursor: Optional[str] = None,
+            total_count: Optional[int] = None,
+            facets: Optional[dict[str, list[dict[str, Any]]]] = None
+    ):
+        super().__init__(items)
+        self.next_cursor = next_cursor
+        self.total_count = total_count
+        self.facets = facets
@@ -3,4 +3,13 @@ from typing import Optional, Any
 
 class Success(BaseModel):
     message: str
-    data: Optional[Any] = None
\ No newline at end of file
+    data: Optional[Any] = None
+
+
+class PaginatedSuccess(Success):
+    # set in keyset pagination mode, None when there are no more pages
+    next_cursor: Optional[str] = None
+    # set if with_total was requested
+    total_count: Optional[int] = None
+    # field_name -> [{"value": ..., "count": ...}], set if facets were requested
+    facets: Optional[dict[str, list[dict[str, Any]]]] = None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Literal
 
 from pydantic import BaseModel, Field, field_serializer
 from pydantic_extra_types.coordinate import Latitude, Longitude
@@ -57,6 +57,7 @@ class ClubToClubServiceBookingInternal(BaseModel):
     truck_id: str
     pickup_time: datetime
     booking_status: BookingStatus
+    service_type: Literal["club_to_club"] = "club_to_club"
     created_at: datetime = Field(default_factory=get_current_utc_datetime)
     updated_at: datetime = Field(default_factory=get_current_utc_datetime)
 
@@ -80,6 +81,7 @@ class UserTransferServiceBookingInternal(BaseModel):
     booking_status: BookingStatus
     horse_info: Horse
     groomer_info: Groomer
+    service_type: Literal["user_transfer"] = "user_transfer"
     created_at: datetime = Field(default_factory=get_current_utc_datetime)
     updated_at: datetime = Field(default_factory=get_current_utc_datetime)
 
@@ -103,6 +105,7 @@ class LuggageTransferServiceBookingInternal(BaseModel):
     booking_status: BookingStatus
     items_to_move: List[ItemsToMove]
     dedicated_labour: bool
+    service_type: Literal["luggage_transfer"] = "luggage_transfer"
     created_at: datetime = Field(default_factory=get_current_utc_datetime)
     updated_at: datetime = Field(default_factory=get_current_utc_datetime)
 
@@ -0,0 +1 @@
+from .club_rating_summary_internal import ClubRatingSummaryInternal
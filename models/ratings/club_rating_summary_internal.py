@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ClubRatingSummaryInternal(BaseModel):
+    """
+    the ratings of the reviews of a club, maintained along with the reviews (see
+    data/dbapis/reviews/write_queries.py). the histograms count the reviews per rating,
+    rounded to the nearest integer: {"1": ..., "5": ...}
+    """
+    club_id: str
+    # every review of the club
+    count: int = 0
+    sum: float = 0
+    average: Optional[float] = None
+    histogram: dict[str, int] = {}
+    # the reviews approved by an admin, the ones shown to the users
+    approved_count: int = 0
+    approved_sum: float = 0
+    approved_average: Optional[float] = None
+    approved_histogram: dict[str, int] = {}
+    last_updated_on: Optional[datetime] = None
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field, field_serializer
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_serializer
 from pydantic_extra_types.coordinate import Latitude, Longitude
 
 from data.db import PyObjectId
@@ -16,6 +16,18 @@ class Location(BaseModel):
     long: Longitude
 
 
+class GeoPoint(BaseModel):
+    """GeoJSON point as expected by the 2dsphere index on the trucks collection,
+    note that GeoJSON orders the coordinates as [longitude, latitude]"""
+
+    type: Literal["Point"] = "Point"
+    coordinates: List[float]
+
+    @classmethod
+    def from_location(cls, location: Location) -> "GeoPoint":
+        return cls(coordinates=[float(location.long), float(location.lat)])
+
+
 class Driver(BaseModel):
     name: str = Field(min_length=1)
     phone_no: str = Field(min_length=10)
@@ -43,3 +55,10 @@ class TruckInternal(BaseModel):
     #     return [service.value for service in services]
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # persisted alongside `location` so that the nearby trucks search can be
+    # answered by the geospatial index instead of scanning every truck
+    @computed_field
+    @property
+    def geo_location(self) -> GeoPoint:
+        return GeoPoint.from_location(self.location)
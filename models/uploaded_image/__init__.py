@@ -1 +1,2 @@
 from .uploaded_image_internal import *
+from .enums import *
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ImageSize(str, Enum):
+    """the renditions of an uploaded image, see utils/image_renditions.py"""
+    THUMBNAIL = "thumbnail"
+    MEDIUM = "medium"
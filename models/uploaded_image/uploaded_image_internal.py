@@ -6,3 +6,5 @@ from typing import Optional
 class UploadedImageInternal(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     image_path: str
+    # the sha256 of the content, the images saved before content-addressed storage have none
+    sha256: Optional[str] = None
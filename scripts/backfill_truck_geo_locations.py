@@ -0,0 +1,19 @@
+"""
+Backfills the GeoJSON `geo_location` point of the trucks that were saved before the
+nearby trucks search moved to the 2dsphere index. Safe to run more than once, trucks
+that already have a `geo_location` are left untouched.
+
+usage (from the project root): python -m scripts.backfill_truck_geo_locations
+"""
+from data.dbapis.truck.write_queries import backfill_truck_geo_locations
+from logging_config import log
+
+
+def main():
+    modified_count = backfill_truck_geo_locations()
+
+    log.info("backfilled geo_location of %s trucks", modified_count)
+
+
+if __name__ == "__main__":
+    main()
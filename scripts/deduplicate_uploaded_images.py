@@ -0,0 +1,104 @@
+"""
+Reclaims the space of the identical files in IMAGES_UPLOAD_FOLDER, most of them saved
+before the images were content-addressed (see save_images in utils/image_management.py).
+The files with the same content are replaced by hard links to one of them: the image
+records and their paths are left untouched, and the file system frees the content once
+the last of its paths is removed. Safe to run more than once, files that are already
+linked are skipped. Reports the number of files linked and the bytes reclaimed.
+
+usage (from the project root):
+    python -m scripts.deduplicate_uploaded_images
+    python -m scripts.deduplicate_uploaded_images --dry-run
+"""
+import argparse
+import hashlib
+import os
+import uuid
+from collections import defaultdict
+
+from config import IMAGE_COPY_BUFFER_SIZE, IMAGES_UPLOAD_FOLDER
+from logging_config import log
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        while chunk := file.read(IMAGE_COPY_BUFFER_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def find_duplicate_files() -> list[list[str]]:
+    """
+    returns the groups of files of IMAGES_UPLOAD_FOLDER with the same content, only the
+    files with the same size are hashed
+    """
+    file_paths_by_size = defaultdict(list)
+
+    with os.scandir(IMAGES_UPLOAD_FOLDER) as entries:
+        for entry in entries:
+            # the files of the uploads and deletions in progress are left alone
+            if entry.is_file(follow_symlinks=False) and not entry.name.startswith("."):
+                if not entry.name.endswith(".deleted"):
+                    file_paths_by_size[entry.stat().st_size].append(entry.path)
+
+    file_paths_by_digest = defaultdict(list)
+
+    for file_paths in file_paths_by_size.values():
+        if len(file_paths) > 1:
+            for file_path in file_paths:
+                file_paths_by_digest[hash_file(file_path)].append(file_path)
+
+    return [file_paths for file_paths in file_paths_by_digest.values() if len(file_paths) > 1]
+
+
+def link_file(source_path: str, file_path: str):
+    """replaces file_path with a hard link to source_path, atomically"""
+    temporary_file_path = os.path.join(IMAGES_UPLOAD_FOLDER, f".{uuid.uuid4().hex}.tmp")
+
+    os.link(source_path, temporary_file_path)
+    os.replace(temporary_file_path, file_path)
+
+
+def main(dry_run: bool):
+    linked_count = 0
+    reclaimed_bytes = 0
+
+    for file_paths in find_duplicate_files():
+        source_path, *duplicate_paths = file_paths
+
+        for file_path in duplicate_paths:
+            if os.path.samefile(source_path, file_path):
+                continue
+
+            file_stat = os.stat(file_path)
+
+            if not dry_run:
+                link_file(source_path=source_path, file_path=file_path)
+
+            linked_count += 1
+
+            # the content is only freed if no other path links to it
+            if file_stat.st_nlink == 1:
+                reclaimed_bytes += file_stat.st_size
+
+    log.info(
+        "%s %s duplicate files, %s %s bytes (%.1f MiB)",
+        "would link" if dry_run else "linked",
+        linked_count,
+        "reclaimable" if dry_run else "reclaimed",
+        reclaimed_bytes,
+        reclaimed_bytes / (1024 * 1024),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--dry-run", action="store_true", help="report without linking the files"
+    )
+    args = parser.parse_args()
+
+    main(dry_run=args.dry_run)
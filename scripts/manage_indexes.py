@@ -0,0 +1,46 @@
+"""
+Creates the indexes declared in data/indexes.py (the api does the same on startup) or,
+with --check, reports the declared indexes that are missing from the database, the
+existing ones that are not declared and the ones that haven't been used since the
+database server started.
+
+usage (from the project root):
+    python -m scripts.manage_indexes
+    python -m scripts.manage_indexes --check
+"""
+import argparse
+
+from data.indexes import check_indexes, ensure_indexes
+from logging_config import log
+
+
+def main(check: bool):
+    if not check:
+        failed_collection_names = ensure_indexes()
+
+        if failed_collection_names:
+            log.error("the indexes of %s couldn't be created", failed_collection_names)
+            return
+
+        log.info("indexes ensured")
+        return
+
+    report = check_indexes()
+
+    if not report:
+        log.info("all the declared indexes exist and are in use")
+
+    for collection_name, findings in report.items():
+        for finding, index_names in findings.items():
+            if index_names:
+                log.info("%s: %s indexes %s", collection_name, finding, index_names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--check", action="store_true", help="report instead of creating the indexes"
+    )
+    args = parser.parse_args()
+
+    main(check=args.check)
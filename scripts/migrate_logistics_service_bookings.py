@@ -0,0 +1,22 @@
+"""
+Moves the logistics service bookings from their former one-collection-per-service-type
+storage to the `logistics_bookings` collection, keeping their ids and adding their
+`service_type`. Safe to run more than once (only the bookings that are not migrated yet
+are inserted, the migrated ones are never overwritten), the former collections are left
+untouched and can be dropped once the migration is verified.
+
+usage (from the project root): python -m scripts.migrate_logistics_service_bookings
+"""
+from data.dbapis.logistics_services_bookings import migrate_legacy_service_bookings
+from logging_config import log
+
+
+def main():
+    migrated = migrate_legacy_service_bookings()
+
+    for service_type, migrated_count in migrated.items():
+        log.info("migrated %s %s bookings", migrated_count, service_type)
+
+
+if __name__ == "__main__":
+    main()
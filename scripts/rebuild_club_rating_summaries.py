@@ -0,0 +1,55 @@
+"""
+Recomputes the rating summaries of the clubs (club_rating_summaries) from their reviews,
+e.g. after the reviews were edited by hand or for the reviews written before the
+summaries were maintained along with them. Safe to run more than once; run it while no
+review is written, those written during the rebuild may be missed.
+
+Creates the unique (reviewer, reviewee) index of the reviews beforehand; it can't be
+created while a user has reviewed a club more than once, which is reported instead.
+
+usage (from the project root): python -m scripts.rebuild_club_rating_summaries
+"""
+from data.db import get_reviews_collection
+from data.dbapis.reviews.write_queries import rebuild_club_rating_summaries
+from data.indexes import INDEX_REGISTRY
+from logging_config import log
+
+
+def find_duplicate_reviews() -> list[dict]:
+    return list(get_reviews_collection().aggregate([
+        {
+            "$group": {
+                "_id": {
+                    "reviewer_id": "$reviewer.reviewer_id",
+                    "reviewee_id": "$reviewee.reviewee_id",
+                },
+                "review_ids": {"$push": "$_id"},
+            }
+        },
+        {"$match": {"review_ids.1": {"$exists": True}}},
+    ]))
+
+
+def main():
+    duplicate_reviews = find_duplicate_reviews()
+
+    if duplicate_reviews:
+        for duplicate_review in duplicate_reviews:
+            log.error(
+                "reviewed more than once: %s (review_ids=%s)",
+                duplicate_review["_id"],
+                duplicate_review["review_ids"],
+            )
+
+        log.error("the duplicate reviews must be removed first, nothing is rebuilt")
+        return
+
+    get_reviews_collection().create_indexes(INDEX_REGISTRY["reviews"])
+
+    rebuilt_count = rebuild_club_rating_summaries()
+
+    log.info("rebuilt the rating summaries of %s clubs", rebuilt_count)
+
+
+if __name__ == "__main__":
+    main()
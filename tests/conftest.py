@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 import pytest
 from data.db import get_database
+from data.indexes import ensure_indexes
 from main import app
 
 client = TestClient(app)
@@ -9,6 +10,13 @@ TEST_USER_EMAIL = "test@test.com"
 TEST_USER_EMAIL_2 = "test2@test.com"
 
 
+# the TestClient is not used as a context manager, so the application's lifespan (which
+# creates the indexes) never runs, the indexes are created here instead
+@pytest.fixture(scope="session", autouse=True)
+def ensure_database_indexes():
+    ensure_indexes()
+
+
 class HelperFunctions:
     @staticmethod
     def create_an_otp_not_verified_user(user_email=TEST_USER_EMAIL):
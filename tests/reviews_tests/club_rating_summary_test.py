@@ -0,0 +1,73 @@
+import uuid
+
+import pytest
+
+from data.db import get_club_rating_summaries_collection, get_reviews_collection
+from data.dbapis.reviews.write_queries import (
+    create_review_for_club_by_user,
+    update_review_approval,
+)
+from models.user.enums import UserRoles
+
+CLUB_ID = f"club_rating_summary_test_{uuid.uuid4().hex}"
+
+
+def make_review(rating: float) -> dict:
+    return {
+        "reviewee": {"reviewee_id": CLUB_ID, "reviewee_type": UserRoles.CLUB.value},
+        "reviewer": {"reviewer_id": uuid.uuid4().hex, "reviewer_type": UserRoles.USER.value},
+        "rating": rating,
+        "review": None,
+        "approved_by_khayyal_admin": False,
+    }
+
+
+def get_summary() -> dict:
+    return get_club_rating_summaries_collection().find_one({"club_id": CLUB_ID}, {"_id": 0})
+
+
+@pytest.fixture(scope="class", autouse=True)
+def cleanup():
+    yield
+
+    get_reviews_collection().delete_many({"reviewee.reviewee_id": CLUB_ID})
+    get_club_rating_summaries_collection().delete_many({"club_id": CLUB_ID})
+
+
+@pytest.mark.reviews
+class TestClubRatingSummary:
+    def test_the_reviews_are_counted_but_not_approved(self):
+        create_review_for_club_by_user(review_instance=make_review(4))
+        create_review_for_club_by_user(review_instance=make_review(2))
+
+        summary = get_summary()
+
+        assert (summary["count"], summary["sum"], summary["average"]) == (2, 6, 3)
+        assert summary["histogram"] == {"4": 1, "2": 1}
+        assert "approved_count" not in summary
+
+    def test_an_approved_review_is_counted_in_the_approved_ratings(self):
+        review = get_reviews_collection().find_one({"reviewee.reviewee_id": CLUB_ID, "rating": 4})
+
+        assert update_review_approval(review_id=str(review["_id"]), approved=True)
+        # approving again leaves the summary untouched
+        assert not update_review_approval(review_id=str(review["_id"]), approved=True)
+
+        summary = get_summary()
+
+        assert (summary["count"], summary["average"]) == (2, 3)
+        assert (summary["approved_count"], summary["approved_sum"]) == (1, 4)
+        assert summary["approved_average"] == 4
+        assert summary["approved_histogram"] == {"4": 1}
+
+    def test_an_unapproved_review_is_removed_from_the_approved_ratings(self):
+        review = get_reviews_collection().find_one({"reviewee.reviewee_id": CLUB_ID, "rating": 4})
+
+        assert update_review_approval(review_id=str(review["_id"]), approved=False)
+
+        summary = get_summary()
+
+        assert (summary["count"], summary["average"]) == (2, 3)
+        assert (summary["approved_count"], summary["approved_sum"]) == (0, 0)
+        assert summary["approved_average"] is None
+        assert summary["approved_histogram"] == {"4": 0}
@@ -0,0 +1,120 @@
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from data.db import get_database
+from decorators import atomic_transaction, run_after_commit, transaction_stats
+
+COUNTER_ID = "atomic_transaction_test_counter"
+THREADS = 8
+INCREMENTS_PER_THREAD = 10
+
+
+@atomic_transaction
+def increment_counter(collection, session=None):
+    counter = collection.find_one({"id": COUNTER_ID}, session=session)
+
+    # widens the window in which the concurrent transactions conflict
+    time.sleep(0.005)
+
+    collection.update_one(
+        {"id": COUNTER_ID},
+        {"$set": {"value": counter["value"] + 1}},
+        session=session
+    )
+
+
+@atomic_transaction
+def fail_with_value_error(session=None):
+    raise ValueError("not a transient error")
+
+
+@atomic_transaction
+def write_then_defer(collection, calls: list, fail: bool = False, session=None):
+    collection.insert_one({"id": "after_commit"}, session=session)
+
+    # the callback sees the write, i.e. it runs after the commit
+    run_after_commit(session, lambda: calls.append(collection.count_documents({"id": "after_commit"})))
+
+    if fail:
+        raise ValueError("aborts the transaction")
+
+
+def get_stats(func) -> dict:
+    return transaction_stats().get(f"{func.__module__}.{func.__qualname__}", {})
+
+
+@pytest.fixture(scope="class")
+def counter_collection():
+    collection = get_database()["atomic_transaction_test_counters"]
+    collection.drop()
+
+    yield collection
+
+    collection.drop()
+
+
+@pytest.fixture()
+def enough_attempts(monkeypatch):
+    # every transaction conflicts with up to THREADS - 1 others, the retries have to outlast them
+    atomic_transaction_module = importlib.import_module("decorators.atomic_transaction")
+    monkeypatch.setattr(atomic_transaction_module, "TRANSACTION_MAX_ATTEMPTS", THREADS * 5)
+
+
+@pytest.mark.transaction
+class TestAtomicTransactionRetries:
+    def test_contending_transactions_are_retried(self, counter_collection, enough_attempts):
+        counter_collection.insert_one({"id": COUNTER_ID, "value": 0})
+
+        def run_increments():
+            for _ in range(INCREMENTS_PER_THREAD):
+                increment_counter(counter_collection)
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            futures = [executor.submit(run_increments) for _ in range(THREADS)]
+
+        # none of the write conflicts surfaces to the callers
+        for future in futures:
+            assert future.exception() is None
+
+        # and none of the increments is lost
+        counter = counter_collection.find_one({"id": COUNTER_ID})
+        assert counter["value"] == THREADS * INCREMENTS_PER_THREAD
+
+        stats = get_stats(increment_counter)
+        assert stats["calls"] == THREADS * INCREMENTS_PER_THREAD
+        assert stats["retries"] > 0
+        assert stats["exhausted"] == 0
+
+    def test_other_errors_are_not_retried(self):
+        with pytest.raises(ValueError):
+            fail_with_value_error()
+
+        stats = get_stats(fail_with_value_error)
+        assert stats["calls"] == 1
+        assert stats["retries"] == 0
+
+
+@pytest.mark.transaction
+class TestRunAfterCommit:
+    def test_callbacks_run_after_the_commit(self, counter_collection):
+        calls = []
+        write_then_defer(counter_collection, calls)
+
+        assert calls == [1]
+
+    def test_callbacks_of_an_aborted_transaction_are_dropped(self, counter_collection):
+        calls = []
+
+        with pytest.raises(ValueError):
+            write_then_defer(counter_collection, calls, fail=True)
+
+        assert calls == []
+
+    def test_callbacks_run_right_away_without_a_transaction(self):
+        calls = []
+        run_after_commit(None, calls.append, "called")
+
+        assert calls == ["called"]
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from data.dbapis.clubs.read_queries import build_available_slots_pipeline
+from data.dbapis.clubs.write_queries import find_overlapping_availability
+from logic.clubs.club_service import search_available_club_service_slots
+from models.clubs.service_internal import AvailabilityInternal
+
+DAY = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_availability(availability_id: str, start_hour: int, end_hour: int, naive: bool = False):
+    start_time = DAY + timedelta(hours=start_hour)
+    end_time = DAY + timedelta(hours=end_hour)
+
+    availability = AvailabilityInternal(
+        club_service_id="club_service",
+        start_time=start_time.replace(tzinfo=None) if naive else start_time,
+        end_time=end_time.replace(tzinfo=None) if naive else end_time,
+    )
+
+    # the ids are readable in the expected overlaps
+    availability.id = availability_id
+
+    return availability
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "availability, existing_availability, expected",
+    [
+        # adjacent, the ranges are half-open
+        ([("a", 8, 10), ("b", 10, 12)], [("x", 12, 14)], []),
+        # overlapping each other
+        ([("a", 8, 10), ("b", 9, 11)], [], [("b", "a")]),
+        # nested in a new one, reported against it
+        ([("a", 8, 18), ("b", 9, 10), ("c", 11, 12)], [], [("b", "a"), ("c", "a")]),
+        # nested in an existing one
+        ([("a", 9, 10)], [("x", 8, 18)], [("a", "x")]),
+        # the existing one nested in a new one, the new id comes first
+        ([("a", 8, 18)], [("x", 9, 10)], [("a", "x")]),
+        # the existing availability overlapping each other is not reported
+        ([("a", 20, 21)], [("x", 8, 12), ("y", 10, 14)], []),
+        # the availability read from the database is naive, in UTC
+        ([("a", 8, 10)], [("x", 9, 11, True), ("y", 10, 12, True)], [("a", "x")]),
+    ],
+)
+def test_find_overlapping_availability(availability, existing_availability, expected):
+    overlaps = find_overlapping_availability(
+        availability=[make_availability(*slot) for slot in availability],
+        existing_availability=[make_availability(*slot) for slot in existing_availability],
+    )
+
+    assert [
+        (overlap["availability_id"], overlap["overlapping_availability_id"]) for overlap in overlaps
+    ] == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "start_time, end_time",
+    [
+        # 10:00 UTC to 12:00+03:00, i.e. 09:00 UTC
+        (datetime(2026, 1, 1, 10), datetime(2026, 1, 1, 12, tzinfo=timezone(timedelta(hours=3)))),
+        (datetime(2026, 1, 1, 10, tzinfo=timezone.utc), datetime(2026, 1, 1, 9)),
+    ],
+)
+def test_the_search_bounds_with_and_without_an_offset_are_compared_in_utc(start_time, end_time):
+    with pytest.raises(HTTPException) as e:
+        search_available_club_service_slots(start_time=start_time, end_time=end_time, session=None)
+
+    assert e.value.status_code == 400
+
+
+@pytest.mark.unit
+def test_the_availability_without_club_service_is_dropped_ahead_of_the_pagination():
+    pipeline = build_available_slots_pipeline(
+        start_time=DAY,
+        end_time=DAY + timedelta(days=1),
+        club_service_ids=["club_service"],
+        page_no=3,
+        page_size=10,
+    )
+    stage_names = [next(iter(stage)) for stage in pipeline]
+
+    assert pipeline[stage_names.index("$lookup") + 2] == {"$match": {"club_service": {"$ne": None}}}
+    assert pipeline[-2:] == [{"$skip": 20}, {"$limit": 10}]
@@ -0,0 +1,8 @@
+import pytest
+
+
+# the unit tests don't touch the database, the indexes of the session-wide fixture (see
+# tests/conftest.py) are not needed
+@pytest.fixture(scope="session", autouse=True)
+def ensure_database_indexes():
+    pass
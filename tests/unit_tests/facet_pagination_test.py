@@ -0,0 +1,54 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    build_generic_get_query_facet_pipeline,
+)
+from logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic import (
+    format_sort_strings,
+    generic_get_query_with_pagination_logic,
+)
+from models.generic_get_query_with_pagination import GenericGetQueryWithPaginationDTO, Pagination
+
+
+class Item(BaseModel):
+    id: str
+    name: str
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("with_total, facets", [(True, None), (False, ["name"]), (True, ["name"])])
+def test_with_total_and_facets_require_the_pagination(with_total, facets):
+    with pytest.raises(HTTPException) as e:
+        generic_get_query_with_pagination_logic(
+            primary_collection=None,
+            final_output_model=Item,
+            with_total=with_total,
+            facets=facets,
+            session=None
+        )
+
+    assert e.value.status_code == 406
+
+
+@pytest.mark.unit
+def test_the_items_of_the_facet_are_paginated():
+    pipeline = build_generic_get_query_facet_pipeline(
+        generic_get_query_dto=GenericGetQueryWithPaginationDTO(
+            final_output_model=Item,
+            sorts=format_sort_strings(sort_strings=["name$asc", "id$asc"]),
+            pagination=Pagination(page_no=3, page_size=10),
+            with_total=True,
+            facet_fields=["name"]
+        ),
+        with_count=True
+    )
+
+    assert pipeline[0] == {"$sort": {"name": 1, "id": 1}}
+
+    facet = pipeline[-1]["$facet"]
+
+    assert facet["items"][:2] == [{"$skip": 20}, {"$limit": 10}]
+    assert facet["total_count"] == [{"$count": "count"}]
+    assert facet["facet_name"][0] == {"$group": {"_id": "$name", "count": {"$sum": 1}}}
@@ -0,0 +1,91 @@
+import pytest
+
+from logic.logistics import haversine as haversine_module
+from logic.logistics.haversine import haversine, haversine_many_to_many, haversine_one_to_many
+
+# (lon, lat): a point, its neighbour, its antipode, the poles and both sides of the date line
+POINTS = [
+    (51.3890, 35.6892),
+    (51.4000, 35.7000),
+    (-128.6110, -35.6892),
+    (0.0, 90.0),
+    (0.0, -90.0),
+    (179.9999, 0.0),
+    (-179.9999, 0.0),
+]
+LONS = [lon for lon, _ in POINTS]
+LATS = [lat for _, lat in POINTS]
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def implementation(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(haversine_module, "np", None)
+
+    return request.param
+
+
+@pytest.mark.unit
+def test_haversine():
+    # Tehran to Mashhad
+    assert haversine(51.3890, 35.6892, 59.6168, 36.2605) == pytest.approx(742.9, abs=0.1)
+    assert haversine(*POINTS[0], *POINTS[0]) == 0
+
+
+@pytest.mark.unit
+def test_haversine_one_to_many(implementation):
+    for lon, lat in POINTS:
+        distances = haversine_one_to_many(lon=lon, lat=lat, lons=LONS, lats=LATS)
+
+        assert list(distances) == pytest.approx(
+            [haversine(lon, lat, lon2, lat2) for lon2, lat2 in POINTS], abs=1e-6
+        )
+
+
+@pytest.mark.unit
+def test_haversine_many_to_many(implementation):
+    distances = haversine_many_to_many(lons1=LONS[:3], lats1=LATS[:3], lons2=LONS, lats2=LATS)
+
+    assert len(distances) == 3
+
+    for (lon, lat), row in zip(POINTS, distances):
+        assert list(row) == pytest.approx(
+            [haversine(lon, lat, lon2, lat2) for lon2, lat2 in POINTS], abs=1e-6
+        )
+
+
+@pytest.mark.unit
+def test_the_numpy_kernels_return_arrays():
+    np = pytest.importorskip("numpy")
+
+    assert isinstance(haversine_one_to_many(lon=0.0, lat=0.0, lons=LONS, lats=LATS), np.ndarray)
+    assert haversine_many_to_many(lons1=LONS, lats1=LATS, lons2=LONS[:2], lats2=LATS[:2]).shape == (
+        len(POINTS),
+        2,
+    )
+
+
+@pytest.mark.unit
+def test_the_fallback_returns_lists(monkeypatch):
+    monkeypatch.setattr(haversine_module, "np", None)
+
+    assert isinstance(haversine_one_to_many(lon=0.0, lat=0.0, lons=LONS, lats=LATS), list)
+    assert all(
+        isinstance(row, list)
+        for row in haversine_many_to_many(lons1=LONS, lats1=LATS, lons2=LONS, lats2=LATS)
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "kernel, arguments",
+    [
+        (haversine_one_to_many, {"lon": 0.0, "lat": 0.0, "lons": [0.0, 1.0], "lats": [0.0]}),
+        (haversine_many_to_many, {"lons1": [0.0], "lats1": [], "lons2": [0.0], "lats2": [0.0]}),
+    ],
+)
+def test_the_coordinates_must_have_the_same_length(implementation, kernel, arguments):
+    with pytest.raises(ValueError):
+        kernel(**arguments)
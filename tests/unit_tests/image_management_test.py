@@ -0,0 +1,163 @@
+import asyncio
+import io
+import os
+import uuid
+
+import aiofiles.os
+import pytest
+from fastapi import UploadFile
+
+import utils.image_management as image_management
+from models.uploaded_image import ImageSize
+from utils.image_management import get_image_etag, release_image_files, save_images
+from utils.image_renditions import get_rendition_paths
+
+
+@pytest.mark.unit
+def test_get_image_etag():
+    assert get_image_etag("abc") == '"abc"'
+    assert get_image_etag("abc", size=ImageSize.THUMBNAIL) == f'"abc.{ImageSize.THUMBNAIL.value}"'
+    assert get_image_etag("abc", size=ImageSize.MEDIUM) != get_image_etag("abc")
+
+
+class ReferencesStub:
+    """stands for find_referenced_image_paths, the references seen by each check"""
+
+    def __init__(self, *checks: set[str]):
+        self.checks = list(checks)
+        self.calls = []
+
+    def __call__(self, image_paths: list[str]) -> set[str]:
+        self.calls.append(sorted(image_paths))
+        return self.checks.pop(0) & set(image_paths)
+
+
+@pytest.fixture()
+def image_paths(tmp_path) -> dict[str, str]:
+    paths = {}
+
+    for name in ("unreferenced", "referenced", "saved_meanwhile"):
+        paths[name] = str(tmp_path / f"{name}.jpg")
+
+        with open(paths[name], "wb") as file:
+            file.write(name.encode())
+
+        for rendition_path in get_rendition_paths(paths[name]):
+            open(rendition_path, "wb").close()
+
+    return paths
+
+
+@pytest.mark.unit
+def test_release_image_files(monkeypatch, tmp_path, image_paths):
+    references = ReferencesStub(
+        # the first check, before the files are moved aside
+        {image_paths["referenced"]},
+        # the second check, an image with the same content was saved in the meantime
+        {image_paths["saved_meanwhile"]},
+    )
+    monkeypatch.setattr(image_management, "find_referenced_image_paths", references)
+
+    missing_path = str(tmp_path / "missing.jpg")
+
+    asyncio.run(release_image_files([*image_paths.values(), image_paths["unreferenced"], missing_path]))
+
+    # every path is checked once, only the moved ones a second time
+    assert references.calls == [
+        sorted({*image_paths.values(), missing_path}),
+        sorted([image_paths["unreferenced"], image_paths["saved_meanwhile"]]),
+    ]
+
+    assert not os.path.exists(image_paths["unreferenced"])
+    assert not any(map(os.path.exists, get_rendition_paths(image_paths["unreferenced"])))
+
+    for name in ("referenced", "saved_meanwhile"):
+        with open(image_paths[name], "rb") as file:
+            assert file.read() == name.encode()
+
+        assert all(map(os.path.exists, get_rendition_paths(image_paths[name])))
+
+    # nothing is left aside
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".deleted")]
+
+
+@pytest.mark.unit
+def test_release_image_files_without_unreferenced_files(monkeypatch, image_paths):
+    references = ReferencesStub(set(image_paths.values()))
+    monkeypatch.setattr(image_management, "find_referenced_image_paths", references)
+
+    asyncio.run(release_image_files(list(image_paths.values())))
+
+    # nothing is moved aside, hence no second check
+    assert len(references.calls) == 1
+    assert all(map(os.path.exists, image_paths.values()))
+
+
+class UploadedImagesStub:
+    """stands for the uploaded images collection, behind the queries used by save_images"""
+
+    def __init__(self):
+        self.image_paths = {}
+
+    def save(self, uploaded_images: list) -> list[str]:
+        ids = [str(uuid.uuid4()) for _ in uploaded_images]
+        self.image_paths.update(zip(ids, (image.image_path for image in uploaded_images)))
+        return ids
+
+    def delete(self, uploaded_image_ids: list[str]) -> int:
+        return sum(
+            self.image_paths.pop(uploaded_image_id, None) is not None for uploaded_image_id in uploaded_image_ids
+        )
+
+    def find_referenced(self, image_paths: list[str]) -> set[str]:
+        return set(self.image_paths.values()) & set(image_paths)
+
+
+@pytest.fixture()
+def uploaded_images(monkeypatch, tmp_path) -> UploadedImagesStub:
+    uploaded_images = UploadedImagesStub()
+
+    monkeypatch.setattr(image_management, "IMAGES_UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(image_management, "save_uploaded_images", uploaded_images.save)
+    monkeypatch.setattr(image_management, "delete_uploaded_images", uploaded_images.delete)
+    monkeypatch.setattr(image_management, "find_referenced_image_paths", uploaded_images.find_referenced)
+    monkeypatch.setattr(image_management, "schedule_image_renditions", lambda image_paths: None)
+
+    return uploaded_images
+
+
+def upload(*contents: bytes) -> list[UploadFile]:
+    return [
+        UploadFile(file=io.BytesIO(content), filename=f"{index}.jpg")
+        for index, content in enumerate(contents)
+    ]
+
+
+@pytest.mark.unit
+def test_save_images(tmp_path, uploaded_images):
+    uploaded_image_ids = asyncio.run(save_images(upload(b"first", b"second")))
+
+    image_paths = [uploaded_images.image_paths[uploaded_image_id] for uploaded_image_id in uploaded_image_ids]
+
+    assert [open(image_path, "rb").read() for image_path in image_paths] == [b"first", b"second"]
+    assert sorted(os.listdir(tmp_path)) == sorted(map(os.path.basename, uploaded_images.image_paths.values()))
+
+
+@pytest.mark.unit
+def test_a_failed_move_deletes_the_recorded_images(monkeypatch, tmp_path, uploaded_images):
+    replace = aiofiles.os.replace
+
+    async def replace_all_but_the_second(source: str, destination: str):
+        if open(source, "rb").read() == b"second":
+            raise OSError("cannot move the file")
+
+        await replace(source, destination)
+
+    monkeypatch.setattr(aiofiles.os, "replace", replace_all_but_the_second)
+
+    with pytest.raises(OSError):
+        asyncio.run(save_images(upload(b"first", b"second", b"third")))
+
+    # no record points at a missing file, and no file is left behind
+    assert uploaded_images.image_paths == {}
+    assert os.listdir(tmp_path) == []
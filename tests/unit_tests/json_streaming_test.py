@@ -0,0 +1,58 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from utils.json_streaming import JsonStreamEncoder, StreamFormat, batched
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+BATCHES = [[Item(id=1, name="é"), Item(id=2, name="b")], [{"id": 3, "name": "c"}]]
+ITEMS = [{"id": 1, "name": "é"}, {"id": 2, "name": "b"}, {"id": 3, "name": "c"}]
+
+
+def encode(encoder: JsonStreamEncoder, batches: list[list]) -> bytes:
+    return encoder.start() + b"".join(encoder.encode(batch) for batch in batches) + encoder.end()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "message, expected",
+    [(None, ITEMS), ("clubs retrieved", {"message": "clubs retrieved", "data": ITEMS})],
+)
+def test_the_json_stream_is_the_body_of_the_non_streaming_response(message, expected):
+    encoder = JsonStreamEncoder(stream_format=StreamFormat.JSON, message=message)
+
+    assert json.loads(encode(encoder, BATCHES)) == expected
+    assert encoder.item_count == 3
+
+
+@pytest.mark.unit
+def test_the_ndjson_stream_has_an_item_per_line():
+    encoder = JsonStreamEncoder(stream_format=StreamFormat.NDJSON, message="ignored")
+    body = encode(encoder, BATCHES)
+
+    assert body.endswith(b"\n")
+    assert [json.loads(line) for line in body.splitlines()] == ITEMS
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("stream_format", list(StreamFormat))
+def test_an_empty_stream(stream_format):
+    encoder = JsonStreamEncoder(stream_format=stream_format, message="empty")
+    body = encode(encoder, [])
+
+    if stream_format == StreamFormat.NDJSON:
+        assert body == b""
+    else:
+        assert json.loads(body) == {"message": "empty", "data": []}
+
+
+@pytest.mark.unit
+def test_batched():
+    assert list(batched(range(5), size=2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], size=2)) == []
@@ -0,0 +1,169 @@
+import importlib
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from data.dbapis.generic_get_query_with_pagination.generic_get_query_with_pagination import (
+    get_keyset_predicate,
+)
+from logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic import (
+    decode_cursor,
+    encode_cursor,
+    format_sort_strings,
+    generic_get_query_with_pagination_logic,
+)
+
+# sorted by rating (nulls first, as MongoDB sorts them) then id
+DOCUMENTS = [
+    {"id": "a", "rating": None},
+    {"id": "b"},
+    {"id": "c", "rating": 1},
+    {"id": "d", "rating": 3},
+    {"id": "e", "rating": 3},
+    {"id": "f", "rating": 5},
+]
+
+
+def matches(document: dict, predicate: dict) -> bool:
+    """evaluates the subset of the query language used by the keyset predicates"""
+    for field_name, condition in predicate.items():
+        if field_name == "$or":
+            if not any(matches(document, or_predicate) for or_predicate in condition):
+                return False
+            continue
+
+        value = document.get(field_name)
+
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+
+        for operator, operand in condition.items():
+            if operator == "$ne" and value == operand:
+                return False
+
+            if operator == "$exists" and (field_name in document) != operand:
+                return False
+
+            # $gt/$lt never match a null against a number
+            if operator in ("$gt", "$lt"):
+                if value is None or not (value > operand if operator == "$gt" else value < operand):
+                    return False
+
+    return True
+
+
+def sort_documents(sort_strings: list[str]) -> list[dict]:
+    documents = DOCUMENTS
+
+    for sort in reversed(format_sort_strings(sort_strings=sort_strings)):
+        documents = sorted(
+            documents,
+            # the nulls (and the missing values) come first
+            key=lambda document: (document.get(sort.field_name) is not None, document.get(sort.field_name) or 0),
+            reverse=sort.operator == "desc"
+        )
+
+    return documents
+
+
+@pytest.mark.unit
+class TestCursor:
+    def test_the_keyset_values_are_decoded_as_encoded(self):
+        sort_strings = ["created_at$desc", "id$asc"]
+        keyset_values = [datetime(2026, 1, 2, 3, 4, 5), None]
+
+        cursor = encode_cursor(sort_strings=sort_strings, keyset_values=keyset_values)
+
+        assert decode_cursor(cursor=cursor, sort_strings=sort_strings) == keyset_values
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", "bm90IGpzb24=", "e30="])
+    def test_an_invalid_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(cursor=cursor, sort_strings=["id$asc"])
+
+        assert e.value.status_code == 406
+
+    def test_a_cursor_of_other_sorts_is_rejected(self):
+        cursor = encode_cursor(sort_strings=["name$asc", "id$asc"], keyset_values=["x", "y"])
+
+        with pytest.raises(HTTPException) as e:
+            decode_cursor(cursor=cursor, sort_strings=["name$desc", "id$asc"])
+
+        assert e.value.status_code == 406
+
+
+@pytest.mark.unit
+class TestKeysetPredicate:
+    @pytest.mark.parametrize("sort_strings", [["rating$asc", "id$asc"], ["rating$desc", "id$asc"]])
+    def test_the_documents_after_every_keyset_are_matched(self, sort_strings):
+        sorts = format_sort_strings(sort_strings=sort_strings)
+        documents = sort_documents(sort_strings)
+
+        for index, last_document in enumerate(documents):
+            predicate = get_keyset_predicate(
+                sorts=sorts,
+                keyset_values=[last_document.get(sort.field_name) for sort in sorts]
+            )
+
+            assert [document for document in documents if matches(document, predicate)] == documents[index + 1:]
+
+    def test_the_predicate_of_a_null_keyset_value(self):
+        sorts = format_sort_strings(sort_strings=["rating$asc", "id$asc"])
+
+        assert get_keyset_predicate(sorts=sorts, keyset_values=[None, "b"]) == {
+            "$or": [
+                {"rating": {"$ne": None}},
+                {"rating": None, "id": {"$gt": "b"}},
+            ]
+        }
+
+    def test_the_predicate_of_a_descending_sort(self):
+        sorts = format_sort_strings(sort_strings=["rating$desc", "id$asc"])
+
+        assert get_keyset_predicate(sorts=sorts, keyset_values=[3, "d"]) == {
+            "$or": [
+                {"$or": [{"rating": {"$lt": 3}}, {"rating": None}]},
+                {"rating": 3, "id": {"$gt": "d"}},
+            ]
+        }
+
+
+class Item(BaseModel):
+    id: str
+    name: str
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "s, sort_strings",
+    [
+        (None, ["id$asc"]),
+        (["name$asc"], ["name$asc", "id$asc"]),
+        # the documents are already sorted by id, it isn't appended again
+        (["id$desc"], ["id$desc"]),
+        (["name$asc", "id$desc"], ["name$asc", "id$desc"]),
+        (["id$asc", "name$desc"], ["id$asc", "name$desc"]),
+    ],
+)
+def test_the_documents_are_sorted_by_id_last(monkeypatch, s, sort_strings):
+    queries = []
+
+    def query(primary_collection, generic_get_query_dto, session):
+        queries.append(generic_get_query_dto)
+        return []
+
+    # the package exports the logic function under the name of its module
+    logic_module = importlib.import_module(
+        "logic.generic_get_query_with_pagination.generic_get_query_with_pagination_logic"
+    )
+    monkeypatch.setattr(logic_module, "generic_get_query_with_pagination", query)
+
+    generic_get_query_with_pagination_logic(
+        primary_collection=None, final_output_model=Item, s=s, session=None
+    )
+
+    assert queries[0].sorts == format_sort_strings(sort_strings=sort_strings)
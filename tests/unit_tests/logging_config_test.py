@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+
+from logging_config import parse_log_level
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "level_name, level",
+    [("DEBUG", logging.DEBUG), ("warning", logging.WARNING), (" Error ", logging.ERROR)],
+)
+def test_parse_log_level(level_name, level):
+    assert parse_log_level("LOG_LEVEL", level_name) == level
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("level_name", ["VERBOSE", "", "10"])
+def test_parse_log_level_rejects_unknown_names(level_name):
+    with pytest.raises(ValueError, match="LOG_LEVEL: unknown log level"):
+        parse_log_level("LOG_LEVEL", level_name)
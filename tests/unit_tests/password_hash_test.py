@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+import logic.auth.password_hash_utility as password_hash_utility
+import logic.auth.user_auth as user_auth
+from config import PASSWORD_HASH_ROUNDS
+from logic.auth.password_hash_utility import (
+    generate_password_hash,
+    run_in_password_hash_executor,
+    verify_password_and_update,
+)
+from models.user import UserInternal
+
+# a cheaper cost factor than PASSWORD_HASH_ROUNDS, i.e. an outdated hash
+OUTDATED_ROUNDS = 4
+
+
+def outdated_hash(password: str) -> str:
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=OUTDATED_ROUNDS).hash(password)
+
+
+@pytest.fixture()
+def one_slot(monkeypatch) -> threading.BoundedSemaphore:
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(password_hash_utility, "password_hash_slots", slots)
+
+    # more workers than slots, the jobs let through never wait for a worker
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(password_hash_utility, "password_hash_executor", executor)
+
+    yield slots
+
+    executor.shutdown()
+
+
+async def assert_saturated():
+    with pytest.raises(HTTPException) as exc_info:
+        await run_in_password_hash_executor(lambda: None)
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "1"}
+
+
+@pytest.mark.unit
+def test_the_saturated_executor_turns_the_requests_down(one_slot):
+    async def scenario():
+        release = threading.Event()
+        job = asyncio.create_task(run_in_password_hash_executor(release.wait))
+        await asyncio.sleep(0.05)
+
+        try:
+            await assert_saturated()
+        finally:
+            release.set()
+
+        assert await job is True
+
+        # the slot is free again
+        assert await run_in_password_hash_executor(lambda: "hashed") == "hashed"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_a_cancelled_request_holds_its_slot_until_its_job_is_done(one_slot):
+    async def scenario():
+        started, release = threading.Event(), threading.Event()
+
+        def hash_job():
+            started.set()
+            release.wait()
+
+        # e.g. the client disconnects while its password is being hashed
+        job = asyncio.create_task(run_in_password_hash_executor(hash_job))
+        await asyncio.to_thread(started.wait)
+        job.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await job
+
+        try:
+            # the hash is still running, its slot can't be taken yet
+            await assert_saturated()
+        finally:
+            release.set()
+
+        await asyncio.to_thread(one_slot.acquire)
+        one_slot.release()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_a_failing_job_releases_its_slot(one_slot):
+    def failing_job():
+        raise ValueError("hashing failed")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await run_in_password_hash_executor(failing_job)
+
+        assert await run_in_password_hash_executor(lambda: "hashed") == "hashed"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.unit
+def test_verify_password_and_update():
+    current_hash = generate_password_hash("secret")
+
+    assert verify_password_and_update("secret", current_hash) == (True, None)
+    assert verify_password_and_update("wrong", current_hash) == (False, None)
+
+    is_verified, new_hash = verify_password_and_update("secret", outdated_hash("secret"))
+
+    assert is_verified
+    assert f"${PASSWORD_HASH_ROUNDS:02d}$" in new_hash
+    assert verify_password_and_update("secret", new_hash) == (True, None)
+
+    # a wrong password doesn't get rehashed
+    assert verify_password_and_update("wrong", outdated_hash("secret")) == (False, None)
+
+
+@pytest.mark.unit
+def test_the_outdated_hash_is_replaced_on_login(monkeypatch):
+    user = UserInternal(
+        full_name="user",
+        email_address="user@example.com",
+        phone_number="+989121234567",
+        hashed_password=outdated_hash("secret"),
+    )
+    updates = []
+
+    monkeypatch.setattr(user_auth, "get_user_by_email", lambda email: user)
+    monkeypatch.setattr(user_auth, "update_user", lambda update_user_dto: updates.append(update_user_dto))
+
+    assert asyncio.run(user_auth.authenticate_user("secret", email=user.email_address)) is user
+
+    assert len(updates) == 1
+    assert updates[0].id == user.id
+    assert verify_password_and_update("secret", updates[0].hashed_password) == (True, None)
+
+    # the new hash is saved, the next login doesn't rehash
+    user.hashed_password = updates[0].hashed_password
+    asyncio.run(user_auth.authenticate_user("secret", email=user.email_address))
+
+    assert len(updates) == 1
@@ -0,0 +1,77 @@
+from typing import Annotated, Optional
+
+import pytest
+from pydantic import BaseModel, ConfigDict, Field
+
+from data.projections import get_lookup_projections, get_projection
+from models.generic_get_query_with_pagination import Lookup
+
+
+class Certification(BaseModel):
+    id: str
+    name: str
+
+
+class Address(BaseModel):
+    city: str
+    street: str
+
+
+class Trainer(BaseModel):
+    object_id: Optional[str] = Field(default=None, alias="_id")
+    id: str
+    address: Optional[Address] = None
+    certifications: Annotated[
+        list[Certification],
+        Lookup(
+            from_collection="trainer_certifications",
+            local_field="details.id",
+            foreign_field="trainer_id",
+            as_key_name="certifications",
+            is_one_to_one=False,
+        ),
+    ] = []
+
+
+class LooseTrainer(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+
+
+@pytest.mark.unit
+def test_get_projection():
+    assert get_projection(Trainer) == {
+        # read through its alias
+        "_id": 1,
+        "id": 1,
+        # the nested models are projected as a whole
+        "address": 1,
+        "certifications": 1,
+        # the field the lookup joins on
+        "details": 1,
+    }
+
+
+@pytest.mark.unit
+def test_the_projection_excludes_the_id_unless_declared():
+    assert get_projection(Certification) == {"_id": 0, "id": 1, "name": 1}
+
+
+@pytest.mark.unit
+def test_a_model_keeping_the_undeclared_keys_is_not_projected():
+    assert get_projection(LooseTrainer) is None
+
+
+@pytest.mark.unit
+def test_the_cached_projection_is_not_shared():
+    get_projection(Certification)["name"] = 0
+
+    assert get_projection(Certification)["name"] == 1
+
+
+@pytest.mark.unit
+def test_get_lookup_projections():
+    assert get_lookup_projections(Trainer) == {
+        "certifications": {"_id": 0, "id": 1, "name": 1}
+    }
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from utils.response_cache import (
+    LocalResponseCacheBackend,
+    ResponseCache,
+    parse_if_none_match,
+)
+
+KEY = "test:all"
+
+
+def make_request(if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture()
+def cache() -> ResponseCache:
+    return ResponseCache(
+        backend=LocalResponseCacheBackend(name="test", ttl_in_seconds=60, max_size=10)
+    )
+
+
+class Builder:
+    """counts the builds, each one returning the current content"""
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.content
+
+
+def get(cache: ResponseCache, build, if_none_match: str = None):
+    return asyncio.run(cache.cached_json_response(make_request(if_none_match), KEY, build))
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    def test_a_miss_builds_the_response_and_a_hit_reuses_it(self, cache):
+        build = Builder({"data": [1, 2]})
+
+        first = get(cache, build)
+        second = get(cache, build)
+
+        assert build.calls == 1
+        assert first.status_code == second.status_code == 200
+        assert first.body == second.body == b'{"data":[1,2]}'
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_a_matching_etag_is_answered_with_a_304(self, cache):
+        build = Builder({"data": []})
+        etag = get(cache, build).headers["etag"]
+
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = get(cache, build, if_none_match)
+
+            assert response.status_code == 304
+            assert response.body == b""
+            assert response.headers["etag"] == etag
+
+        assert get(cache, build, '"other"').status_code == 200
+        assert cache.stats()["not_modified"] == 4
+
+    def test_an_invalidated_response_is_built_again(self, cache):
+        build = Builder({"data": "before"})
+        before = get(cache, build)
+
+        cache.invalidate(KEY)
+        build.content = {"data": "after"}
+        after = get(cache, build)
+
+        assert build.calls == 2
+        assert after.body == b'{"data":"after"}'
+        assert after.headers["etag"] != before.headers["etag"]
+
+    def test_a_response_built_during_an_invalidation_is_not_cached(self, cache):
+        async def build_while_invalidated():
+            # e.g. a write committed while the response was being built from the data
+            # read before it
+            cache.invalidate(KEY)
+            return {"data": "stale"}
+
+        stale = get(cache, build_while_invalidated)
+        assert stale.body == b'{"data":"stale"}'
+
+        build = Builder({"data": "fresh"})
+        fresh = get(cache, build)
+
+        assert build.calls == 1
+        assert fresh.body == b'{"data":"fresh"}'
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, set()),
+        ("", set()),
+        ('"a"', {'"a"'}),
+        ('W/"a"', {'"a"'}),
+        ('"a", W/"b" ,"c"', {'"a"', '"b"', '"c"'}),
+        ("*", {"*"}),
+    ],
+)
+def test_parse_if_none_match(if_none_match, expected):
+    assert parse_if_none_match(if_none_match) == expected
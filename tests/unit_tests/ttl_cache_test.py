@@ -0,0 +1,96 @@
+import pytest
+
+import utils.cache as cache_module
+from utils.cache import TTLCache
+
+
+class Clock:
+    """stands for time.monotonic, moved forward by the tests"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.mark.unit
+def test_entries_expire_after_the_ttl(clock):
+    cache = TTLCache(name="test", ttl_in_seconds=10, max_size=10)
+    cache.set("a", 1)
+
+    clock.now += 9.9
+    assert cache.get("a") == 1
+
+    clock.now += 0.1
+    assert cache.get("a") is None
+
+    assert cache.stats() == {
+        "name": "test",
+        "size": 0,
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "expirations": 1,
+        "evictions": 0,
+    }
+
+
+@pytest.mark.unit
+def test_setting_again_renews_the_ttl(clock):
+    cache = TTLCache(name="test", ttl_in_seconds=10, max_size=10)
+    cache.set("a", 1)
+
+    clock.now += 5
+    cache.set("a", 2)
+
+    clock.now += 9
+    assert cache.get("a") == 2
+
+
+@pytest.mark.unit
+def test_the_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(name="test", ttl_in_seconds=10, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # "a" becomes the most recently used, "b" is evicted
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.unit
+def test_invalidate(clock):
+    cache = TTLCache(name="test", ttl_in_seconds=10, max_size=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a", "missing")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+@pytest.mark.unit
+def test_invalidate_where(clock):
+    cache = TTLCache(name="test", ttl_in_seconds=10, max_size=10)
+
+    for key, value in {"a": 1, "b": 2, "c": 3, "d": 4}.items():
+        cache.set(key, value)
+
+    assert cache.invalidate_where(lambda key, value: value % 2 == 0 or key == "a") == 3
+    assert cache.invalidate_where(lambda key, value: False) == 0
+
+    assert [cache.get(key) for key in "abcd"] == [None, None, 3, None]
@@ -0,0 +1,159 @@
+import importlib
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from pymongo import errors
+
+import data.dbapis.user.write_queries as user_write_queries
+from data.dbapis.user import (
+    cache_user,
+    get_cached_user,
+    get_user_cache_generation,
+    invalidate_cached_user,
+    update_user,
+)
+from data.dbapis.user.user_cache import user_cache
+from models.user import UpdateUserInternal, UserInternal
+
+
+def make_user(**fields) -> UserInternal:
+    return UserInternal(
+        **{
+            "full_name": "user",
+            "email_address": "user@example.com",
+            "phone_number": "+989121234567",
+            "hashed_password": "hash",
+            **fields,
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.mark.unit
+def test_the_cached_user_is_a_copy():
+    user = make_user()
+    cache_user(subject=user.email_address, user=user, generation=get_user_cache_generation())
+
+    user.full_name = "modified after caching"
+    cached_user = get_cached_user(subject=user.email_address)
+    cached_user.full_name = "modified after reading"
+
+    assert get_cached_user(subject=user.email_address).full_name == "user"
+
+
+@pytest.mark.unit
+def test_invalidate_cached_user_by_id():
+    user, other_user = make_user(), make_user(email_address="other@example.com")
+    generation = get_user_cache_generation()
+
+    # the same user may be cached under its email address and its phone number
+    cache_user(subject=user.email_address, user=user, generation=generation)
+    cache_user(subject=user.phone_number, user=user, generation=generation)
+    cache_user(subject=other_user.email_address, user=other_user, generation=generation)
+
+    invalidate_cached_user(user_id=str(user.id))
+
+    assert get_cached_user(subject=user.email_address) is None
+    assert get_cached_user(subject=user.phone_number) is None
+    assert get_cached_user(subject=other_user.email_address) is not None
+
+
+@pytest.mark.unit
+def test_a_user_invalidated_while_it_was_read_is_not_cached():
+    user = make_user()
+
+    # the read begins, the user is updated and invalidated, the read returns the old user
+    generation = get_user_cache_generation()
+    invalidate_cached_user(user_id=user.id)
+    cache_user(subject=user.email_address, user=user, generation=generation)
+
+    assert get_cached_user(subject=user.email_address) is None
+
+    # the next read is cached
+    cache_user(subject=user.email_address, user=user, generation=get_user_cache_generation())
+
+    assert get_cached_user(subject=user.email_address) is not None
+
+
+class FakeSession:
+    """stands for a ClientSession, commit_error is raised by the commit"""
+
+    def __init__(self, commit_error: Exception = None):
+        self.in_transaction = False
+        self.commit_error = commit_error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def start_transaction(self, **kwargs):
+        self.in_transaction = True
+
+    def commit_transaction(self):
+        self.in_transaction = False
+
+        if self.commit_error:
+            raise self.commit_error
+
+    def abort_transaction(self):
+        self.in_transaction = False
+
+
+class FakeUsersCollection:
+    """records whether the user was still cached when it was written"""
+
+    def __init__(self, subject: str):
+        self.subject = subject
+        self.cached_during_write = None
+
+    def update_one(self, *args, **kwargs):
+        self.cached_during_write = get_cached_user(subject=self.subject) is not None
+        return SimpleNamespace(matched_count=1, modified_count=1)
+
+
+@pytest.fixture()
+def cached_user(monkeypatch):
+    user = make_user()
+    cache_user(subject=user.email_address, user=user, generation=get_user_cache_generation())
+
+    monkeypatch.setattr(user_write_queries, "users_collection", FakeUsersCollection(user.email_address))
+    monkeypatch.setattr(user_write_queries, "find_user", lambda id, session: user)
+
+    return user
+
+
+def use_session(monkeypatch, session: FakeSession):
+    # the package exports the decorator under the name of its module
+    atomic_transaction_module = importlib.import_module("decorators.atomic_transaction")
+    monkeypatch.setattr(
+        atomic_transaction_module, "client", SimpleNamespace(start_session=lambda **kwargs: session)
+    )
+
+
+@pytest.mark.unit
+def test_update_user_invalidates_the_cached_user_after_the_commit(monkeypatch, cached_user):
+    use_session(monkeypatch, FakeSession())
+
+    update_user(update_user_dto=UpdateUserInternal(id=cached_user.id, full_name="renamed"))
+
+    assert user_write_queries.users_collection.cached_during_write is True
+    assert get_cached_user(subject=cached_user.email_address) is None
+
+
+@pytest.mark.unit
+def test_update_user_keeps_the_cached_user_when_the_commit_fails(monkeypatch, cached_user):
+    use_session(monkeypatch, FakeSession(commit_error=errors.OperationFailure("commit failed")))
+
+    with pytest.raises(errors.OperationFailure):
+        update_user(update_user_dto=UpdateUserInternal(id=uuid4(), full_name="renamed"))
+
+    assert get_cached_user(subject=cached_user.email_address) is not None
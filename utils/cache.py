@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    a thread-safe in-process cache, entries expire `ttl_in_seconds` after they were set
+    and the least recently used entry is evicted once the cache holds `max_size` entries.
+
+    hits, misses, expirations and evictions are counted, see stats()
+    """
+
+    def __init__(self, name: str, ttl_in_seconds: float, max_size: int):
+        self.name = name
+        self.ttl_in_seconds = ttl_in_seconds
+        self.max_size = max_size
+
+        # key -> (expires_at, value), ordered from the least to the most recently used
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        returns the value cached against the key, None if it is missing or has expired
+        :param key: the cache key
+        :return: the cached value or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """
+        caches the value against the key, evicting the least recently used entry if the
+        cache is full
+        :param key: the cache key
+        :param value: the value to be cached, must not be None
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_in_seconds, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, *keys: Hashable):
+        """removes the provided keys from the cache, missing keys are ignored"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        removes every entry for which predicate(key, value) is true
+        :param predicate: a callable receiving the key and the cached value
+        :return: the number of removed entries
+        """
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+
+            for key in keys:
+                del self._entries[key]
+
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """returns the size of the cache along with its hit/miss counters"""
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "expirations": self._expirations,
+                "evictions": self._evictions,
+            }
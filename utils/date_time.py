@@ -4,3 +4,12 @@ import pytz
 
 def get_current_utc_datetime():
     return datetime.now(pytz.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    # the datetimes read from the database, and the ones provided without an offset, are
+    # naive, in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=pytz.utc)
+
+    return value.astimezone(pytz.utc)
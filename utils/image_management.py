@@ -1,20 +1,46 @@
+import asyncio
 import hashlib
 import os
-import re
+import uuid
 from typing import Optional
-import aiofiles
 import aiofiles.os
 from fastapi import Request, UploadFile, status
 from fastapi.exceptions import HTTPException
-from config import IMAGES_UPLOAD_FOLDER, BASE_URL
-from data.dbapis.uploaded_imges.read_queries import get_uploaded_image_by_id
+from config import (
+    IMAGES_UPLOAD_FOLDER,
+    BASE_URL,
+    IMAGE_COPY_BUFFER_SIZE,
+    IMAGE_SAVE_MAX_CONCURRENCY,
+    IMAGE_PATH_CACHE_MAX_SIZE,
+    IMAGE_PATH_CACHE_TTL_IN_SECONDS,
+)
+from data.db_executor import run_in_db_executor
+from data.dbapis.uploaded_imges.read_queries import (
+    find_referenced_image_paths,
+    get_uploaded_image_by_id,
+    get_uploaded_images_by_ids,
+)
 from data.dbapis.uploaded_imges.write_queries import (
     delete_uploaded_image,
-    save_uploaded_image,
+    delete_uploaded_images,
+    save_uploaded_images,
+)
+from logging_config import log, summarize
+from models.uploaded_image import ImageSize, UploadedImageInternal
+from utils.cache import TTLCache
+from utils.image_renditions import (
+    get_rendition_paths,
+    schedule_image_renditions,
+    supports_renditions,
+)
+
+# image_id -> image_path, the path of an uploaded image never changes, the cache only
+# needs to be invalidated when the image is deleted (see delete_image)
+image_path_cache = TTLCache(
+    name="image_path_cache",
+    ttl_in_seconds=IMAGE_PATH_CACHE_TTL_IN_SECONDS,
+    max_size=IMAGE_PATH_CACHE_MAX_SIZE,
 )
-from logging_config import log
-from models.uploaded_image import UploadedImageInternal
-from utils.date_time import get_current_utc_datetime
 
 
 async def save_image(image_file: UploadFile) -> str:
@@ -25,8 +51,106 @@ async def save_image(image_file: UploadFile) -> str:
     """
     log.info(f"inside save_image(filename={image_file.filename})")
 
-    filename = image_file.filename
+    [uploaded_image_id] = await save_images(image_files=[image_file])
+
+    log.info("returning %s", uploaded_image_id)
+
+    return uploaded_image_id
+
+
+async def save_images(image_files: list[UploadFile]) -> list[str]:
+    """
+    saves the provided images and returns their image_ids, the files are written
+    IMAGE_SAVE_MAX_CONCURRENCY at a time and recorded with a single query. either every
+    image is saved or none: the extensions are validated before anything is written, and
+    the written files are removed and the recorded images deleted if the upload fails midway
+
+    the files are content-addressed, named after the sha256 of their content (computed
+    while they are written): the images with the same content get their own image_id but
+    share a single file, which is removed with its last image (see release_image_files)
+    :param image_files: The image files. File-like objects.
+    :return: The image_ids, in the order of image_files.
+    """
+    log.info(
+        "inside save_images(filenames=%s)",
+        [image_file.filename for image_file in image_files],
+    )
+
+    for image_file in image_files:
+        validate_image_extension(image_file.filename)
+
+    # the files are written under a temporary name in IMAGES_UPLOAD_FOLDER, as their
+    # name is only known once they are written, then moved in place (on the same
+    # file system the move is atomic)
+    temporary_file_paths = [
+        os.path.join(IMAGES_UPLOAD_FOLDER, f".{uuid.uuid4().hex}.tmp") for _ in image_files
+    ]
+    uploaded_image_ids = None
+
+    try:
+        digests = await write_image_files(image_files=image_files, file_paths=temporary_file_paths)
+
+        file_paths = [
+            os.path.join(IMAGES_UPLOAD_FOLDER, generate_content_addressed_filename(digest, image_file.filename))
+            for digest, image_file in zip(digests, image_files)
+        ]
+
+        # the images are recorded before their files are moved in place, a concurrent
+        # release_image_files of the same content either sees the records or has its file
+        # replaced by the move
+        uploaded_image_ids = await run_in_db_executor(
+            save_uploaded_images,
+            uploaded_images=[
+                UploadedImageInternal(image_path=file_path, sha256=digest)
+                for file_path, digest in zip(file_paths, digests)
+            ],
+        )
+
+        # every move is awaited before a failure is raised, so that the cleanup below
+        # doesn't race the moves still in flight
+        for result in await asyncio.gather(*(
+            aiofiles.os.replace(temporary_file_path, file_path)
+            for temporary_file_path, file_path in zip(temporary_file_paths, file_paths)
+        ), return_exceptions=True):
+            if isinstance(result, BaseException):
+                raise result
+
+        # the resized renditions of the images are built in the background
+        schedule_image_renditions(file_paths)
+
+    except BaseException:
+        log.exception("cannot save the images, removing the written files...")
+        await remove_image_files(temporary_file_paths)
+
+        # the records of the images whose file could not be moved in place would point at
+        # nothing, all of them are deleted and the files already moved are released
+        if uploaded_image_ids is not None:
+            await discard_uploaded_images(uploaded_image_ids=uploaded_image_ids, file_paths=file_paths)
 
+        raise
+
+    log.info("returning %s", uploaded_image_ids)
+
+    return uploaded_image_ids
+
+
+async def discard_uploaded_images(uploaded_image_ids: list[str], file_paths: list[str]):
+    """
+    deletes the records of the images of a failed upload and releases their files, a
+    failure is logged since the error of the upload is the one raised
+    """
+    try:
+        await run_in_db_executor(delete_uploaded_images, uploaded_image_ids=uploaded_image_ids)
+        await release_image_files(file_paths)
+
+    except Exception as e:
+        log.exception(
+            "cannot discard the images of the failed upload (uploaded_image_ids=%s, error=%s)",
+            uploaded_image_ids, e,
+        )
+
+
+def validate_image_extension(filename: str):
     extension = filename.split(".")[-1]
 
     if extension not in ("jpg", "jpeg", "png", "webp", "heif", "heic", "pdf"):
@@ -35,45 +159,132 @@ async def save_image(image_file: UploadFile) -> str:
             detail="file extension must be one of jpg, jpeg, png, webp, heif, heic, pdf"
         )
 
-    secure_filename = generate_secure_filename(filename)
 
-    file_path = os.path.join(IMAGES_UPLOAD_FOLDER, secure_filename)
+async def write_image_files(image_files: list[UploadFile], file_paths: list[str]) -> list[str]:
+    """
+    writes image_files[i] to file_paths[i], at most IMAGE_SAVE_MAX_CONCURRENCY at a time
+    :return: the sha256 hex digests of the files, in the order of image_files
+    """
+    semaphore = asyncio.Semaphore(IMAGE_SAVE_MAX_CONCURRENCY)
 
-    async with aiofiles.open(file_path, "wb") as buffer:
-        while chunk := await image_file.read(1024):
-            await buffer.write(chunk)
+    async def write(image_file: UploadFile, file_path: str) -> str:
+        async with semaphore:
+            return await write_image_file(image_file=image_file, file_path=file_path)
 
-    upload_image_internal = UploadedImageInternal(image_path=file_path)
+    return await asyncio.gather(*(
+        write(image_file=image_file, file_path=file_path)
+        for image_file, file_path in zip(image_files, file_paths)
+    ))
 
-    uploaded_image_id = save_uploaded_image(uploaded_image=upload_image_internal)
 
-    log.info(f"returning {uploaded_image_id}")
+async def write_image_file(image_file: UploadFile, file_path: str) -> str:
+    """
+    copies the uploaded file (spooled to memory or to a temporary file by starlette) to
+    file_path in a single worker thread, with IMAGE_COPY_BUFFER_SIZE sized reads and writes,
+    instead of an await per chunk of the file. the content is hashed on the way
+    :return: the sha256 hex digest of the file
+    """
+    def copy() -> str:
+        digest = hashlib.sha256()
+        image_file.file.seek(0)
 
-    return uploaded_image_id
+        with open(file_path, "wb") as buffer:
+            while chunk := image_file.file.read(IMAGE_COPY_BUFFER_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        return digest.hexdigest()
+
+    return await asyncio.to_thread(copy)
+
+
+async def remove_image_files(file_paths: list[str]):
+    """
+    removes the files, the ones that do not exist are skipped
+    """
+    async def remove(file_path: str):
+        try:
+            await aiofiles.os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    await asyncio.gather(*(remove(file_path) for file_path in file_paths))
+
+
+async def release_image_files(image_paths: list[str]):
+    """
+    removes the files that are no longer referenced by an image record, to be called
+    once the records of the images are deleted. the files are moved aside before the
+    references are checked a second time: an image with the same content saved in the
+    meantime either is seen by the second check, and its file is moved back, or moves
+    its own copy of the file in place after the first one is gone
+    :param image_paths: the paths of the files of the deleted images
+    """
+    image_paths = list(dict.fromkeys(image_paths))
+
+    referenced_image_paths = await run_in_db_executor(
+        find_referenced_image_paths, image_paths=image_paths
+    )
+
+    moved_image_paths = {}
+
+    for image_path in image_paths:
+        if image_path in referenced_image_paths:
+            continue
+
+        moved_image_path = f"{image_path}.{uuid.uuid4().hex}.deleted"
+
+        try:
+            await aiofiles.os.rename(image_path, moved_image_path)
+        except FileNotFoundError:
+            continue
+
+        moved_image_paths[image_path] = moved_image_path
+
+    if not moved_image_paths:
+        return
+
+    referenced_image_paths = await run_in_db_executor(
+        find_referenced_image_paths, image_paths=list(moved_image_paths)
+    )
+
+    for image_path, moved_image_path in moved_image_paths.items():
+        if image_path in referenced_image_paths:
+            # the content is the same, replacing a file moved in place meanwhile is harmless
+            await aiofiles.os.replace(moved_image_path, image_path)
+        else:
+            await aiofiles.os.remove(moved_image_path)
+            await remove_image_files(get_rendition_paths(image_path))
+
+    log.info(
+        "removed %s unreferenced image files",
+        len(moved_image_paths.keys() - referenced_image_paths),
+    )
 
 
 def generate_image_url(
         image_id: Optional[str] = None,
         # the request parameter is irrelevant, it is only kept for backward compatibility
-        request: Optional[Request] = None
+        request: Optional[Request] = None,
+        size: Optional[ImageSize] = None
 ) -> Optional[str]:
     """
     returns the url for the image
     :param image_id: the id of the targeted image
     :param request: the fastapi Request
+    :param size: the rendition of the image, the original image if None
     :return: the generated URL of the image
     """
-    log.info(f"inside generate_image_url(image_id={image_id})")
+    log.info("inside generate_image_url(image_id=%s, size=%s)", image_id, size)
 
     if not image_id:
         return None
 
     image_path = get_image_file_path(image_id)
-    file_extension = image_path.split(".")[-1]
 
-    retval = f"{BASE_URL}/images/{image_id}/image.{file_extension}"
+    retval = build_image_url(image_id=image_id, image_path=image_path, size=size)
 
-    log.info(f"returning {retval}")
+    log.info("returning %s", summarize(retval))
 
     return retval
 
@@ -81,47 +292,121 @@ def generate_image_url(
 def generate_image_urls(
         image_ids: Optional[list[str]],
         # the request parameter is irrelevant, it is only kept for backward compatibility
-        request: Optional[Request] = None
+        request: Optional[Request] = None,
+        size: Optional[ImageSize] = None
 ) -> Optional[list[str]]:
     """given a list of image_ids returns the corresponding urls
 
     Args:
         image_ids (str)
         request (Request)
+        size (Optional[ImageSize]): the rendition of the images, the original images if None
 
     Returns:
         List[str]
     """
 
-    log.info(f"inside generate_image_urls(image_ids={image_ids})")
+    log.info("inside generate_image_urls(image_ids=%s)", summarize(image_ids))
 
     if not image_ids:
         return None
 
-    image_urls = [generate_image_url(image_id=image_id) for image_id in image_ids]
+    image_paths = get_image_file_paths(image_ids=image_ids)
+
+    image_urls = [
+        build_image_url(image_id=image_id, image_path=image_paths[image_id], size=size)
+        for image_id in image_ids
+    ]
 
-    log.info(f"returning {image_urls}")
+    log.info("returning %s", summarize(image_urls))
 
     return image_urls
 
 
+def get_image_etag(image_id: str, size: Optional[ImageSize] = None) -> str:
+    """
+    returns the strong ETag of an image or of one of its renditions. the content of an
+    image_id never changes, the ETag is therefore derived from the image_id alone, which
+    lets the conditional requests be answered without looking the image up
+    """
+    if size is None:
+        return f'"{image_id}"'
+
+    return f'"{image_id}.{size.value}"'
+
+
+def build_image_url(image_id: str, image_path: str, size: Optional[ImageSize] = None) -> str:
+    # the images without renditions (see supports_renditions) are always served as is
+    if size is not None and supports_renditions(image_path):
+        return f"{BASE_URL}/images/{image_id}/image.webp?size={size.value}"
+
+    file_extension = image_path.split(".")[-1]
+    return f"{BASE_URL}/images/{image_id}/image.{file_extension}"
+
+
 def get_image_file_path(image_id: str) -> str:
     """
     returns the file_path of the image
     :param image_id: the id of the image
     :return: the file path of the image
     """
-    result = get_uploaded_image_by_id(uploaded_image_id=image_id)
+    return get_image_file_paths(image_ids=[image_id])[image_id]
 
-    if result is None:
+
+def get_image_file_paths(image_ids: list[str]) -> dict[str, str]:
+    """
+    returns the file_paths of the images, the ones that are not cached are
+    fetched from the database with a single query
+    :param image_ids: the ids of the images
+    :return: dict of image_id -> file path
+    """
+    image_paths = {}
+    uncached_image_ids = []
+
+    for image_id in dict.fromkeys(image_ids):
+        image_path = image_path_cache.get(image_id)
+
+        if image_path is None:
+            uncached_image_ids.append(image_id)
+        else:
+            image_paths[image_id] = image_path
+
+    if uncached_image_ids:
+        uploaded_images = get_uploaded_images_by_ids(uploaded_image_ids=uncached_image_ids)
+
+        for uploaded_image in uploaded_images:
+            image_path_cache.set(uploaded_image.id, uploaded_image.image_path)
+            image_paths[uploaded_image.id] = uploaded_image.image_path
+
+    log.info(
+        "resolved %s image paths, %s from the database, image_path_cache stats=%s",
+        len(image_paths), len(uncached_image_ids), image_path_cache.stats()
+    )
+
+    if len(image_paths) != len(set(image_ids)):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="image not found"
         )
-    return result.image_path
+
+    return image_paths
+
+
+def prefetch_image_file_paths(image_ids: list[Optional[str]]):
+    """
+    resolves all the images of a listing with a single query up front, so that
+    the subsequent generate_image_url(s) calls of its items are served from the cache
+    :param image_ids: the ids of every image of the listing, None values are ignored
+    """
+    image_ids = [image_id for image_id in image_ids if image_id]
+
+    if image_ids:
+        get_image_file_paths(image_ids=image_ids)
 
 
 async def delete_image(image_id: str) -> bool:
-    uploaded_image = get_uploaded_image_by_id(uploaded_image_id=image_id)
+    uploaded_image = await run_in_db_executor(
+        get_uploaded_image_by_id, uploaded_image_id=image_id
+    )
 
     if uploaded_image is None:
         raise HTTPException(
@@ -129,7 +414,9 @@ async def delete_image(image_id: str) -> bool:
         )
 
     # delete the database entry
-    delete_image_result = delete_uploaded_image(uploaded_image_id=image_id)
+    delete_image_result = await run_in_db_executor(
+        delete_uploaded_image, uploaded_image_id=image_id
+    )
 
     if not delete_image_result:
         raise HTTPException(
@@ -137,33 +424,55 @@ async def delete_image(image_id: str) -> bool:
             detail="cannot delete image",
         )
 
-    # remove the file from the file-system
-    await aiofiles.os.remove(uploaded_image.image_path)
+    image_path_cache.invalidate(image_id)
+
+    # remove the file from the file-system, unless another image shares it
+    await release_image_files([uploaded_image.image_path])
 
     return True
 
 
-def generate_secure_filename(filename):
+async def delete_images(image_ids: list[str]) -> int:
     """
-    Sanitizes a filename to ensure it's safe and compatible with most file systems.
+    deletes the images with a query to find them and one to delete them, the images
+    that do not exist are skipped
+    :param image_ids: the ids of the images
+    :return: the number of deleted images
     """
-    # generate current utc datetime hash to make the filename unique
-    hash_str = hashlib.sha256(str(get_current_utc_datetime()).encode()).hexdigest()
+    log.info("inside delete_images(image_ids=%s)", summarize(image_ids))
+
+    if not image_ids:
+        return 0
 
-    filename_splitted = filename.split(".")
+    uploaded_images = await run_in_db_executor(
+        get_uploaded_images_by_ids, uploaded_image_ids=image_ids
+    )
 
-    file_extension = filename_splitted[-1]
+    if not uploaded_images:
+        return 0
 
-    filename = "".join(filename_splitted[:-1]) + hash_str
+    # delete the database entries
+    deleted_count = await run_in_db_executor(
+        delete_uploaded_images,
+        uploaded_image_ids=[uploaded_image.id for uploaded_image in uploaded_images],
+    )
 
-    # Replace spaces with underscores
-    filename = filename.replace(" ", "_")
+    for uploaded_image in uploaded_images:
+        image_path_cache.invalidate(uploaded_image.id)
 
-    # Remove any characters that are not alphanumeric, underscores, or dots
-    filename = re.sub(r"[^\w\.\-]", "", filename)
+    # remove the files from the file-system, unless other images share them
+    await release_image_files([uploaded_image.image_path for uploaded_image in uploaded_images])
 
-    # Limit the filename length
-    max_filename_length = 255  # Example maximum length
-    filename = filename[:max_filename_length] + "." + file_extension
+    log.info("returning %s", deleted_count)
+
+    return deleted_count
+
+
+def generate_content_addressed_filename(sha256: str, filename: str) -> str:
+    """
+    names the file of an image after the sha256 of its content, with the extension of
+    the uploaded filename (see validate_image_extension)
+    """
+    file_extension = filename.split(".")[-1]
 
-    return filename
+    return f"{sha256}.{file_extension}"
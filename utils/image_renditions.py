@@ -0,0 +1,145 @@
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from config import IMAGE_RENDITION_MAX_WORKERS, IMAGE_RENDITION_QUALITY
+from logging_config import log
+from models.uploaded_image import ImageSize
+
+# the longest side, in pixels, of the renditions of each size, the images that are
+# smaller are only re-encoded
+RENDITION_MAX_DIMENSIONS = {
+    ImageSize.THUMBNAIL: 320,
+    ImageSize.MEDIUM: 960,
+}
+
+# the size of the images of the listings (clubs, trucks, horses for sale and for rent)
+LISTING_IMAGE_SIZE = ImageSize.MEDIUM
+
+# the other uploads (pdf, heif, heic) are always served as is
+RENDITION_EXTENSIONS = ("jpg", "jpeg", "png", "webp")
+
+# decoding, resizing and encoding an image take tens to hundreds of milliseconds of cpu,
+# they are done on this executor once the image is saved, off the request. pillow
+# releases the GIL while it decodes, resizes and encodes
+image_rendition_executor = ThreadPoolExecutor(
+    max_workers=IMAGE_RENDITION_MAX_WORKERS, thread_name_prefix="image_rendition"
+)
+
+# the image paths whose renditions are queued or being built, an image that is
+# requested repeatedly before its renditions exist is only built once
+pending_image_paths = set()
+pending_image_paths_lock = threading.Lock()
+
+
+def supports_renditions(image_path: str) -> bool:
+    return image_path.split(".")[-1].lower() in RENDITION_EXTENSIONS
+
+
+def get_rendition_path(image_path: str, size: ImageSize) -> str:
+    """the renditions are stored next to their image: <image>.<size>.webp"""
+    return f"{os.path.splitext(image_path)[0]}.{size.value}.webp"
+
+
+def get_rendition_paths(image_path: str) -> list[str]:
+    return [get_rendition_path(image_path, size) for size in ImageSize]
+
+
+def build_image_renditions(image_path: str):
+    """
+    builds the missing renditions of the image, each one is written under a temporary
+    name and moved in place so that a rendition is never served half written
+    :param image_path: the path of the uploaded image
+    """
+    log.info("inside build_image_renditions(image_path=%s)", image_path)
+
+    sizes = [
+        size for size in ImageSize if not os.path.exists(get_rendition_path(image_path, size))
+    ]
+
+    if not sizes:
+        return
+
+    with Image.open(image_path) as image:
+        # a jpeg is decoded straight at the smallest scale (1/2, 1/4 or 1/8) that is
+        # still larger than the largest rendition, which is much faster than decoding it
+        # fully and resizing it afterwards
+        largest_dimension = max(RENDITION_MAX_DIMENSIONS[size] for size in sizes)
+        image.draft("RGB", (largest_dimension, largest_dimension))
+
+        # the photos of the phones are stored sideways with an exif orientation, the
+        # renditions lose the exif data hence are rotated upright
+        image = ImageOps.exif_transpose(image)
+
+        has_transparency = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_transparency else "RGB")
+
+        for size in sorted(sizes, key=RENDITION_MAX_DIMENSIONS.get, reverse=True):
+            max_dimension = RENDITION_MAX_DIMENSIONS[size]
+            rendition_path = get_rendition_path(image_path, size)
+            temporary_rendition_path = f"{rendition_path}.{uuid.uuid4().hex}.tmp"
+
+            # the renditions are resized from the largest to the smallest, each one
+            # from the previous
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            image.save(temporary_rendition_path, "WEBP", quality=IMAGE_RENDITION_QUALITY)
+
+            os.replace(temporary_rendition_path, rendition_path)
+
+
+def schedule_image_renditions(image_paths: list[str]):
+    """
+    queues the build of the renditions of the images on image_rendition_executor and
+    returns right away, the images without renditions (see supports_renditions) and the
+    ones already queued are skipped. the failures are logged, the image is then served
+    as is
+    :param image_paths: the paths of the uploaded images
+    """
+    for image_path in image_paths:
+        if not supports_renditions(image_path):
+            continue
+
+        with pending_image_paths_lock:
+            if image_path in pending_image_paths:
+                continue
+
+            pending_image_paths.add(image_path)
+
+        future = image_rendition_executor.submit(build_image_renditions, image_path)
+        future.add_done_callback(
+            lambda future, image_path=image_path: on_image_renditions_built(image_path, future)
+        )
+
+
+def on_image_renditions_built(image_path: str, future: Future):
+    with pending_image_paths_lock:
+        pending_image_paths.discard(image_path)
+
+    if future.exception() is not None:
+        log.error("cannot build the renditions of %s", image_path, exc_info=future.exception())
+
+
+def get_rendition_file_path(image_path: str, size: ImageSize) -> Optional[str]:
+    """
+    returns the path of the rendition of the image, or None if the image is served as is
+    (see supports_renditions) or if its rendition isn't built yet. the renditions of the
+    images saved before the renditions existed are built on their first request
+    :param image_path: the path of the uploaded image
+    :param size: the size of the rendition
+    :return: the path of the rendition if it exists, otherwise None
+    """
+    if not supports_renditions(image_path):
+        return None
+
+    rendition_path = get_rendition_path(image_path, size)
+
+    if os.path.exists(rendition_path):
+        return rendition_path
+
+    schedule_image_renditions([image_path])
+
+    return None
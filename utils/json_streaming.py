@@ -0,0 +1,181 @@
+import json
+from enum import Enum
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from config import STREAM_BATCH_SIZE
+from data.db_executor import run_in_db_executor
+from logging_config import log
+
+
+class StreamFormat(str, Enum):
+    # one json document per line
+    NDJSON = "ndjson"
+    # the same body as the non streaming response (`Success`, or a bare array for the
+    # routes returning one), written a batch of items at a time
+    JSON = "json"
+
+
+STREAM_MEDIA_TYPES = {
+    StreamFormat.NDJSON: "application/x-ndjson",
+    StreamFormat.JSON: "application/json",
+}
+
+
+def dumps(content: Any) -> bytes:
+    # the same output as JSONResponse
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def serialize_item(item: Any) -> bytes:
+    """serializes one item of a streamed list the way the non streaming response would"""
+    if isinstance(item, BaseModel):
+        return item.model_dump_json().encode()
+
+    return dumps(jsonable_encoder(item))
+
+
+def batched(iterable: Iterable, size: int = STREAM_BATCH_SIZE) -> Iterator[list]:
+    """splits the iterable (e.g. a pymongo cursor) into lists of up to `size` items"""
+    iterator = iter(iterable)
+
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def batched_in_db_executor(
+        iterable: Iterable,
+        transform: Optional[Callable[[list], list]] = None,
+        size: int = STREAM_BATCH_SIZE,
+) -> AsyncIterator[list]:
+    """
+    the async counterpart of batched() for the async routes: every batch is read (and
+    transformed) on the database executor, iterating a pymongo cursor blocks
+    :param iterable: the items, typically a pymongo cursor
+    :param transform: applied to every batch on the executor, e.g. to build the dtos
+    :param size: the number of items per batch
+    """
+    batches = batched(iterable, size)
+
+    def next_batch() -> Optional[list]:
+        batch = next(batches, None)
+
+        if batch is None or transform is None:
+            return batch
+
+        return transform(batch)
+
+    while (batch := await run_in_db_executor(next_batch)) is not None:
+        yield batch
+
+
+class JsonStreamEncoder:
+    """
+    frames the batches of a streamed list: the items of a batch are serialized one by one
+    and written as a single chunk, hence the memory held is bounded by the batch size
+    instead of the size of the whole list
+    """
+
+    def __init__(self, stream_format: StreamFormat, message: Optional[str] = None):
+        self.stream_format = stream_format
+        self.message = message
+
+        self.item_count = 0
+
+    def start(self) -> bytes:
+        if self.stream_format == StreamFormat.NDJSON:
+            return b""
+
+        if self.message is None:
+            return b"["
+
+        return b'{"message":' + dumps(self.message) + b',"data":['
+
+    def encode(self, batch: list) -> bytes:
+        items = [serialize_item(item) for item in batch]
+
+        if self.stream_format == StreamFormat.NDJSON:
+            chunk = b"".join(item + b"\n" for item in items)
+
+        else:
+            chunk = (b"," if self.item_count else b"") + b",".join(items)
+
+        self.item_count += len(items)
+
+        return chunk
+
+    def end(self) -> bytes:
+        if self.stream_format == StreamFormat.NDJSON:
+            return b""
+
+        return b"]" if self.message is None else b"]}"
+
+
+def iter_json_stream(
+        batches: Iterable[list], stream_format: StreamFormat, message: Optional[str] = None
+) -> Iterator[bytes]:
+    """
+    streams the batches for the sync routes (starlette iterates the chunks in its thread
+    pool)
+    :param batches: the lists of items, see batched()
+    :param stream_format: ndjson or json
+    :param message: the message of the json body, a bare array without it, unused in
+                    ndjson
+    """
+    encoder = JsonStreamEncoder(stream_format=stream_format, message=message)
+
+    yield encoder.start()
+
+    for batch in batches:
+        yield encoder.encode(batch)
+
+    yield encoder.end()
+
+    log.info("streamed %s items (%s)", encoder.item_count, stream_format.value)
+
+
+async def aiter_json_stream(
+        batches: AsyncIterator[list], stream_format: StreamFormat, message: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """the async counterpart of iter_json_stream(), see batched_in_db_executor()"""
+    encoder = JsonStreamEncoder(stream_format=stream_format, message=message)
+
+    yield encoder.start()
+
+    async for batch in batches:
+        yield encoder.encode(batch)
+
+    yield encoder.end()
+
+    log.info("streamed %s items (%s)", encoder.item_count, stream_format.value)
+
+
+def json_streaming_response(
+        batches: Iterable[list] | AsyncIterator[list],
+        stream_format: StreamFormat,
+        message: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    returns a response streaming the batches of items as they are read, instead of
+    building the whole list of models and serializing it at once.
+
+    the status code and the headers are sent before the first item is read: an error
+    raised while streaming can only cut the body short (which leaves an invalid json
+    body, or an incomplete last line in ndjson), it is logged by the server.
+    :param batches: the lists of items, from batched() in a sync route or from
+                    batched_in_db_executor() in an async one
+    :param stream_format: ndjson or json
+    :param message: the message of the json body (as in `Success`), a bare array without
+                    it, unused in ndjson
+    :return: the streaming response
+    """
+    if hasattr(batches, "__aiter__"):
+        chunks = aiter_json_stream(batches, stream_format=stream_format, message=message)
+    else:
+        chunks = iter_json_stream(batches, stream_format=stream_format, message=message)
+
+    return StreamingResponse(chunks, media_type=STREAM_MEDIA_TYPES[stream_format])
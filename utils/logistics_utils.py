@@ -15,12 +15,11 @@ LOGISTICS_SERVICE_COLLECTION_MAPPING = {
     "luggage_transfer": get_collection("logistic_service_luggage_transfer"),
 }
 
-LOGISTICS_SERVICE_BOOKINGS_COLLECTION_MAPPING = {
-    "club_to_club": get_collection(
-        collection_name="logistic_service_club_to_club_booking"
-    ),
-    "user_transfer": get_collection(
-        collection_name="logistic_service_user_transfer_booking"
-    ),
-    "luggage_transfer": get_collection("logistic_service_luggage_transfer_booking"),
+# the bookings of every service type share the `logistics_bookings` collection
+# (see get_logistics_bookings_collection), they used to be saved in one
+# collection per service type, which scripts.migrate_logistics_service_bookings moves
+LEGACY_LOGISTICS_SERVICE_BOOKINGS_COLLECTION_NAMES = {
+    "club_to_club": "logistic_service_club_to_club_booking",
+    "user_transfer": "logistic_service_user_transfer_booking",
+    "luggage_transfer": "logistic_service_luggage_transfer_booking",
 }
@@ -0,0 +1,261 @@
+import hashlib
+import threading
+from datetime import timedelta
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from config import (
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_TTL_IN_SECONDS,
+)
+from data.db import get_response_cache_collection
+from data.db_executor import run_in_db_executor
+from logging_config import log
+from utils.cache import TTLCache
+from utils.date_time import get_current_utc_datetime
+
+# the keys of the cached responses, shared by the routes serving them and the write
+# queries invalidating them
+COUNTRIES_RESPONSE_CACHE_KEY = "countries:all"
+CLUBS_RESPONSE_CACHE_KEY = "clubs:all"
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+
+
+class LocalResponseCacheBackend:
+    """
+    keeps the responses in process (LRU with TTL), every worker process has its own copy
+    and only sees the invalidations made in it, the TTL bounds the staleness of the others
+    """
+
+    # the operations never touch the database, they can run on the event loop
+    is_blocking = False
+
+    def __init__(self, name: str, ttl_in_seconds: float, max_size: int):
+        self._cache = TTLCache(name=name, ttl_in_seconds=ttl_in_seconds, max_size=max_size)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    def set(self, key: str, response: CachedResponse):
+        self._cache.set(key, response)
+
+    def invalidate(self, key: str):
+        self._cache.invalidate(key)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class DatabaseResponseCacheBackend:
+    """
+    keeps the responses in the `response_cache` collection, shared by every worker
+    process, hence an invalidation is seen by all of them. the expired responses are
+    removed by the TTL index of the collection (see data/indexes.py)
+    """
+
+    # every operation is a database round trip, see run_in_db_executor
+    is_blocking = True
+
+    def __init__(self, name: str, ttl_in_seconds: float):
+        self.name = name
+        self.ttl_in_seconds = ttl_in_seconds
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        # the TTL monitor of the database only runs once a minute, hence the filter
+        document = get_response_cache_collection().find_one(
+            {"_id": key, "expires_at": {"$gt": get_current_utc_datetime()}}
+        )
+
+        with self._lock:
+            if document is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+
+        return CachedResponse(etag=document["etag"], body=document["body"])
+
+    def set(self, key: str, response: CachedResponse):
+        get_response_cache_collection().replace_one(
+            {"_id": key},
+            {
+                "etag": response.etag,
+                "body": response.body,
+                "expires_at": get_current_utc_datetime()
+                + timedelta(seconds=self.ttl_in_seconds),
+            },
+            upsert=True,
+        )
+
+    def invalidate(self, key: str):
+        get_response_cache_collection().delete_one({"_id": key})
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return {
+                "name": self.name,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class ResponseCache:
+    """
+    caches whole json responses (the serialized body along with its ETag) of rarely
+    changing endpoints, see cached_json_response(). the write queries of the underlying
+    data invalidate the affected keys, the TTL of the backend bounds the staleness of the
+    writes that bypass them.
+
+    a response built while its key is invalidated (i.e. possibly from the data before the
+    write) is returned but not cached.
+    """
+
+    def __init__(self, backend: LocalResponseCacheBackend | DatabaseResponseCacheBackend):
+        self.backend = backend
+
+        # key -> number of invalidations, see cached_json_response
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._not_modified = 0
+
+    def _generation(self, key: str) -> int:
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    async def _call_backend(self, func, *args):
+        if self.backend.is_blocking:
+            return await run_in_db_executor(func, *args)
+
+        return func(*args)
+
+    def invalidate(self, *keys: str):
+        """
+        removes the cached responses of the provided keys, this is blocking with a shared
+        backend (i.e. meant to be called from the write queries, not from the event loop)
+        :param keys: the keys of the responses
+        """
+        for key in keys:
+            with self._lock:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+            self.backend.invalidate(key)
+
+        log.info("invalidated the cached responses %s", keys)
+
+    async def cached_json_response(
+            self,
+            request: Request,
+            key: str,
+            build: Callable[[], Awaitable],
+            cache_control: str = "no-cache",
+    ) -> Response:
+        """
+        returns the response cached against the key, or builds, serializes and caches it.
+        the response carries an ETag; a request whose If-None-Match holds it is answered
+        with an empty 304.
+        :param request: the request being served
+        :param key: the cache key of the response
+        :param build: coroutine function returning the response content (e.g. a Success),
+                      called on a miss only. exceptions (e.g. an HTTPException) propagate
+                      and nothing is cached
+        :param cache_control: the Cache-Control header of the response, the default lets
+                              the clients keep it as long as they revalidate it
+        :return: the json response, or a 304
+        """
+        cached_response = await self._call_backend(self.backend.get, key)
+
+        log.info(
+            "response cache %s (key=%s), stats=%s",
+            "hit" if cached_response else "miss",
+            key,
+            self.stats(),
+        )
+
+        if cached_response is None:
+            generation = self._generation(key)
+
+            response = JSONResponse(content=jsonable_encoder(await build()))
+            cached_response = CachedResponse(
+                etag=f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"',
+                body=response.body,
+            )
+
+            if generation == self._generation(key):
+                await self._call_backend(self.backend.set, key, cached_response)
+
+        headers = {"ETag": cached_response.etag, "Cache-Control": cache_control}
+
+        if_none_match = parse_if_none_match(request.headers.get("if-none-match"))
+
+        if cached_response.etag in if_none_match or "*" in if_none_match:
+            with self._lock:
+                self._not_modified += 1
+
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(
+            content=cached_response.body, media_type="application/json", headers=headers
+        )
+
+    def stats(self) -> dict:
+        """returns the hit/miss counters of the backend along with the number of 304s"""
+        with self._lock:
+            not_modified = self._not_modified
+
+        return {**self.backend.stats(), "not_modified": not_modified}
+
+
+def parse_if_none_match(if_none_match: Optional[str]) -> set[str]:
+    """
+    returns the ETags of an If-None-Match header, the weak ones (W/"...") compare equal to
+    their strong counterparts
+    :param if_none_match: the header value
+    :return: the set of ETags, {"*"} matching any
+    """
+    if not if_none_match:
+        return set()
+
+    return {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+
+
+def create_response_cache() -> ResponseCache:
+    """creates the response cache with the backend selected by RESPONSE_CACHE_BACKEND"""
+    log.info("inside create_response_cache(backend=%s)", RESPONSE_CACHE_BACKEND)
+
+    if RESPONSE_CACHE_BACKEND == "database":
+        backend = DatabaseResponseCacheBackend(
+            name="response_cache", ttl_in_seconds=RESPONSE_CACHE_TTL_IN_SECONDS
+        )
+
+    elif RESPONSE_CACHE_BACKEND == "local":
+        backend = LocalResponseCacheBackend(
+            name="response_cache",
+            ttl_in_seconds=RESPONSE_CACHE_TTL_IN_SECONDS,
+            max_size=RESPONSE_CACHE_MAX_SIZE,
+        )
+
+    else:
+        raise ValueError(
+            f"RESPONSE_CACHE_BACKEND must be either local or database, not {RESPONSE_CACHE_BACKEND}"
+        )
+
+    return ResponseCache(backend=backend)
+
+
+response_cache = create_response_cache()